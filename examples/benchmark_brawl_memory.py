@@ -0,0 +1,60 @@
+"""
+Compare the memory held by many Brawl objects that keep the raw
+find_brawl payload (keep_data=True), that keep the compressed raw
+records (keep_raw=True), and the default compact ones.
+The payloads are synthetic, with the fields Brawl uses plus a few of
+the extra fields the API returns.
+"""
+import os
+import sys
+import random
+import tracemalloc
+sys.path.insert(0, os.path.abspath('..'))
+from spltools.guild import Brawl
+
+n_brawls = 2000
+n_players = 25
+n_guilds = 9
+
+
+def synthetic_brawl_data(rng):
+    guilds = [{"id": f"{rng.getrandbits(160):040x}",
+               "name": f"Guild {rng.randrange(10000)}",
+               "wins": rng.randrange(80), "losses": rng.randrange(80),
+               "draws": rng.randrange(5), "auto_wins": rng.randrange(5),
+               "total_payout": rng.randrange(5000),
+               "member_sps_payout": round(rng.random()*500, 3),
+               "member_merits_payout": rng.randrange(2000),
+               "rating": rng.randrange(3000), "level": rng.randrange(1, 11),
+               "crest": {"banner": "bg_1", "decal": "dc_2"}}
+              for _ in range(n_guilds)]
+    players = [{"player": f"player{rng.randrange(100000)}",
+                "wins": rng.randrange(6), "losses": rng.randrange(6),
+                "auto_wins": rng.randrange(2), "total_battles": 5,
+                "entered_battles": 5, "fray_index": rng.randrange(25),
+                "guild_id": guilds[0]["id"], "join_date": "2023-01-01",
+                "battles": [f"sl_{rng.getrandbits(128):032x}"
+                            for _ in range(5)]}
+               for _ in range(n_players)]
+    return {"data": {"challenge_level": 4, "name": "Brawl"},
+            "players": players, "guilds": guilds}
+
+
+def measure(**kwargs):
+    rng = random.Random(0)
+    tracemalloc.start()
+    brawls = [Brawl("g", f"b{i}", brawl_data=synthetic_brawl_data(rng),
+                    **kwargs) for i in range(n_brawls)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del brawls
+    return current
+
+
+full = measure(keep_data=True)
+raw = measure(keep_raw=True)
+compact = measure()
+print(f"{n_brawls} brawls with {n_players} players and {n_guilds} guilds")
+print(f"  keep_data=True : {full/1e6:8.1f} MB")
+print(f"  keep_raw=True  : {raw/1e6:8.1f} MB")
+print(f"  compact        : {compact/1e6:8.1f} MB ({full/compact:.1f}x less)")
@@ -0,0 +1,40 @@
+"""
+Compare the time it takes to start a python process that only needs
+the reward chests with one that loads every spltools subpackage and
+creates the HTTP session (what "import spltools" used to do).
+"""
+import os
+import subprocess
+import sys
+import time
+from statistics import median
+
+package_dir = os.path.abspath('..')
+n_runs = 20
+
+scripts = {
+    "python only": "pass",
+    "from spltools import MinorChest":
+        "from spltools import MinorChest",
+    "import spltools (everything)":
+        ("import spltools, spltools.guild, spltools.carddata, "
+         + "spltools.rewards, spltools.battle, "
+         + "spltools.get_splinterlands_settings; "
+         + "spltools.get_request_session()"),
+}
+
+
+def time_script(script):
+    env = dict(os.environ, PYTHONPATH=package_dir)
+    timings = []
+    for _ in range(n_runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], env=env, check=True)
+        timings.append(time.perf_counter() - t0)
+    return median(timings)
+
+
+print(f"Median wall time over {n_runs} runs")
+print("------------------------------")
+for label, script in scripts.items():
+    print(f"{label:>30s}: {1000*time_script(script):7.1f} ms")
@@ -0,0 +1,16 @@
+"""
+Import a directory of battles saved with get_battle_data(bqid,
+save_dir="battles") into a single compressed SQLite store, and read
+a battle back from it. The .sqlite path can be used as save_dir
+everywhere a directory was used before.
+"""
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+from spltools.battle import migrate_save_dir, get_battle_data
+
+n = migrate_save_dir("battles", "battles.sqlite")
+print(f"Imported {n} battles")
+data = get_battle_data("sl_651debdfd690ddd9eacaa0c88bd9820d",
+                       save_dir="battles.sqlite")
+print(data['player_1'], "vs.", data['player_2'])
@@ -2,90 +2,56 @@ import os
 import sys
 from numpy import argsort
 sys.path.insert(0, os.path.abspath('..'))
-from spltools import MinorChest, MajorChest, UltimateChest
+from spltools.rewards import CHEST_TYPES, RARITIES, DRAW_BASE_COSTS, \
+    DRAW_GOLD_FOIL_CHANCE, batch_costs, completion_factors, \
+    evaluate_grid, optimize_glint
 
-minor_chest = MinorChest()
-major_chest = MajorChest()
-ultimate_chest = UltimateChest()
-
-minor_chest_batches = [MinorChest(batch=b) for b in range(1, 4)]
-major_chest_batches = [MajorChest(batch=b) for b in range(1, 4)]
-ultimate_chest_batches = [UltimateChest(batch=b) for b in range(1, 4)]
-
-# Rarity draws
-common_draw_batch_cost = [150*1.5**x for x in range(1, 4)]
-rare_draw_batch_cost = [750*1.5**x for x in range(1, 4)]
-epic_draw_batch_cost = [7500*1.5**x for x in range(1, 4)]
-legendary_draw_batch_cost = [35000*1.5**x for x in range(1, 4)]
+batches = [1, 2, 3]
 
 completion = {"common": 0.0, "rare": 0.0, "epic": 0.0, "legendary": 0.0}
-relative_value_factor = {}
-norm = sum([(1-x) for x in completion.values()])/4
-for k, v in completion.items():
-    relative_value_factor[k] = (1-v)/norm
 
 values = {"legendary_potions": 0,
           "alchemy_potions": 0,
           "energy": 1000,
           "jackpot": 100000,
           "merits": 1,
-          "common_rf": 150*relative_value_factor['common'],
-          "rare_rf": 750*relative_value_factor['rare'],
-          "epic_rf": 7500*relative_value_factor['epic'],
-          "legendary_rf": 35000*relative_value_factor['legendary'],
+          "common_rf": 150,
+          "rare_rf": 750,
+          "epic_rf": 7500,
+          "legendary_rf": 35000,
           "common_gf": 625,
           "rare_gf": 2500,
           "epic_gf": 12500,
           "legendary_gf": 62500
           }
 
+# Regular foil cards are worth less the more complete the collection
+# is for their rarity. optimize_glint applies this itself, so values
+# stays unscaled.
+weighted_values = dict(values)
+for r, f in completion_factors(completion).items():
+    weighted_values[f"{r}_rf"] *= f
 
-def get_chest_value(chest, item_values):
-    """
-    Calculate the value of a chest given the item values identified
-    in item values. Requires that item_values has a value for each
-    element returned by chest.average_draw()
-    """
-    value = 0
-    for k, v in chest.average_draw().items():
-        value += item_values[k]*v
-    return value
-
-
-minor_chest_value = get_chest_value(minor_chest, values)
-major_chest_value = get_chest_value(major_chest, values)
-ultimate_chest_value = get_chest_value(ultimate_chest, values)
+# Value and cost of every chest type and batch, with both potions
+grid = evaluate_grid(CHEST_TYPES, batches, potions=[True],
+                     item_values=weighted_values)
 
 draw_value = {}
 costs = {}
-for i, c in enumerate(minor_chest_batches):
-    key = f"Minor chest batch {i+1}"
-    draw_value[key] = minor_chest_value
-    costs[key] = c.cost
-for i, c in enumerate(major_chest_batches):
-    key = f"Major chest batch {i+1}"
-    draw_value[key] = major_chest_value
-    costs[key] = c.cost
-for i, c in enumerate(ultimate_chest_batches):
-    key = f"Ultimate chest batch {i+1}"
-    draw_value[key] = ultimate_chest_value
-    costs[key] = c.cost
-for i, c in enumerate(common_draw_batch_cost):
-    key = f"Common draw batch {i+1}"
-    draw_value[key] = 0.96*values['common_rf'] + 0.04*values['common_gf']
-    costs[key] = c
-for i, c in enumerate(rare_draw_batch_cost):
-    key = f"Rare draw batch {i+1}"
-    draw_value[key] = 0.96*values['rare_rf'] + 0.04*values['rare_gf']
-    costs[key] = c
-for i, c in enumerate(epic_draw_batch_cost):
-    key = f"Epic draw batch {i+1}"
-    draw_value[key] = 0.96*values['epic_rf'] + 0.04*values['epic_gf']
-    costs[key] = c
-for i, c in enumerate(legendary_draw_batch_cost):
-    key = f"Legendary draw batch {i+1}"
-    draw_value[key] = 0.96*values['legendary_rf'] + 0.04*values['legendary_gf']
-    costs[key] = c
+for t, chest_type in enumerate(CHEST_TYPES):
+    name = chest_type.__name__[:-len("Chest")]
+    for i, b in enumerate(batches):
+        key = f"{name} chest batch {b}"
+        draw_value[key] = grid["value"][t, i, 0]
+        costs[key] = grid["cost"][t, i, 0]
+g = DRAW_GOLD_FOIL_CHANCE
+for r in RARITIES:
+    draw = ((1 - g)*weighted_values[f"{r}_rf"]
+            + g*weighted_values[f"{r}_gf"])
+    for b, c in zip(batches, batch_costs(DRAW_BASE_COSTS[r], len(batches))):
+        key = f"{r.capitalize()} draw batch {b}"
+        draw_value[key] = draw
+        costs[key] = c
 
 value_per_cost = {}
 for k, value in draw_value.items():
@@ -98,3 +64,19 @@ print("Glint spending strategy")
 print("-----------------------")
 for j, index in enumerate(sorted_index):
     print(f"{j+1}. {x[index]}")
+
+# Best purchases for a glint budget, taking the escalating batch costs
+# into account, for the expected value and with a penalty on variance
+budget = 100000
+print()
+for label, risk_aversion in (("expected value", 0),
+                             ("risk adjusted", 1e-3)):
+    plan = optimize_glint(budget, values, completion, risk_aversion)
+    print(f"Purchases for {budget} glint, {label}")
+    print("-----------------------")
+    for name, n in plan["purchases"].items():
+        if n > 0:
+            print(f"{name}: {n} batches")
+    print(f"Spent {plan['cost']} glint, value {plan['mean']:.0f} "
+          + f"+- {plan['variance']**0.5:.0f}")
+    print()
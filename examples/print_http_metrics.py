@@ -0,0 +1,35 @@
+"""
+Load a few guilds and print the per-endpoint request metrics of the
+shared transport, first as a summary and then in the Prometheus text
+format.
+"""
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+from spltools.transport import get_transport
+from spltools.guild import Guild, get_guild_list
+
+n_guilds = 5
+
+transport = get_transport()
+slow = []
+transport.metrics.add_hook(
+    lambda e: slow.append(e) if e.get("latency", 0) > 1 else None)
+
+for g in get_guild_list()[:n_guilds]:
+    guild = Guild(g['id'])
+    guild.get_brawl_records()
+    print(guild.name, guild.rank)
+    Guild(g['id']).name  # answered from the response cache
+
+print(f"{'endpoint':<26s}{'requests':>9s}{'mean ms':>9s}{'retries':>8s}"
+      + f"{'kB':>8s}{'cache hit':>10s}")
+for endpoint, s in transport.metrics.snapshot().items():
+    mean = 1000*s['latency_mean'] if s['latency_mean'] is not None else 0
+    hit_rate = (f"{100*s['cache_hit_rate']:.0f}%"
+                if s['cache_hit_rate'] is not None else "-")
+    print(f"{endpoint:<26s}{s['requests']:>9d}{mean:>9.1f}"
+          + f"{s['retries']:>8d}{s['bytes']/1000:>8.1f}{hit_rate:>10s}")
+print(f"{len(slow)} requests took longer than 1 s")
+print()
+print(transport.metrics.prometheus())
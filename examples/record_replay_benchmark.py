@@ -0,0 +1,50 @@
+"""
+Record the responses of a small guild/brawl crawl once, then replay
+the crawl offline: in-process, and against a local stand-in server
+with latency and injected errors, so that timings are repeatable.
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath('..'))
+from spltools.transport import Transport, set_transport, record, replay
+from spltools.guild import Guild, Brawl, get_guild_list
+from spltools.get_splinterlands_settings import get_splinterlands_settings
+from spltools.carddata import get_card_data
+
+archive = "../data/fixtures/crawl.jsonl.gz"
+n_guilds = 3
+
+
+def crawl():
+    get_splinterlands_settings()
+    get_card_data()
+    for g in get_guild_list()[:n_guilds]:
+        guild = Guild(g['id'])
+        for record_ in guild.get_brawl_records()[:2]:
+            Brawl(g['id'], record_['tournament_id'])
+
+
+if not os.path.isfile(archive):
+    os.makedirs(os.path.dirname(archive), exist_ok=True)
+    transport = set_transport(Transport(cache=False))
+    recorder = record(archive, transport)
+    crawl()
+    recorder.close()
+    print(f"Recorded {recorder.n_recorded} responses to {archive}")
+
+modes = {
+    "in-process": {},
+    "in-process, 20-50 ms": {"latency": (0.02, 0.05)},
+    "local server, 20-50 ms, 5% errors": {
+        "latency": (0.02, 0.05), "error_rate": 0.05, "server": True},
+}
+for label, kwargs in modes.items():
+    transport = set_transport(Transport(cache=False, backoff_factor=0.01))
+    replayed = replay(archive, transport, seed=42, **kwargs)
+    t0 = time.perf_counter()
+    crawl()
+    elapsed = time.perf_counter() - t0
+    retries = sum(s['retries'] for s in transport.metrics.snapshot().values())
+    print(f"{label:>36s}: {elapsed:6.2f} s, {retries} retries")
+    replayed.close()
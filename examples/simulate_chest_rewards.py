@@ -0,0 +1,37 @@
+"""
+Simulate opening 100 chests of each type 100000 times, and print the
+spread of the merits and the chance of getting at least one legendary
+card. Then compute such tail probabilities exactly.
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath('..'))
+from spltools.rewards import MinorChest, MajorChest, UltimateChest, \
+    summarize, total_pmf, prob_at_least
+
+n_chests = 100
+n_trials = 100000
+
+for chest in (MinorChest(), MajorChest(), UltimateChest()):
+    t0 = time.perf_counter()
+    totals = chest.simulate(n_chests, n_trials, seed=42, processes=4)
+    elapsed = time.perf_counter() - t0
+    totals["legendary"] = totals["legendary_rf"] + totals["legendary_gf"]
+    summary = summarize(totals)
+    merits = summary["merits"]
+    print(f"{type(chest).__name__}, {n_chests} chests "
+          + f"({n_chests*n_trials:.0e} simulated in {elapsed:.2f} s)")
+    print(f"  merits: {merits['mean']:.0f} +- {merits['std']:.0f}, "
+          + f"90% between {merits[5]:.0f} and {merits[95]:.0f}")
+    print("  P(at least one legendary card): "
+          + f"{summary['legendary']['p_any']:.3f}")
+
+# The same probabilities computed exactly
+print()
+print("Exact, for 1 to 1000 ultimate chests:")
+for n in (1, 10, 100, 1000):
+    legendary = total_pmf(UltimateChest(), n, "legendary")
+    print(f"  {n:4d} chests: P(at least one legendary card) = "
+          + f"{prob_at_least(legendary, 1):.6f}, "
+          + f"P(at least 5) = {prob_at_least(legendary, 5):.6f}")
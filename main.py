@@ -7,11 +7,6 @@ st.header("Battle analyzer")
 st.text("")
 
 
-@st.cache_resource
-def get_card_data():
-    return spltools.get_card_data()
-
-
 def generate_summary():
     bqid = str(st.session_state.bqid_key).strip()
     if "/" in bqid:
@@ -32,7 +27,9 @@ def generate_summary():
         st.session_state['battle_summary'] = None
 
 
-st.session_state['card_data'] = get_card_data()
+# The card data cache keeps the data in memory and refreshes it in the
+# background, so every rerun picks up the latest copy
+st.session_state['card_data'] = spltools.get_cached_card_data()
 
 col1, col2 = st.columns([2, 1])
 with col1:
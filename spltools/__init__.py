@@ -1,6 +1,65 @@
-from .guild import *
-from .carddata import *
-from .settings import *
-from .get_splinterlands_settings import *
-from .rewards import *
-from .battle import *
+from importlib import import_module
+
+# Public names are resolved on first access, so that e.g.
+# "from spltools import MinorChest" does not import requests or numpy.
+_submodule_names = {
+    "guild": ["Guild", "get_guild_list", "get_player_guild", "Brawl",
+              "BrawlerResults", "load_guilds", "PlayerGuildResolver",
+              "player_guild_resolver", "BrawlWarehouse", "BrawlHistory",
+              "N_FRAYS", "DUPLICATE_FRAYS", "unique_frays", "fray_names",
+              "brawl_is_finished"],
+    "carddata": ["get_card_data_raw", "get_card_data", "CardDataCache",
+                 "card_data_cache", "get_cached_card_data", "in_set",
+                 "hive_image", "SET_EDITIONS", "SetIndex", "STAT_NAMES",
+                 "CardCatalog"],
+    "settings": ["BASE_URL", "GUILD_URL", "BATTLE_URL", "BATTLE_LINK_URL",
+                 "TOURNAMENT_URL", "set_str_to_int", "edition_to_str",
+                 "Edition", "Tier", "CACHE_DIR", "CARD_DATA_TTL",
+                 "PLAYER_GUILD_TTL", "RESPONSE_CACHE_TTLS",
+                 "FINAL_RESPONSE_CACHE_TTLS", "BRAWL_FINISHED_STATUS",
+                 "ARTWORK_URL",
+                 "HIVE_IMG_URL", "PREFIX_30X30", "CROWN_IMAGE",
+                 "MERITS_IMAGE", "SPS_IMAGE", "get_request_session",
+                 "request_session", "retries"],
+    "transport": ["TokenBucket", "Transport", "get_transport",
+                  "configure_transport", "set_transport", "ResponseCache",
+                  "LATENCY_BUCKETS", "TransportMetrics", "RecordingAdapter",
+                  "Replayer", "ReplayAdapter", "ReplayServer"],
+    "get_splinterlands_settings": ["get_splinterlands_settings"],
+    "rewards": ["Chest", "MinorChest", "MajorChest", "UltimateChest",
+                "ITEMS", "RARITIES", "simulate_chests", "summarize",
+                "chest_pmf", "pmf_power", "total_pmf", "prob_at_least",
+                "CHEST_TYPES", "chest_table", "evaluate_grid",
+                "purchase_options", "optimize_glint"],
+    "battle": ["get_battle_data", "get_battles", "Battle", "Team",
+               "BattleLogParser", "BattleStore", "DirectoryBattleStore",
+               "SQLiteBattleStore", "open_battle_store",
+               "close_battle_stores", "migrate_save_dir",
+               "EVENT_COLUMNS", "BattleEvents", "TEAM_STAT_NAMES",
+               "team_stats", "TRACKER_COLUMNS", "TrackerTable",
+               "battle_tracker", "analyze_archive"],
+    # Asynchronous API, used as spltools.aio.Guild etc.
+    "aio": [],
+}
+_lazy_names = {name: module for module, names in _submodule_names.items()
+               for name in names}
+# Looked up on every access, since the session is created on first use
+_uncached_names = {"request_session", "retries"}
+
+__all__ = list(_lazy_names)
+
+
+def __getattr__(name):
+    if name in _submodule_names and name not in _lazy_names:
+        return import_module(f"{__name__}.{name}")
+    if name not in _lazy_names:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = import_module(f"{__name__}.{_lazy_names[name]}")
+    value = getattr(module, name)
+    if name not in _uncached_names:
+        globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_names) | set(_submodule_names))
@@ -0,0 +1,3 @@
+from .client import AsyncClient, get_client, set_client
+from .api import Guild, Brawl, get_guild_list, get_player_guild, \
+    fetch_battle, load_battle, get_card_data
@@ -0,0 +1,128 @@
+import asyncio
+from spltools.settings import BASE_URL, GUILD_URL, TOURNAMENT_URL
+from spltools import guild as _guild
+from spltools.battle import Battle, get_battle_data
+from spltools.carddata import get_cached_card_data
+from spltools.aio.client import get_client
+
+
+class Guild(_guild.Guild):
+    """
+    Guild with asynchronous loading. Create instances with
+    "await Guild.load(id)" instead of Guild(id). The inherited methods
+    stay synchronous; their asynchronous versions are named fetch_*.
+    Responses are decoded and objects built on the client's worker
+    threads.
+    """
+    @classmethod
+    async def load(cls, id="d14d94bfab9f2532e26c33732cdba602d316f5bf",
+                   client=None):
+        """
+        Load a guild, fetching its details and members concurrently.
+
+        Parameters
+        ----------
+        id : str
+            The unique string identifier for the guild
+        client : AsyncClient
+            (Optional) Client to use instead of the shared one.
+
+        Returns
+        -------
+        guild : Guild
+            The guild, or None if its details could not be fetched. If
+            only the members could not be fetched, accessing members
+            raises AttributeError rather than sending a blocking
+            request.
+        """
+        client = client or get_client()
+        data, members = await asyncio.gather(
+            client.get_json(f"{GUILD_URL}/find?id={id}"),
+            client.get_json(f"{GUILD_URL}/members?guild_id={id}"))
+        if data is None:
+            return None
+        guild = await client.run(cls, id, data=data, members=members)
+        if members is None:
+            guild._members_error = "members request failed"
+        return guild
+
+    async def fetch_brawl_records(self, client=None):
+        """
+        Asynchronous get_brawl_records.
+        """
+        client = client or get_client()
+        data = await client.get_json(
+            f"{GUILD_URL}/brawl_records?guild_id={self.id}")
+        if data is None:
+            return None
+        return data['results']
+
+
+class Brawl(_guild.Brawl):
+    """
+    Brawl with asynchronous loading. Create instances with
+    "await Brawl.load(GUILD_ID, BRAWL_ID)".
+    """
+    @classmethod
+    async def load(cls, GUILD_ID, BRAWL_ID, client=None):
+        """
+        Load a brawl.
+
+        Returns
+        -------
+        brawl : Brawl
+            The brawl, or None if it could not be fetched.
+        """
+        client = client or get_client()
+        data = await client.get_json(f'{TOURNAMENT_URL}/find_brawl?'
+                                     + f'id={BRAWL_ID}&guild_id={GUILD_ID}')
+        if data is None:
+            return None
+        return await client.run(cls, GUILD_ID, BRAWL_ID, brawl_data=data)
+
+
+async def get_guild_list(client=None):
+    client = client or get_client()
+    data = await client.get_json(f"{GUILD_URL}/list")
+    if data is None:
+        return None
+    return data['guilds']
+
+
+async def get_player_guild(player, client=None):
+    client = client or get_client()
+    data = await client.get_json(f"{BASE_URL}/players/details?name={player}")
+    if data is None:
+        return None
+    if data['guild'] is None:
+        return "-"
+    return data['guild']['name']
+
+
+async def fetch_battle(bqid, save_dir=None, client=None):
+    """
+    Asynchronous get_battle_data.
+    """
+    client = client or get_client()
+    return await client.run(get_battle_data, bqid, save_dir)
+
+
+async def load_battle(bqid=None, data=None, save_dir=None, card_data=None,
+                      client=None):
+    """
+    Asynchronously create a Battle, with the same arguments.
+    """
+    client = client or get_client()
+    if data is None:
+        data = await fetch_battle(bqid, save_dir, client=client)
+    if card_data is None:
+        card_data = await get_card_data(client=client)
+    return await client.run(Battle, bqid, data=data, card_data=card_data)
+
+
+async def get_card_data(client=None):
+    """
+    Asynchronous get_cached_card_data.
+    """
+    client = client or get_client()
+    return await client.run(get_cached_card_data)
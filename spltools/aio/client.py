@@ -0,0 +1,102 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from spltools.transport import get_transport
+
+
+class AsyncClient:
+    """
+    Asynchronous client on top of the shared transport. Requests, and
+    the decoding of their responses, are run on a bounded pool of
+    worker threads, so they do not block the event loop, while still
+    going through the transport's connection pool, retries, rate
+    limit, response cache and request coalescing.
+
+    Attributes
+    ----------
+    max_concurrency : int
+        Maximum number of requests running at the same time.
+    """
+    def __init__(self, max_concurrency=16, transport=None):
+        """
+        Parameters
+        ----------
+        max_concurrency : int
+            (Optional) Maximum number of simultaneous requests.
+        transport : Transport
+            (Optional) Transport to use. Defaults to the shared
+            transport returned by get_transport.
+        """
+        self.max_concurrency = max_concurrency
+        self._transport = transport
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix="spltools")
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            return get_transport()
+        return self._transport
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run a blocking function on the client's worker threads.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor,
+                                          partial(func, *args, **kwargs))
+
+    async def get(self, url, **kwargs):
+        """
+        Send a GET request through the transport.
+
+        Returns
+        -------
+        response : requests.Response
+        """
+        return await self.run(self.transport.get, url, **kwargs)
+
+    async def get_json(self, url, **kwargs):
+        """
+        Send a GET request and decode the JSON response, both on a
+        worker thread. Returns None (and prints the status code) if the
+        request failed.
+        """
+        return await self.run(self._get_json, url, **kwargs)
+
+    def _get_json(self, url, **kwargs):
+        response = self.transport.get(url, **kwargs)
+        if response:
+            return response.json()
+        print("Error status code: ", response.status_code)
+        return None
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+_client = None
+_client_lock = Lock()
+
+
+def get_client():
+    """
+    Get the shared AsyncClient, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AsyncClient()
+    return _client
+
+
+def set_client(client):
+    """
+    Use the given AsyncClient for all asynchronous calls.
+    """
+    global _client
+    with _client_lock:
+        _client = client
+    return client
@@ -1 +1,8 @@
-from .battle import get_battle_data, Battle, Team, BattleLogParser
+from .battle import get_battle_data, get_battles, Battle, Team, \
+    BattleLogParser
+from .store import BattleStore, DirectoryBattleStore, SQLiteBattleStore, \
+    open_battle_store, close_battle_stores, migrate_save_dir
+from .events import EVENT_COLUMNS, BattleEvents
+from .teamstats import TEAM_STAT_NAMES, team_stats
+from .analysis import TRACKER_COLUMNS, TrackerTable, battle_tracker, \
+    analyze_archive
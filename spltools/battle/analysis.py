@@ -0,0 +1,206 @@
+from concurrent.futures import ProcessPoolExecutor
+from numpy import array, bincount, char, concatenate, isin, unique, zeros
+from spltools.battle.events import BattleEvents
+from spltools.battle.store import BattleStore, open_battle_store, \
+    _create_store
+
+TRACKER_COLUMNS = ("damage done", "damage taken", "healing done",
+                   "armor repaired", "units killed")
+ATTACK_TYPES = ("melee attack", "ranged attack", "magic attack", "blast",
+                "execute", "retaliate", "spite")
+HEAL_TYPES = ("tank heal", "heal", "triage")
+
+
+def battle_tracker(events):
+    """
+    Compute the BattleLogParser damage tracker for a battle from its
+    event table, without rendering the log.
+
+    Parameters
+    ----------
+    events : BattleEvents
+        Event table of the battle.
+
+    Returns
+    -------
+    uids : numpy.ndarray
+        Unit uids of the monsters of both teams.
+    values : numpy.ndarray
+        Matrix of shape (len(uids), len(TRACKER_COLUMNS)).
+    """
+    details = events.details
+    uids = array([m['uid'] for t in ("team1", "team2")
+                  for m in details[t]['monsters']], dtype=str)
+    values = zeros((len(uids), len(TRACKER_COLUMNS)), dtype=int)
+    if len(uids) == 0 or len(events) == 0:
+        return uids, values
+    order = uids.argsort()
+    sorted_uids = uids[order]
+
+    def accumulate(column, unit, mask, weights=None):
+        mask = mask & isin(unit, uids)
+        rows = order[sorted_uids.searchsorted(unit[mask])]
+        w = None if weights is None else weights[mask]
+        values[:, column] += bincount(rows, weights=w,
+                                      minlength=len(uids)).astype(int)
+
+    types = events.type
+    lower_types = char.lower(types)
+    initiated = events.initiator != ''
+    targeted = events.target != ''
+    # Actions without initiator, e.g. damage from poison or thorns
+    woi = (~initiated & targeted & events.has_damage
+           & isin(types, ATTACK_TYPES[:3]))
+    # Actions with initiator and target but without details
+    it = initiated & targeted & ~events.has_details & events.has_damage
+    attack = it & isin(types, ATTACK_TYPES)
+    heal = it & ~attack & isin(lower_types, HEAL_TYPES)
+    repair = it & ~attack & ~heal & (lower_types == "repair")
+    damage = events.damage
+    accumulate(0, events.initiator, attack, damage)
+    accumulate(1, events.target, attack | woi, damage)
+    accumulate(2, events.initiator, heal, damage)
+    accumulate(3, events.initiator, repair, damage)
+    accumulate(4, events.initiator, it & (events.hp == 0))
+    return uids, values
+
+
+class TrackerTable:
+    """
+    Compact table of aggregated tracker values.
+
+    Attributes
+    ----------
+    keys : numpy.ndarray
+        Sorted keys (card ids or player names).
+    values : numpy.ndarray
+        Matrix of shape (len(keys), len(TRACKER_COLUMNS)).
+    counts : numpy.ndarray
+        Number of monsters (appearances in battles) behind each row.
+    """
+    def __init__(self, keys, values, counts=None):
+        if counts is None:
+            counts = zeros(len(keys), dtype=int) + 1
+        keys, inverse = unique(keys, return_inverse=True)
+        self.keys = keys
+        self.values = zeros((len(keys), len(TRACKER_COLUMNS)), dtype=int)
+        for j in range(len(TRACKER_COLUMNS)):
+            self.values[:, j] = bincount(inverse, weights=values[:, j],
+                                         minlength=len(keys))
+        self.counts = bincount(inverse, weights=counts,
+                               minlength=len(keys)).astype(int)
+
+    @classmethod
+    def merge(cls, tables):
+        """
+        Merge partial tables by summing rows with the same key.
+        """
+        tables = list(tables)
+        if not tables:
+            return cls(array([]), zeros((0, len(TRACKER_COLUMNS))),
+                       zeros(0))
+        return cls(concatenate([t.keys for t in tables]),
+                   concatenate([t.values for t in tables]),
+                   concatenate([t.counts for t in tables]))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def as_dict(self):
+        """
+        Return the table as a dictionary of dictionaries, like
+        BattleLogParser.tracker, with an extra "count" entry.
+        """
+        out = {}
+        for k, v, c in zip(self.keys.tolist(), self.values.tolist(),
+                           self.counts.tolist()):
+            out[k] = dict(zip(TRACKER_COLUMNS, v))
+            out[k]["count"] = c
+        return out
+
+
+def _battle_partials(data):
+    """
+    Tracker rows for one battle, keyed by card id and by player.
+    """
+    events = BattleEvents.from_battle_data(data)
+    uids, values = battle_tracker(events)
+    card_ids, players = [], []
+    for t in ("team1", "team2"):
+        team = events.details[t]
+        for m in team['monsters']:
+            card_ids.append(m['card_detail_id'])
+            players.append(team['player'])
+    return card_ids, players, values
+
+
+def _analyze_chunk(location, bqids):
+    # A store of its own, since connections must not be shared with
+    # the parent process
+    store = _create_store(location)
+    card_ids, players, values = [], [], []
+    skipped = 0
+    for bqid in bqids:
+        data = store.get(bqid)
+        try:
+            c, p, v = _battle_partials(data)
+        except (KeyError, TypeError, ValueError):
+            skipped += 1
+            continue
+        card_ids += c
+        players += p
+        values.append(v)
+    store.close()
+    values = (concatenate(values) if values
+              else zeros((0, len(TRACKER_COLUMNS)), dtype=int))
+    return (TrackerTable(array(card_ids, dtype=int), values),
+            TrackerTable(array(players, dtype=str), values), skipped)
+
+
+def analyze_archive(store, bqids=None, max_workers=None, chunk_size=500):
+    """
+    Compute the damage tracker for every battle in a battle store and
+    aggregate it per card id and per player. Battles are analyzed in
+    chunks by a pool of processes, each returning partial tables that
+    are merged at the end.
+
+    Parameters
+    ----------
+    store : str or BattleStore
+        Battle store location (or store), as accepted by
+        open_battle_store.
+    bqids : iterable of str
+        (Optional) Battle queue ids to analyze. Defaults to all
+        battles in the store.
+    max_workers : int
+        (Optional) Number of processes. Defaults to the number of
+        CPUs. With max_workers=1 everything runs in this process.
+    chunk_size : int
+        (Optional) Number of battles per task.
+
+    Returns
+    -------
+    cards : TrackerTable
+        Tracker values aggregated per card id.
+    players : TrackerTable
+        Tracker values aggregated per player.
+    skipped : int
+        Number of battles that could not be analyzed (e.g. battles
+        without teams).
+    """
+    location = store.path if isinstance(store, BattleStore) else store
+    if bqids is None:
+        bqids = open_battle_store(location).keys()
+    bqids = list(bqids)
+    chunks = [bqids[i:i + chunk_size]
+              for i in range(0, len(bqids), chunk_size)]
+    if max_workers == 1:
+        results = [_analyze_chunk(location, c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_analyze_chunk,
+                                        [location]*len(chunks), chunks))
+    cards = TrackerTable.merge(r[0] for r in results)
+    players = TrackerTable.merge(r[1] for r in results)
+    skipped = sum(r[2] for r in results)
+    return cards, players, skipped
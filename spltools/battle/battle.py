@@ -1,10 +1,45 @@
-from os.path import isfile, isdir
-from os import makedirs
-from spltools.settings import BATTLE_URL, BATTLE_LINK_URL, request_session
-from spltools.carddata import hive_image, get_card_data
+from spltools.settings import BATTLE_URL, BATTLE_LINK_URL
+from spltools.transport import get_transport
+from spltools.transport.cache import _battle_is_final
+from spltools.carddata import hive_image, get_cached_card_data
+from spltools.battle.store import open_battle_store
+from spltools.battle.events import BattleEvents
+from spltools.battle.analysis import TRACKER_COLUMNS, battle_tracker
+from spltools.battle.teamstats import TEAM_STAT_NAMES, _team_stats_matrix
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.exceptions import RequestException
 from numpy import array
-import json
+
+
+def _download_battle(bqid):
+    """
+    Download battle data. Returns the data and None, or None and an
+    error message if the API answered with an error status or with a
+    message instead of a finished battle. Network errors (after the
+    transport's retries) and invalid JSON raise.
+    """
+    url = f"{BATTLE_URL}/result?id={bqid}"
+    response = get_transport().get(url)
+    if not response:
+        return None, (f"Could not fetch battle data for id {bqid}: "
+                      + f"error status code {response.status_code}")
+    data = response.json()
+    if not _battle_is_final(data):
+        # Unknown or unfinished battles are answered with a JSON string
+        return None, f"No battle data for id {bqid}: {data}"
+    return data, None
+
+
+def _stored_battle(store, bqid):
+    """
+    Battle data from a store, or None if it is missing or is not a
+    finished battle (as saved by older versions).
+    """
+    data = store.get(bqid)
+    if not _battle_is_final(data):
+        return None
+    return data
 
 
 def get_battle_data(bqid, save_dir=None):
@@ -15,33 +50,111 @@ def get_battle_data(bqid, save_dir=None):
     ----------
     bqid : str
         Battle queue id
-    save_dir : str
+    save_dir : str or BattleStore
         (Optional) If provided, the data will be saved in this
         directory with file name equal to the bqid. Creates the
-        directory if it does not exist.
+        directory if it does not exist. Paths ending in .sqlite,
+        .sqlite3 or .db are opened as a compressed SQLiteBattleStore
+        instead, and any BattleStore can be passed directly.
+
+    Returns
+    -------
+    data : dict
+        Battle data, or None if the API answered with an error status
+        or the battle is unknown or unfinished. Only finished battles
+        are saved.
+
+    Raises
+    ------
+    requests.RequestException
+        If the battle could not be downloaded.
+    ValueError
+        If the response is not valid JSON.
     """
-    fp = f"{save_dir}/{bqid}"
-    url = f"{BATTLE_URL}/result?id={bqid}"
+    store = None
     if save_dir is not None:
-        if not isdir(save_dir):
-            makedirs(save_dir)
-        if isfile(fp):
-            with open(fp, "r") as iF:
-                data = json.load(iF)
-                return data
-    data = request_session.get(url)
-    if data:
-        data = data.json()
-        if save_dir is not None:
-            with open(fp, "w") as oF:
-                json.dump(data, oF)
-        return data
-    else:
-        return None
+        store = open_battle_store(save_dir)
+        data = _stored_battle(store, bqid)
+        if data is not None:
+            return data
+    data, _ = _download_battle(bqid)
+    if data is not None and store is not None:
+        store.put(bqid, data)
+    return data
+
+
+def get_battles(bqids, max_concurrency=8, save_dir=None):
+    """
+    Downloads data for many battles concurrently, using a bounded
+    thread pool that shares the connection pool of the request
+    session. Battles already saved in save_dir are loaded from the
+    store and yielded first, the rest are yielded as their downloads
+    complete.
+
+    Parameters
+    ----------
+    bqids : iterable of str
+        Battle queue ids. Duplicates are only fetched once.
+    max_concurrency : int
+        (Optional) Maximum number of simultaneous downloads.
+    save_dir : str or BattleStore
+        (Optional) If provided, battles are read from and saved to
+        this store, as in get_battle_data.
+
+    Yields
+    ------
+    bqid : str
+        Battle queue id.
+    data : dict
+        Battle data, or None if the battle could not be fetched.
+    error : str
+        None on success, otherwise a description of the failure.
+    """
+    bqids = list(dict.fromkeys(bqids))
+    store = None
+    if save_dir is not None:
+        store = open_battle_store(save_dir)
+        missing = []
+        for bqid in bqids:
+            data = _stored_battle(store, bqid)
+            if data is not None:
+                yield bqid, data, None
+            else:
+                missing.append(bqid)
+        bqids = missing
+    if not bqids:
+        return
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        futures = {executor.submit(_download_battle, bqid): bqid
+                   for bqid in bqids}
+        for future in as_completed(futures):
+            bqid = futures[future]
+            try:
+                data, error = future.result()
+            except (RequestException, ValueError) as E:
+                data, error = None, (f"Could not fetch battle data for id "
+                                     + f"{bqid}: {E}")
+            if data is not None and store is not None:
+                store.put(bqid, data)
+            yield bqid, data, error
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 class Team:
-    def __init__(self, data, pre_battle=None):
+    def __init__(self, data, pre_battle=None, events=None):
+        """
+        Parameters
+        ----------
+        data : dict
+            Team entry ('team1' or 'team2') of the battle details.
+        pre_battle : list
+            (Optional) Pre-battle actions of the battle.
+        events : BattleEvents
+            (Optional) Event table of the battle. Built from
+            pre_battle if not provided.
+        """
         self.data = data
         self.summoner_id = data['summoner']['card_detail_id']
         self.summoner_level = data['summoner']['level']
@@ -49,97 +162,86 @@ class Team:
         self.monster_levels = [x['level'] for x in data['monsters']]
         self.summoner_uid = data['summoner']['uid']
         self.monster_uids = [x['uid'] for x in data['monsters']]
+        if events is None and pre_battle is not None:
+            events = BattleEvents({'pre_battle': pre_battle, 'rounds': []})
+        self.events = events
         self.pre_battle = pre_battle
 
     def get_names(self, carddata, suffix=''):
         if carddata is None:
-            carddata = get_card_data()
+            carddata = get_cached_card_data()
         return ([carddata[self.summoner_id]['name']+suffix] +
                 [carddata[x]['name']+suffix for x in self.monster_ids])
 
     def hive_images(self, width=100, height=140, card_data=None):
         if card_data is None:
-            card_data = get_card_data()
+            card_data = get_cached_card_data()
         strr = hive_image(self.summoner_id, self.summoner_level, width, height,
                           card_data=card_data)
         for m, l in zip(self.monster_ids, self.monster_levels):
             strr += f" {hive_image(m, l, width, height, card_data=card_data)}"
         return strr
 
-    def stats(self):
+    def stats(self, advice=True):
         """
         Compute the total stats for the team by summing up individual
-        monster stats.
+        monster stats. Use team_stats to compute the stats of many
+        teams at once.
+
+        Parameters
+        ----------
+        advice : bool
+            (Optional) If False, skip generating the advice text.
 
         Returns
         -------
         dict
             A dictionary containing the total values for attack,
             ranged, magic, health, armor, and speed.
+        str
+            Markdown table of the stats followed by advice for the
+            team, None if advice is False.
         """
-        stats_dict = {"attack": 0,
-                      "ranged": 0,
-                      "magic": 0,
-                      "health": 0,
-                      "armor": 0,
-                      "average speed": 0,
-                      "abilities": {}}
+        if self.events is None:
+            pre_battle = {}
+        else:
+            pre_battle = self.events.pre_battle_by_initiator()
+        totals = dict(zip(TEAM_STAT_NAMES,
+                          _team_stats_matrix([(self.data, pre_battle)])[0]))
         abls = []
-        n_monsters = len(self.data['monsters'])
-        atks = array([x['state']['stats'][0] for x in self.data['monsters']])
-        rngs = array([x['state']['stats'][1] for x in self.data['monsters']])
-        mags = array([x['state']['stats'][2] for x in self.data['monsters']])
-        arms = array([x['state']['stats'][3] for x in self.data['monsters']])
-        hlts = array([x['state']['stats'][4] for x in self.data['monsters']])
-        spds = array([x['state']['stats'][5] for x in self.data['monsters']])
-        stats_dict['attack'] = sum(atks)
-        stats_dict['ranged'] = sum(rngs)
-        stats_dict['magic'] = sum(mags)
-        stats_dict['armor'] = sum(arms)
-        stats_dict['health'] = sum(hlts)
-        stats_dict['average speed'] = round(sum(spds)/len(spds), 2)
         for m in self.data['monsters']:
             abls += m['state']['abilities']
-        unique_attackers = sum(atks > 0)
-        unique_rangers = sum(rngs > 0)
-        unique_magics = sum(mags > 0)
-        counter = Counter(abls)
-        stats_dict['abilities'] = dict(counter)
+        stats_dict = {"attack": int(totals['attack']),
+                      "ranged": int(totals['ranged']),
+                      "magic": int(totals['magic']),
+                      "health": int(totals['health']),
+                      "armor": int(totals['armor']),
+                      "average speed": float(totals['average speed']),
+                      "abilities": dict(Counter(abls))}
+        if not advice:
+            return stats_dict, None
+        return stats_dict, self.advice(stats_dict)
+
+    def advice(self, stats_dict):
+        """
+        Markdown table of the team stats, followed by advice on how
+        to make better use of the team's abilities and summoner.
+
+        Parameters
+        ----------
+        stats_dict : dict
+            Team stats as returned by stats.
+
+        Returns
+        -------
+        str
+        """
+        monster_stats = array([x['state']['stats'][:3]
+                               for x in self.data['monsters']]).reshape(-1, 3)
+        unique_attackers, unique_rangers, unique_magics = \
+            (monster_stats > 0).sum(0)
+        counter = stats_dict['abilities']
         summoner_stats = self.data['summoner']['state']['stats']
-        if "Swiftness" in counter:
-            stats_dict['average speed'] += counter["Swiftness"]
-        if "Inspire" in counter:
-            stats_dict['attack'] += counter["Inspire"]*unique_attackers
-        trained = {}
-        # Look for weapons training
-        for a in self.pre_battle:
-            if ('details' in a.keys()
-                    and a['details']['name'] == "Weapons Training"):
-                gs = a['group_state']
-                for m in gs:
-                    other = m['state']['other']
-                    for o in other:
-                        if o[0] == "Trained":
-                            trained[m['monster']] = o[1]
-        for k, v in trained.items():
-            stats_dict['attack'] += v['attack']
-            stats_dict['ranged'] += v['ranged']
-            stats_dict['magic'] += v['magic']
-
-        # Look for summoner buffs for speed, health, armor
-        for a in self.pre_battle:
-            if (a['type'] == "buff" and 'details' in a.keys()
-                    and a['details']['name'] == "Summoner"
-                    and 'stats' in a['details'].keys()
-                    and a['initiator'] == self.summoner_uid):
-                for k, v in a['details']['stats'].items():
-                    if v > 0:
-                        if k == "armor":
-                            stats_dict['armor'] += v*n_monsters
-                        elif k == "speed":
-                            stats_dict['average speed'] += v
-                        elif k == "health":
-                            stats_dict['health'] += v*n_monsters
         strr = ("Attack | Ranged | Magic | Armor | Health | Average Speed\n"
                 + "-|-|-|-|-|-\n"
                 + f"{stats_dict['attack']} | {stats_dict['ranged']} |"
@@ -172,7 +274,7 @@ class Team:
                      + f"{stats_dict['average speed']}. This makes it "
                      + "weak against miss-based defensive strategies.")
 
-        return stats_dict, strr
+        return strr
 
 
 class Battle:
@@ -192,7 +294,8 @@ class Battle:
         self.bqid1 = data['battle_queue_id_1']
         self.bqid2 = data['battle_queue_id_2']
         self.player1, self.player2 = data['player_1'], data['player_2']
-        self.details = json.loads(data['details'])
+        self.events = BattleEvents.from_battle_data(data)
+        self.details = self.events.details
         self.match_type = data['match_type']
         self.format = data['format']
         if self.format is None:
@@ -208,8 +311,10 @@ class Battle:
         self.mana_cap = data['mana_cap']
         self.winner = self.details['winner']
 
-        self.team1 = Team(self.details['team1'], self.details['pre_battle'])
-        self.team2 = Team(self.details['team2'], self.details['pre_battle'])
+        self.team1 = Team(self.details['team1'], self.details['pre_battle'],
+                          events=self.events)
+        self.team2 = Team(self.details['team2'], self.details['pre_battle'],
+                          events=self.events)
         self.names = {}
         t1_names = self.team1.get_names(self.card_data, suffix=" (blue)")
         t2_names = self.team2.get_names(self.card_data, suffix=" (red)")
@@ -236,25 +341,87 @@ class Battle:
         strr += f"Winner | {self.winner}\n"
         if images:
             if card_data is None:
-                card_data = get_card_data()
+                card_data = get_cached_card_data()
             strr += f"##### {self.player1}'s team: \n"
             strr += self.team1.hive_images(card_data=card_data)
             strr += f"\n##### {self.player2}'s team: \n"
             strr += self.team2.hive_images(card_data=card_data)
         return strr
 
-    def get_log(self, markdown=False):
-        BLP = BattleLogParser(self.data, self, markdown=markdown)
+    def tracker(self):
+        """
+        Damage done, damage taken, healing done, armor repaired and
+        units killed for each monster, as in BattleLogParser.tracker,
+        but computed from the event table without rendering the log.
+
+        Returns
+        -------
+        tracker : dict
+            Dictionary with unit names as keys and dictionaries of
+            tracker values as values.
+        """
+        uids, values = battle_tracker(self.events)
+        return {self.names[u]: dict(zip(TRACKER_COLUMNS, v))
+                for u, v in zip(uids.tolist(), values.tolist())}
+
+    def get_log(self, markdown=False, sink=None):
+        """
+        Render the battle log.
+
+        Parameters
+        ----------
+        markdown : bool
+            (Optional) True to render a markdown table.
+        sink : file-like
+            (Optional) If provided, the log is streamed into sink and
+            None is returned.
+
+        Returns
+        -------
+        log : str
+            The battle log, if no sink is given.
+        """
+        BLP = BattleLogParser(self.data, self, markdown=markdown, sink=sink)
         return BLP.text
 
 
 class BattleLogParser():
-    def __init__(self, data, battle, markdown=False):
+    """
+    Renders the battle log as a table, and tracks damage done, damage
+    taken, healing, armor repairs and kills for each unit. The actions
+    are read from the columns of the battle's BattleEvents table; only
+    group states and summoner details are read from the actions
+    themselves.
+
+    By default the whole log is rendered on construction and kept in
+    the text attribute. To avoid holding the log in memory, pass a
+    file-like sink to write the rows to, or use stream=True and
+    iterate over rows() (or call write) yourself. The tracker is
+    complete once the log has been rendered.
+    """
+    def __init__(self, data, battle, markdown=False, sink=None,
+                 stream=False):
+        """
+        Parameters
+        ----------
+        data : dict
+            Battle data.
+        battle : Battle
+            Battle instance for the data.
+        markdown : bool
+            (Optional) True to render a markdown table.
+        sink : file-like
+            (Optional) If provided, the log is written to sink instead
+            of being stored in text.
+        stream : bool
+            (Optional) If True, nothing is rendered on construction.
+        """
         self.data = data
         self.markdown = markdown
-        self.details = json.loads(data['details'])
-        self.pre_battle = self.details['pre_battle']
-        self.rounds = self.details['rounds']
+        self.events = battle.events
+        self.details = battle.details
+        self.pre_battle = self.events.pre_battle
+        self.rounds = self.events.rounds
         self.battle_id = battle.bqid1
         self.url = battle.url
         self.player1 = battle.player1
@@ -264,7 +431,13 @@ class BattleLogParser():
         self.team1 = battle.team1
         self.team2 = battle.team2
         self.separator = "-"*124+"\n"
-        self.text = ""
+        # The event table as lists, so that rows are read as Python
+        # values
+        self._columns = {c: v.tolist()
+                         for c, v in self.events.columns().items()}
+        self.text = None
+        self._rows = []
+        self._rendered = False
         self.ruleset = battle.ruleset
         self.names = battle.names
         self.round = 1
@@ -280,17 +453,61 @@ class BattleLogParser():
              "RNG"])
         if self.markdown:
             self.column_header += "-|-|-|-|-|-|-\n"
+        if not stream:
+            if sink is None:
+                self.text = "".join(self.rows())
+            else:
+                self.write(sink)
+
+    def rows(self):
+        """
+        Render the log, yielding the rows as they are produced. The
+        log can only be rendered once per instance.
+
+        Yields
+        ------
+        row : str
+            A row of the log (or a header line), including the
+            trailing newline.
+        """
+        if self._rendered:
+            raise RuntimeError("The battle log has already been rendered")
+        self._rendered = True
         self.add_header()
+        yield from self._flush()
         self.add_prebattle()
+        yield from self._flush()
         # Round lines
+        start = len(self.pre_battle)
         for r in self.rounds:
-            self.text += "\n"
+            self._write("\n")
             if not self.markdown:
-                self.text += self.separator
-            self.text += self.column_header
+                self._write(self.separator)
+            self._write(self.column_header)
             if not self.markdown:
-                self.text += self.separator
-            self.add_round(r)
+                self._write(self.separator)
+            self.add_round(r, start)
+            start += len(r['actions'])
+            yield from self._flush()
+
+    def write(self, sink):
+        """
+        Render the log into a file-like object.
+
+        Parameters
+        ----------
+        sink : file-like
+            Any object with a write method, e.g. an open file.
+        """
+        for row in self.rows():
+            sink.write(row)
+
+    def _write(self, row):
+        self._rows.append(row)
+
+    def _flush(self):
+        rows, self._rows = self._rows, []
+        return rows
 
     def construct_row(self, columns):
         if self.markdown:
@@ -314,14 +531,14 @@ class BattleLogParser():
                  + f"{', '.join(self.ruleset)}\n"
                  + f"Active elements: {', '.join(self.inactive)}\n")
         if self.markdown:
-            self.text += strr.replace("\n", "\n\n")
+            self._write(strr.replace("\n", "\n\n"))
         else:
-            self.text += strr
+            self._write(strr)
         if not self.markdown:
-            self.text += self.separator
-        self.text += self.column_header
+            self._write(self.separator)
+        self._write(self.column_header)
         if not self.markdown:
-            self.text += self.separator
+            self._write(self.separator)
 
     def get_round_string(self):
         return f"{self.round:>3d}-{self.round_count:<3d}"
@@ -331,71 +548,81 @@ class BattleLogParser():
 
     def add_prebattle(self):
         self.round_count = 1
-        for a in self.pre_battle:
-            self.add_action(a)
+        for i in range(len(self.pre_battle)):
+            self.add_action(i)
             self.round_count += 1
 
-    def add_round(self, round_):
-        actions = round_['actions']
+    def add_round(self, round_, start):
+        """
+        Render a round whose actions start at row start of the event
+        table.
+        """
         self.round = round_['num']
-        for ia, a in enumerate(actions):
-            self.round_count = ia
-            self.add_action(a)
-
-    def add_action(self, action):
-        keys = action.keys()
-        if 'initiator' in keys and "target" in keys:
-            if "details" in keys:
-                self.action_itd(action)
+        for i in range(start, start + len(round_['actions'])):
+            self.round_count = self._columns['index'][i]
+            self.add_action(i)
+
+    def add_action(self, i):
+        """
+        Render the action in row i of the event table.
+        """
+        c = self._columns
+        has_initiator = c['initiator'][i] != ''
+        if has_initiator and c['target'][i] != '':
+            if c['has_details'][i]:
+                self.action_itd(i)
             else:
-                self.action_it(action)
-        elif 'initiator' in keys and "group_state" in keys:
-            self.action_igs(action)
+                self.action_it(i)
+        elif has_initiator and c['has_group_state'][i]:
+            self.action_igs(i)
         else:
-            if 'group_state' in keys:
-                self.action_noi_gs(action)
+            if c['has_group_state'][i]:
+                self.action_noi_gs(i)
             else:
-                self.action_woi(action)
+                self.action_woi(i)
 
-    def action_itd(self, a):
+    def action_itd(self, i):
         # with initiator, target and details
-        columns = [self.get_round_string(), self.names[a['initiator']],
-                   a['details']['name'], self.names[a['target']], '', '', '']
-        self.text += self.construct_row(columns)
+        c = self._columns
+        columns = [self.get_round_string(), self.names[c['initiator'][i]],
+                   c['name'][i], self.names[c['target'][i]], '', '', '']
+        self._write(self.construct_row(columns))
 
-    def action_woi(self, a):
+    def action_woi(self, i):
         # without initiator
-        columns = [self.get_round_string(), '', a['type'],
-                   self.names[a['target']], '', '', '']
-        if "damage" in a.keys():
-            columns[4] = a['damage']
-            if a['type'] in ("melee attack", "ranged attack", "magic attack"):
-                self.tracker[self.names[a['target']]]['damage taken'] \
-                    += a['damage']
-        self.text += self.construct_row(columns)
-
-    def action_it(self, a):
-        iname = self.names[a['initiator']]
-        tname = self.names[a['target']]
-        columns = [self.get_round_string(), iname,
-                   a['type'], tname, '', '', '']
-        if "damage" in a.keys():
-            columns[4] = a['damage']
-            if "hit_chance" in a.keys():
-                columns[5:] = [round(a['hit_chance'], 2), a['hit_val']]
-            if a['type'] in ("melee attack", "ranged attack", "magic attack",
-                             "blast", "execute", "retaliate", "spite"):
-                self.tracker[tname]['damage taken'] \
-                    += a['damage']
-                self.tracker[iname]['damage done'] \
-                    += a['damage']
-            elif a['type'].lower() in ("tank heal", "heal", "triage"):
-                self.tracker[iname]['healing done'] += a['damage']
-            elif a['type'].lower() == "repair":
-                self.tracker[iname]['armor repaired'] += a['damage']
-            if a['state']['stats'][4] == 0:
+        c = self._columns
+        type_, tname = c['type'][i], self.names[c['target'][i]]
+        columns = [self.get_round_string(), '', type_, tname, '', '', '']
+        if c['has_damage'][i]:
+            damage = c['damage'][i]
+            columns[4] = damage
+            if type_ in ("melee attack", "ranged attack", "magic attack"):
+                self.tracker[tname]['damage taken'] += damage
+        self._write(self.construct_row(columns))
+
+    def action_it(self, i):
+        c = self._columns
+        type_ = c['type'][i]
+        iname = self.names[c['initiator'][i]]
+        tname = self.names[c['target'][i]]
+        columns = [self.get_round_string(), iname, type_, tname, '', '', '']
+        if c['has_damage'][i]:
+            damage = c['damage'][i]
+            columns[4] = damage
+            if c['hit_chance'][i] == c['hit_chance'][i]:  # not NaN
+                columns[5:] = [round(c['hit_chance'][i], 2),
+                               c['hit_val'][i]]
+            if type_ in ("melee attack", "ranged attack", "magic attack",
+                         "blast", "execute", "retaliate", "spite"):
+                self.tracker[tname]['damage taken'] += damage
+                self.tracker[iname]['damage done'] += damage
+            elif type_.lower() in ("tank heal", "heal", "triage"):
+                self.tracker[iname]['healing done'] += damage
+            elif type_.lower() == "repair":
+                self.tracker[iname]['armor repaired'] += damage
+            if c['hp'][i] == 0:
                 self.tracker[iname]["units killed"] += 1
-        self.text += self.construct_row(columns)
+        self._write(self.construct_row(columns))
 
     def get_summoner_buff_targets(self, a, rev=False):
         ini = a['initiator']
@@ -411,7 +638,10 @@ class BattleLogParser():
                         else self.team2.monster_uids)]
         return targets
 
-    def action_igs(self, a):
+    def action_igs(self, i):
+        # Group states and summoner details are nested, so they are
+        # read from the action
+        a = self.events.actions[i]
         targets = [self.names[x['monster']] for x in a['group_state']]
         name = a['details']['name']
         columns = [self.get_round_string()] + [""]*6
@@ -425,11 +655,11 @@ class BattleLogParser():
                     targets = self.get_summoner_buff_targets(a, rev=v < 0)
                     columns[1:4] = [self.names[a['initiator']], sum_buff_name,
                                     targets[0]]
-                    self.text += self.construct_row(columns)
+                    self._write(self.construct_row(columns))
                     for t in targets[1:]:
                         columns = [self.get_empty_round_string(), '', '', t,
                                    '', '', '']
-                        self.text += self.construct_row(columns)
+                        self._write(self.construct_row(columns))
             if "ability" in a['details'].keys():
                 columns = [self.get_round_string()] + [""]*6
                 ability = a['details']['ability']
@@ -438,47 +668,48 @@ class BattleLogParser():
                 targets = self.get_summoner_buff_targets(a)
                 columns[1:4] = [self.names[a['initiator']], ability,
                                 targets[0]]
-                self.text += self.construct_row(columns)
+                self._write(self.construct_row(columns))
                 for t in targets[1:]:
                     columns = [self.get_empty_round_string(), '', '', t, '', '',
                                '']
-                    self.text += self.construct_row(columns)
+                    self._write(self.construct_row(columns))
         else:
             type_ = a['type']
             if type_ in ("buff", "halving"):
                 columns[1:3] = [self.names[a['initiator']],
                                 a['details']['name']]
                 columns[3] = targets[0] if len(targets) > 0 else ''
-                self.text += self.construct_row(columns)
+                self._write(self.construct_row(columns))
                 if len(targets) > 1:
                     for t in targets[1:]:
                         columns = [self.get_empty_round_string(), '', '', t,
                                    '', '', '']
-                        self.text += self.construct_row(columns)
+                        self._write(self.construct_row(columns))
             elif type_ == "remove_buff":
                 remove_string = ('remove ' + a['details']['name'])[:16]
                 columns[1:3] = [self.names[a['initiator']], remove_string]
-                self.text += self.construct_row(columns)
+                self._write(self.construct_row(columns))
             else:
                 print("Unhandled:", a)
 
-    def action_noi_gs(self, a):
+    def action_noi_gs(self, i):
+        a = self.events.actions[i]
         targets = [self.names[x['monster']] for x in a['group_state']]
         name = a['type']
         columns = [self.get_round_string(), "", name] + [""]*4
         if len(a['group_state']) == 0:
             if a['type'] in ('zapped', "corrosive"):
-                self.text += self.construct_row(columns)
+                self._write(self.construct_row(columns))
                 return
         if 'dmg' in a['group_state'][0].keys():
             dmg = a['group_state'][0]['dmg']
             columns[3:5] = [targets[0], dmg]
-            self.text += self.construct_row(columns)
+            self._write(self.construct_row(columns))
             for it, t in enumerate(targets[1:]):
                 dmg = a['group_state'][it+1]['dmg']
                 columns = [self.get_empty_round_string(), '', '', t, dmg, '',
                            '']
-                self.text += self.construct_row(columns)
+                self._write(self.construct_row(columns))
         else:
             print("Unhandled:", a)
 
@@ -0,0 +1,140 @@
+import json
+from numpy import array, nan
+
+EVENT_COLUMNS = ("round", "index", "type", "has_details", "has_group_state",
+                 "name", "initiator", "target", "has_damage", "damage",
+                 "hit_chance", "hit_val", "hp")
+
+
+class BattleEvents:
+    """
+    Battle details decoded once, with every pre-battle and round action
+    as a row of a columnar table. Shared by Battle, Team and
+    BattleLogParser.
+
+    Attributes
+    ----------
+    details : dict
+        The decoded battle details.
+    pre_battle : list
+        Pre-battle actions.
+    rounds : list
+        Rounds, each with a num and a list of actions.
+    actions : list
+        All actions in order, aligned with the rows of the table.
+    round : numpy.ndarray
+        Round number, 0 for pre-battle actions.
+    index : numpy.ndarray
+        Index of the action within the pre-battle block or round.
+    type : numpy.ndarray
+        Action type.
+    has_details : numpy.ndarray
+        True if the action has details.
+    has_group_state : numpy.ndarray
+        True if the action has a group state.
+    name : numpy.ndarray
+        Name from the action details, '' if the action has none.
+    initiator, target : numpy.ndarray
+        Unit uids, '' if the action has none.
+    has_damage : numpy.ndarray
+        True if the action has a damage value.
+    damage : numpy.ndarray
+        Damage (or healing/repair) value, 0 if the action has none.
+    hit_chance, hit_val : numpy.ndarray
+        Hit chance and RNG roll, NaN if the action has none.
+    hp : numpy.ndarray
+        Remaining health of the unit in the action state, -1 if the
+        action has no state.
+    """
+    def __init__(self, details):
+        """
+        Parameters
+        ----------
+        details : dict or str
+            Battle details, decoded or as the JSON string from the
+            'details' entry of the battle data.
+        """
+        if isinstance(details, str):
+            details = json.loads(details)
+        self.details = details
+        self.pre_battle = details['pre_battle']
+        self.rounds = details['rounds']
+        self.actions = []
+        rows = {c: [] for c in EVENT_COLUMNS}
+        blocks = [(0, self.pre_battle)]
+        blocks += [(r['num'], r['actions']) for r in self.rounds]
+        for round_, actions in blocks:
+            for ia, a in enumerate(actions):
+                self.actions.append(a)
+                rows['round'].append(round_)
+                rows['index'].append(ia)
+                rows['type'].append(a.get('type', ''))
+                rows['has_details'].append('details' in a)
+                rows['has_group_state'].append('group_state' in a)
+                rows['name'].append(a['details'].get('name', '')
+                                    if 'details' in a else '')
+                rows['initiator'].append(a.get('initiator', ''))
+                rows['target'].append(a.get('target', ''))
+                rows['has_damage'].append('damage' in a)
+                rows['damage'].append(a.get('damage', 0))
+                rows['hit_chance'].append(a.get('hit_chance', nan))
+                rows['hit_val'].append(a.get('hit_val', nan))
+                if 'state' in a and 'stats' in a['state']:
+                    rows['hp'].append(a['state']['stats'][4])
+                else:
+                    rows['hp'].append(-1)
+        self.round = array(rows['round'], dtype=int)
+        self.index = array(rows['index'], dtype=int)
+        self.type = array(rows['type'], dtype=str)
+        self.has_details = array(rows['has_details'], dtype=bool)
+        self.has_group_state = array(rows['has_group_state'], dtype=bool)
+        self.name = array(rows['name'], dtype=str)
+        self.initiator = array(rows['initiator'], dtype=str)
+        self.target = array(rows['target'], dtype=str)
+        self.has_damage = array(rows['has_damage'], dtype=bool)
+        self.damage = array(rows['damage'], dtype=int)
+        self.hit_chance = array(rows['hit_chance'], dtype=float)
+        self.hit_val = array(rows['hit_val'], dtype=float)
+        self.hp = array(rows['hp'], dtype=int)
+        self._pre_battle_by_initiator = None
+
+    @classmethod
+    def from_battle_data(cls, data):
+        """
+        Build the table from the battle data returned by
+        get_battle_data.
+        """
+        return cls(data['details'])
+
+    def __len__(self):
+        return len(self.actions)
+
+    def pre_battle_by_initiator(self):
+        """
+        Pre-battle actions with details, indexed by initiator uid.
+
+        Returns
+        -------
+        index : dict
+            Dictionary with initiator uids as keys and lists of
+            actions as values.
+        """
+        if self._pre_battle_by_initiator is None:
+            index = {}
+            for a in self.pre_battle:
+                if 'initiator' in a and 'details' in a:
+                    index.setdefault(a['initiator'], []).append(a)
+            self._pre_battle_by_initiator = index
+        return self._pre_battle_by_initiator
+
+    def columns(self):
+        """
+        Return the table as a dictionary of arrays.
+        """
+        return {c: getattr(self, c) for c in EVENT_COLUMNS}
+
+    def select(self, mask):
+        """
+        Return the actions (dictionaries) for the rows in a mask.
+        """
+        return [self.actions[i] for i in mask.nonzero()[0]]
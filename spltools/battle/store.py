@@ -0,0 +1,296 @@
+import json
+import sqlite3
+import zlib
+from abc import ABC, abstractmethod
+from os import listdir, makedirs, remove, replace
+from os.path import isdir, isfile, join
+from tempfile import NamedTemporaryFile
+from threading import Lock
+
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+
+class BattleStore(ABC):
+    """
+    Base class for battle data storage backends. Battles are stored
+    by battle queue id.
+    """
+    @abstractmethod
+    def get(self, bqid):
+        """
+        Return the stored battle data, or None if the battle is not in
+        the store.
+        """
+
+    @abstractmethod
+    def put(self, bqid, data):
+        """
+        Store battle data.
+        """
+
+    @abstractmethod
+    def keys(self):
+        """
+        Return a list of all stored battle queue ids.
+        """
+
+    def __contains__(self, bqid):
+        return self.get(bqid) is not None
+
+    def __len__(self):
+        return len(self.keys())
+
+    def close(self):
+        pass
+
+
+class DirectoryBattleStore(BattleStore):
+    """
+    Store with one uncompressed JSON file per battle, named by the
+    battle queue id. This is the layout of the save_dir argument of
+    get_battle_data. Files are written to a temporary file first and
+    then renamed, so an interrupted write never leaves a truncated
+    battle.
+
+    Attributes
+    ----------
+    path : str
+        The directory.
+    """
+    def __init__(self, path):
+        self.path = path
+        makedirs(path, exist_ok=True)
+
+    def get(self, bqid):
+        try:
+            with open(join(self.path, bqid), "r") as iF:
+                return json.load(iF)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # Truncated by an interrupted write of an older version
+            return None
+
+    def put(self, bqid, data):
+        # Temporary files start with a dot, so that keys skips them
+        with NamedTemporaryFile("w", dir=self.path, prefix=".",
+                                suffix=".tmp", delete=False) as oF:
+            json.dump(data, oF)
+        replace(oF.name, join(self.path, bqid))
+
+    def keys(self):
+        return [f for f in listdir(self.path)
+                if not f.startswith(".") and isfile(join(self.path, f))]
+
+    def __contains__(self, bqid):
+        return isfile(join(self.path, bqid))
+
+
+class SQLiteBattleStore(BattleStore):
+    """
+    Store with all battles in a single SQLite file, as zlib-compressed
+    JSON blobs keyed by battle queue id. Safe to use from several
+    threads.
+
+    Attributes
+    ----------
+    path : str
+        The SQLite database file.
+    level : int
+        zlib compression level.
+    """
+    def __init__(self, path, level=6):
+        self.path = path
+        self.level = level
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS battles "
+                + "(bqid TEXT PRIMARY KEY, data BLOB NOT NULL)")
+            self._connection.commit()
+
+    def _encode(self, data):
+        return zlib.compress(json.dumps(data).encode(), self.level)
+
+    def get(self, bqid):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM battles WHERE bqid = ?",
+                (bqid,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, bqid, data):
+        self.put_many([(bqid, data)])
+
+    def put_many(self, items):
+        """
+        Store many battles in a single transaction.
+
+        Parameters
+        ----------
+        items : iterable
+            Pairs of battle queue id and battle data.
+        """
+        rows = [(bqid, self._encode(data)) for bqid, data in items]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO battles (bqid, data) VALUES (?, ?)",
+                rows)
+            self._connection.commit()
+
+    def keys(self):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT bqid FROM battles").fetchall()
+        return [r[0] for r in rows]
+
+    def __contains__(self, bqid):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM battles WHERE bqid = ?", (bqid,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM battles").fetchone()[0]
+
+    def close(self):
+        _forget_store(self)
+        with self._lock:
+            self._connection.close()
+
+
+_open_stores = {}
+_open_stores_lock = Lock()
+
+
+def open_battle_store(location):
+    """
+    Open a battle store. Stores are kept open and shared, so opening
+    the same location twice returns the same store, until the store is
+    closed or close_battle_stores is called.
+
+    Parameters
+    ----------
+    location : str or BattleStore
+        A path ending in .sqlite, .sqlite3 or .db opens a
+        SQLiteBattleStore, any other path a DirectoryBattleStore. A
+        BattleStore is returned as is.
+
+    Returns
+    -------
+    store : BattleStore
+    """
+    if isinstance(location, BattleStore):
+        return location
+    with _open_stores_lock:
+        if location not in _open_stores:
+            _open_stores[location] = _create_store(location)
+        return _open_stores[location]
+
+
+def close_battle_stores():
+    """
+    Close all stores opened by open_battle_store. Opening a location
+    again afterwards creates a new store.
+    """
+    with _open_stores_lock:
+        stores = list(_open_stores.values())
+        _open_stores.clear()
+    for store in stores:
+        store.close()
+
+
+def _forget_store(store):
+    with _open_stores_lock:
+        for location, s in list(_open_stores.items()):
+            if s is store:
+                del _open_stores[location]
+
+
+def _create_store(location):
+    if location.endswith(SQLITE_SUFFIXES):
+        return SQLiteBattleStore(location)
+    return DirectoryBattleStore(location)
+
+
+def _battle_file_bqid(save_dir, name):
+    """
+    Battle queue id of a file in a save_dir directory, or None if the
+    file is not a saved battle. Battles are saved as <bqid> by
+    get_battle_data, or as <bqid>.json.
+    """
+    if name.startswith(".") or not isfile(join(save_dir, name)):
+        return None
+    if name.endswith(".json"):
+        return name[:-len(".json")]
+    if "." in name:
+        return None
+    return name
+
+
+def migrate_save_dir(save_dir, store, remove_files=False, batch_size=1000):
+    """
+    Import all battles saved in a save_dir directory into another
+    store. Files that are not named like saved battles (<bqid> or
+    <bqid>.json) are ignored, and files that do not contain a JSON
+    battle are skipped with a message.
+
+    Parameters
+    ----------
+    save_dir : str
+        Directory with one JSON file per battle.
+    store : str or BattleStore
+        Destination store, as accepted by open_battle_store.
+    remove_files : bool
+        (Optional) If True, delete each file once it has been imported.
+    batch_size : int
+        (Optional) Number of battles written per transaction.
+
+    Returns
+    -------
+    n : int
+        Number of imported battles.
+
+    Raises
+    ------
+    FileNotFoundError
+        If save_dir does not exist.
+    """
+    if not isdir(save_dir):
+        raise FileNotFoundError(f"No such directory: {save_dir!r}")
+    store = open_battle_store(store)
+    files = []
+    for name in sorted(listdir(save_dir)):
+        bqid = _battle_file_bqid(save_dir, name)
+        if bqid is not None:
+            files.append((bqid, name))
+    n = 0
+    for i in range(0, len(files), batch_size):
+        batch, imported = [], []
+        for bqid, name in files[i:i + batch_size]:
+            try:
+                with open(join(save_dir, name), "r") as iF:
+                    data = json.load(iF)
+            except (OSError, ValueError):
+                data = None
+            if not isinstance(data, dict):
+                print(f"Skipping {name}: not a saved battle")
+                continue
+            batch.append((bqid, data))
+            imported.append(name)
+        if isinstance(store, SQLiteBattleStore):
+            store.put_many(batch)
+        else:
+            for bqid, data in batch:
+                store.put(bqid, data)
+        if remove_files:
+            for name in imported:
+                remove(join(save_dir, name))
+        n += len(batch)
+    return n
@@ -0,0 +1,110 @@
+from numpy import array, bincount, maximum, round as np_round, zeros
+from spltools.battle.events import BattleEvents
+
+TEAM_STAT_NAMES = ("attack", "ranged", "magic", "armor", "health",
+                   "average speed")
+
+
+def _team_stats_matrix(teams):
+    """
+    Compute the total stats of many teams in one pass.
+
+    Parameters
+    ----------
+    teams : list
+        Pairs of team data (the 'team1' or 'team2' entry of the
+        battle details) and the pre-battle actions of its battle
+        indexed by initiator (BattleEvents.pre_battle_by_initiator).
+
+    Returns
+    -------
+    matrix : numpy.ndarray
+        Matrix of shape (len(teams), len(TEAM_STAT_NAMES)).
+    """
+    n_teams = len(teams)
+    team_index, monster_stats = [], []
+    swiftness, inspire = zeros(n_teams), zeros(n_teams)
+    trained = zeros((n_teams, 3))
+    # Per-monster armor, speed and health buffs from the summoner
+    buffs = zeros((n_teams, 3))
+    buff_column = {"armor": 0, "speed": 1, "health": 2}
+    for t, (data, pre_battle) in enumerate(teams):
+        for m in data['monsters']:
+            team_index.append(t)
+            monster_stats.append(m['state']['stats'][:6])
+            abilities = m['state']['abilities']
+            swiftness[t] += abilities.count("Swiftness")
+            inspire[t] += abilities.count("Inspire")
+        # As in Team.stats, every Weapons Training of the battle counts,
+        # whichever team initiated it
+        trained_monsters = {}
+        for actions in pre_battle.values():
+            for a in actions:
+                if a['details']['name'] != "Weapons Training":
+                    continue
+                for gs in a['group_state']:
+                    for o in gs['state']['other']:
+                        if o[0] == "Trained":
+                            trained_monsters[gs['monster']] = o[1]
+        for v in trained_monsters.values():
+            trained[t] += (v['attack'], v['ranged'], v['magic'])
+        for a in pre_battle.get(data['summoner']['uid'], ()):
+            if (a['type'] == "buff" and a['details']['name'] == "Summoner"
+                    and 'stats' in a['details'].keys()):
+                for k, v in a['details']['stats'].items():
+                    if v > 0 and k in buff_column:
+                        buffs[t, buff_column[k]] += v
+
+    team_index = array(team_index, dtype=int)
+    monster_stats = array(monster_stats, dtype=float).reshape(-1, 6)
+    sums = zeros((n_teams, 6))
+    for j in range(6):
+        sums[:, j] = bincount(team_index, weights=monster_stats[:, j],
+                              minlength=n_teams)
+    n_monsters = bincount(team_index, minlength=n_teams)
+    attackers = bincount(team_index, weights=monster_stats[:, 0] > 0,
+                         minlength=n_teams)
+
+    matrix = zeros((n_teams, len(TEAM_STAT_NAMES)))
+    matrix[:, 0] = sums[:, 0] + inspire*attackers + trained[:, 0]
+    matrix[:, 1] = sums[:, 1] + trained[:, 1]
+    matrix[:, 2] = sums[:, 2] + trained[:, 2]
+    matrix[:, 3] = sums[:, 3] + buffs[:, 0]*n_monsters
+    matrix[:, 4] = sums[:, 4] + buffs[:, 2]*n_monsters
+    matrix[:, 5] = (np_round(sums[:, 5]/maximum(n_monsters, 1), 2)
+                    + swiftness + buffs[:, 1])
+    return matrix
+
+
+def team_stats(battles):
+    """
+    Compute the total team stats (as in Team.stats) for both teams of
+    many battles in one vectorized pass.
+
+    Parameters
+    ----------
+    battles : iterable
+        Battle instances, or battle data as returned by
+        get_battle_data.
+
+    Returns
+    -------
+    teams : list
+        One (battle index, team key, player) tuple per row, where team
+        key is 'team1' or 'team2'.
+    matrix : numpy.ndarray
+        Matrix of shape (2*number of battles, len(TEAM_STAT_NAMES))
+        with columns in the order of TEAM_STAT_NAMES.
+    """
+    teams, inputs = [], []
+    for i, battle in enumerate(battles):
+        if hasattr(battle, 'events'):
+            events = battle.events
+        else:
+            events = BattleEvents.from_battle_data(battle)
+        pre_battle = events.pre_battle_by_initiator()
+        for key in ("team1", "team2"):
+            data = events.details[key]
+            teams.append((i, key, data.get('player')))
+            inputs.append((data, pre_battle))
+    return teams, _team_stats_matrix(inputs)
@@ -1,2 +1,5 @@
 from .get_card_data import *
+from .cache import CardDataCache, card_data_cache, get_cached_card_data
 from .tools import *
+from .sets import SET_EDITIONS, SetIndex
+from .catalog import STAT_NAMES, CardCatalog
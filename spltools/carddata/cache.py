@@ -0,0 +1,256 @@
+import json
+import logging
+import time
+from os import makedirs, replace
+from os.path import dirname, isfile, join
+from tempfile import NamedTemporaryFile
+from threading import Lock, Thread
+from requests import HTTPError, RequestException
+from spltools.settings import BASE_URL, CACHE_DIR, CARD_DATA_TTL
+from spltools.transport import get_transport
+from spltools.carddata.get_card_data import _discard_soulkeep, _to_card_dict
+
+CACHE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class CardDataCache:
+    """
+    On-disk cache of the Splinterlands card details.
+
+    The card data is kept in memory once loaded, and stored as JSON in
+    a versioned cache file. When the cached data is older than the
+    time-to-live, the data is revalidated in a background thread using
+    a conditional request (ETag / Last-Modified), while readers keep
+    getting the stale data. Only the very first load, when there is no
+    cache file, blocks, and concurrent first loads share one download.
+    The cache file is written without holding the lock that readers
+    need.
+
+    Attributes
+    ----------
+    path : str
+        Path of the cache file.
+    ttl : float
+        Time-to-live of the cached data in seconds.
+    fetched : float
+        Unix time of the last successful download or revalidation.
+    """
+    def __init__(self, path=None, ttl=CARD_DATA_TTL):
+        """
+        Parameters
+        ----------
+        path : str
+            (Optional) Path of the cache file. Defaults to
+            card_data.json in CACHE_DIR.
+        ttl : float
+            (Optional) Time-to-live of the cached data in seconds.
+        """
+        if path is None:
+            path = join(CACHE_DIR, "card_data.json")
+        self.path = path
+        self.ttl = ttl
+        self.fetched = None
+        self._cards = None
+        self._card_dict = None
+        self._etag = None
+        self._last_modified = None
+        self._lock = Lock()
+        # Serializes downloads and cache file writes
+        self._refresh_lock = Lock()
+        self._refresh_thread = None
+
+    def get(self):
+        """
+        Get the card data, downloading it only if there is no cached
+        copy. Stale data is returned immediately while a background
+        refresh is started.
+
+        Returns
+        -------
+        card_dict : dict
+            Dictionary of cards with lookup by id, as returned by
+            get_card_data. None if no data could be retrieved, in which
+            case the error is logged.
+        """
+        with self._lock:
+            if self._card_dict is None:
+                self._load()
+            card_dict = self._card_dict
+            if card_dict is not None and self.is_stale():
+                self._start_refresh()
+        if card_dict is None:
+            try:
+                self._refresh(if_missing=True)
+            except (RequestException, ValueError) as E:
+                logger.error("Could not download card data: %s", E)
+            card_dict = self._card_dict
+        return card_dict
+
+    def get_raw(self):
+        """
+        Like get, but returns the list of cards as returned by
+        get_card_data_raw.
+        """
+        if self.get() is None:
+            return None
+        return self._cards
+
+    def is_stale(self):
+        return (self.fetched is None
+                or time.time() - self.fetched > self.ttl)
+
+    def refresh(self, wait=True):
+        """
+        Revalidate the cached data against the API. Readers keep
+        getting the current data while the request is in flight.
+
+        Parameters
+        ----------
+        wait : bool
+            True (default) to block until the refresh is done. If
+            False, the refresh runs in a background thread and errors
+            are logged.
+
+        Raises
+        ------
+        requests.RequestException
+            With wait=True, if the request failed.
+        ValueError
+            With wait=True, if the response is not valid JSON.
+        """
+        if wait:
+            self._refresh()
+        else:
+            with self._lock:
+                self._start_refresh()
+
+    def invalidate(self):
+        """
+        Mark the cached data as stale, so that the next call to get
+        triggers a refresh.
+        """
+        self.fetched = None
+
+    def _start_refresh(self):
+        if (self._refresh_thread is not None
+                and self._refresh_thread.is_alive()):
+            return
+        self._refresh_thread = Thread(target=self._background_refresh,
+                                      daemon=True)
+        self._refresh_thread.start()
+
+    def _background_refresh(self):
+        try:
+            self._refresh()
+        except (RequestException, ValueError) as E:
+            logger.warning("Could not refresh card data: %s", E)
+
+    def _refresh(self, if_missing=False):
+        # One refresh at a time. Only the state is read and swapped
+        # under the reader lock, the request and the cache file write
+        # run without holding it.
+        with self._refresh_lock:
+            with self._lock:
+                if if_missing and self._card_dict is not None:
+                    # Loaded by the refresh this call waited on
+                    return
+                headers = {}
+                if self._cards is not None:
+                    if self._etag is not None:
+                        headers['If-None-Match'] = self._etag
+                    if self._last_modified is not None:
+                        headers['If-Modified-Since'] = self._last_modified
+            cards, etag, last_modified = self._fetch(headers)
+            with self._lock:
+                snapshot = self._store(cards, time.time(), etag,
+                                       last_modified)
+            self._save(snapshot)
+
+    def _fetch(self, headers):
+        """
+        Perform the (conditional) request. Returns None for the cards
+        if the cached data is still valid, and raises if the request
+        failed.
+        """
+        url = f"{BASE_URL}/cards/get_details"
+        response = get_transport().get(url, headers=headers)
+        if response.status_code == 304:
+            return None, None, None
+        if not response:
+            raise HTTPError(f"Error code {response.status_code}",
+                            response=response)
+        return (_discard_soulkeep(response.json()),
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified'))
+
+    def _store(self, cards, fetched, etag, last_modified):
+        """
+        Swap in new state (under the lock) and return a snapshot of it
+        for _save.
+        """
+        if cards is not None:
+            self._cards = cards
+            self._card_dict = _to_card_dict(cards)
+            self._etag = etag
+            self._last_modified = last_modified
+        self.fetched = fetched
+        return {"version": CACHE_VERSION,
+                "fetched": self.fetched,
+                "etag": self._etag,
+                "last_modified": self._last_modified,
+                "cards": self._cards}
+
+    def _load(self):
+        if not isfile(self.path):
+            return
+        try:
+            with open(self.path, "r") as iF:
+                cache = json.load(iF)
+        except (OSError, ValueError):
+            return
+        if cache.get('version') != CACHE_VERSION:
+            return
+        self._cards = cache['cards']
+        self._card_dict = _to_card_dict(self._cards)
+        self.fetched = cache['fetched']
+        self._etag = cache['etag']
+        self._last_modified = cache['last_modified']
+
+    def _save(self, cache):
+        directory = dirname(self.path) or "."
+        try:
+            makedirs(directory, exist_ok=True)
+            with NamedTemporaryFile("w", dir=directory, delete=False,
+                                    suffix=".tmp") as oF:
+                json.dump(cache, oF)
+            replace(oF.name, self.path)
+        except OSError as E:
+            logger.warning("Could not write card data cache: %s", E)
+
+
+card_data_cache = CardDataCache()
+
+
+def get_cached_card_data():
+    """
+    Retrieve details of all Splinterlands cards through the shared
+    on-disk cache. Returns the same dictionary as get_card_data, but
+    only downloads the card data when the cache is missing, and
+    revalidates it in the background when it is older than
+    CARD_DATA_TTL.
+
+    Parameters
+    ----------
+
+    None
+
+    Returns
+    -------
+
+    card_dict : dict
+        Dictionary of cards with lookup by id, where each value is
+        another dictionary representing a card.
+    """
+    return card_data_cache.get()
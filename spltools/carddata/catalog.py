@@ -0,0 +1,147 @@
+from numpy import arange, array, full, isin, int16, nan, where, zeros
+from spltools.carddata.cache import card_data_cache
+
+STAT_NAMES = ("mana", "attack", "ranged", "magic", "armor", "health",
+              "speed")
+MAX_LEVELS = {1: 10, 2: 8, 3: 6, 4: 4}
+
+
+class CardCatalog:
+    """
+    Columnar card catalog. Card attributes are stored as NumPy arrays
+    aligned with ids, so that filters can be written as vectorized
+    mask expressions, e.g. all red epics with at least 3 ranged at
+    level 5:
+
+        cat = CardCatalog()
+        mask = (cat.mask(color="Red", rarity=3)
+                & (cat.stat("ranged", 5) >= 3))
+        cat.ids[mask]
+
+    Attributes
+    ----------
+    ids : numpy.ndarray
+        Card ids.
+    names : numpy.ndarray
+        Card names.
+    types : numpy.ndarray
+        Card types ("Monster" or "Summoner").
+    rarity : numpy.ndarray
+        Card rarity (1 common, 2 rare, 3 epic, 4 legendary).
+    color : numpy.ndarray
+        Card color ("Red", "Blue", ...).
+    edition : numpy.ndarray
+        First edition listed for the card.
+    tier : numpy.ndarray
+        Card tier, -1 for cards without a tier.
+    max_level : numpy.ndarray
+        Maximum level of the card.
+    mana : numpy.ndarray
+        Mana cost at level 1.
+    stats : numpy.ndarray
+        Stat tensor of shape (cards, levels, stats), with stats in the
+        order of STAT_NAMES. Summoner stats are the same for every
+        level. Entries for levels above a card's max_level are 0 and
+        must be ignored, see reachable.
+    reachable : numpy.ndarray
+        Boolean mask of shape (cards, levels), True where the card can
+        reach the level.
+    """
+    def __init__(self, card_data=None):
+        """
+        Parameters
+        ----------
+        card_data : list or dict
+            (Optional) Card data as returned by get_card_data_raw or
+            get_card_data. If not provided, the cached card data is
+            used.
+        """
+        if card_data is None:
+            card_data = card_data_cache.get_raw()
+        if isinstance(card_data, dict):
+            card_data = list(card_data.values())
+        self.ids = array([c['id'] for c in card_data], dtype=int)
+        self.names = array([c['name'] for c in card_data])
+        self.types = array([c['type'] for c in card_data])
+        self.rarity = array([c['rarity'] for c in card_data], dtype=int)
+        self.color = array([c['color'] for c in card_data])
+        self.edition = array([int(c['editions'].split(",")[0])
+                              for c in card_data], dtype=int)
+        self.tier = array([-1 if c['tier'] is None else c['tier']
+                           for c in card_data], dtype=int)
+        self.max_level = array([MAX_LEVELS[r] for r in self.rarity],
+                               dtype=int)
+        n_levels = max(MAX_LEVELS.values())
+        self.reachable = arange(n_levels) < self.max_level[:, None]
+        self.stats = zeros((len(self.ids), n_levels, len(STAT_NAMES)),
+                           dtype=int16)
+        for i, c in enumerate(card_data):
+            levels = self.max_level[i]
+            for j, s in enumerate(STAT_NAMES):
+                v = c['stats'].get(s, 0)
+                if isinstance(v, list):
+                    v = v[:levels]
+                    self.stats[i, :len(v), j] = v
+                else:
+                    self.stats[i, :levels, j] = v
+        self.mana = self.stats[:, 0, 0].astype(int)
+        self._row = {card_id: i for i, card_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def row(self, card_id):
+        """
+        Row index of a card.
+        """
+        return self._row[card_id]
+
+    def stat(self, name, level):
+        """
+        Values of a stat for all cards at the given level.
+
+        Parameters
+        ----------
+        name : str
+            Stat name, one of STAT_NAMES.
+        level : int
+            Card level, starting at 1.
+
+        Returns
+        -------
+        values : numpy.ndarray
+            Stat values as floats, NaN for cards that can not reach the
+            level (so that comparisons are False for those cards).
+        """
+        return where(self.reachable[:, level - 1],
+                     self.stats[:, level - 1, STAT_NAMES.index(name)], nan)
+
+    def mask(self, ids=None, types=None, rarity=None, color=None,
+             edition=None, tier=None, level=None):
+        """
+        Boolean mask for the cards matching all the given filters.
+        Each filter is a single value or a list of accepted values.
+
+        Parameters
+        ----------
+        level : int
+            (Optional) Only keep cards that can reach this level.
+        """
+        mask = full(len(self.ids), True)
+        for column, value in ((self.ids, ids), (self.types, types),
+                              (self.rarity, rarity), (self.color, color),
+                              (self.edition, edition), (self.tier, tier)):
+            if value is not None:
+                if isinstance(value, (list, tuple, set)):
+                    mask &= isin(column, list(value))
+                else:
+                    mask &= column == value
+        if level is not None:
+            mask &= self.max_level >= level
+        return mask
+
+    def select(self, mask):
+        """
+        Ids of the cards in a mask.
+        """
+        return self.ids[mask]
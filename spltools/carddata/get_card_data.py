@@ -1,4 +1,16 @@
-from spltools.settings import BASE_URL, request_session
+from spltools.settings import BASE_URL
+from spltools.transport import get_transport
+
+
+def _discard_soulkeep(card_data):
+    return [x for x in card_data if x['id'] < 10001]
+
+
+def _to_card_dict(card_data):
+    card_dict = {}
+    for c in card_data:
+        card_dict[c['id']] = c
+    return card_dict
 
 
 def get_card_data_raw():
@@ -19,11 +31,9 @@ def get_card_data_raw():
         a card.
     """
     url = f"{BASE_URL}/cards/get_details"
-    response = request_session.get(url)
+    response = get_transport().get(url)
     if response:
-        card_data = response.json()
-        card_data = [x for x in card_data if x['id'] < 10001]
-        return card_data
+        return _discard_soulkeep(response.json())
     else:
         print(f"Error code {response.status_code}")
 
@@ -50,9 +60,6 @@ def get_card_data():
     """
     raw_data = get_card_data_raw()
     if raw_data is not None:
-        card_dict = {}
-        for c in raw_data:
-            card_dict[c['id']] = c
-        return card_dict
+        return _to_card_dict(raw_data)
     else:
         print("Error in get_card_data_raw()")
@@ -0,0 +1,147 @@
+from numpy import array, asarray, full, zeros
+from spltools.settings import Edition, edition_to_str
+from spltools.carddata.cache import get_cached_card_data
+from spltools.carddata.tools import card_sets, _resolve_set
+
+SET_EDITIONS = (Edition.ALPHA, Edition.BETA, Edition.UNTAMED,
+                Edition.GLADIUS, Edition.CHAOS, Edition.REBELLION)
+
+
+class SetIndex:
+    """
+    Precomputed set membership of all cards. Every card is classified
+    once with card_sets (which agrees with in_set), and stored as a
+    boolean matrix with one row per card and one column per set in
+    SET_EDITIONS.
+
+    Attributes
+    ----------
+    card_ids : numpy.ndarray
+        Sorted array of card ids (the rows of matrix).
+    sets : tuple of Edition
+        The sets (the columns of matrix).
+    set_names : list of str
+        Names of the sets.
+    matrix : numpy.ndarray
+        Boolean matrix of shape (number of cards, number of sets).
+    bitmasks : numpy.ndarray
+        Integer bitmask for each card, where bit j is set if the card
+        is in sets[j].
+    """
+    def __init__(self, card_data=None):
+        """
+        Parameters
+        ----------
+        card_data : dict
+            (Optional) Card data dictionary. If not provided, the
+            cached card data is used.
+        """
+        if card_data is None:
+            card_data = get_cached_card_data()
+        self.sets = SET_EDITIONS
+        self.set_names = [edition_to_str[s.value] for s in self.sets]
+        self._column = {s.value: j for j, s in enumerate(self.sets)}
+        self.card_ids = array(sorted(card_data.keys()), dtype=int)
+        self.matrix = zeros((len(self.card_ids), len(self.sets)), dtype=bool)
+        for i, card_id in enumerate(self.card_ids.tolist()):
+            sets = card_sets(card_id, card_data)
+            self.matrix[i] = [s.value in sets for s in self.sets]
+        self.bitmasks = (self.matrix << array(range(len(self.sets)))).sum(1)
+        self._row = full(self.card_ids.max(initial=-1) + 1, -1, dtype=int)
+        self._row[self.card_ids] = range(len(self.card_ids))
+        self._members = [self.card_ids[self.matrix[:, j]]
+                         for j in range(len(self.sets))]
+
+    def _rows(self, card_ids):
+        card_ids = asarray(card_ids, dtype=int)
+        if card_ids.size == 0:
+            return card_ids
+        if card_ids.min() < 0 or card_ids.max() >= len(self._row):
+            raise KeyError("Unknown card id")
+        rows = self._row[card_ids]
+        if (rows < 0).any():
+            unknown = card_ids[rows < 0]
+            raise KeyError(f"Unknown card ids {unknown.tolist()}")
+        return rows
+
+    def column(self, set_):
+        """
+        Column index of a set given as a name, integer or Edition.
+        """
+        return self._column[_resolve_set(set_)]
+
+    def in_set(self, card_ids, set_):
+        """
+        Vectorized in_set.
+
+        Parameters
+        ----------
+        card_ids : int or array_like
+            Card id or ids.
+        set_ : str, int or Edition
+            The set, as accepted by in_set.
+
+        Returns
+        -------
+        tf : bool or numpy.ndarray
+            True where the card is in the set.
+        """
+        result = self.matrix[self._rows(card_ids), self.column(set_)]
+        if result.ndim == 0:
+            return bool(result)
+        return result
+
+    def mask(self, set_):
+        """
+        Boolean mask over card_ids for the cards in the set.
+        """
+        return self.matrix[:, self.column(set_)]
+
+    def cards_in_set(self, set_):
+        """
+        Array of the ids of all cards in the set.
+        """
+        return self._members[self.column(set_)]
+
+    def sets_for_cards(self, card_ids):
+        """
+        Set membership for a collection of cards.
+
+        Parameters
+        ----------
+        card_ids : array_like
+            Card ids.
+
+        Returns
+        -------
+        membership : numpy.ndarray
+            Boolean matrix of shape (len(card_ids), len(sets)).
+        """
+        return self.matrix[self._rows(card_ids)]
+
+    def sets_for_card(self, card_id):
+        """
+        List of the names of the sets a card belongs to.
+        """
+        row = self.matrix[self._rows([card_id])[0]]
+        return [n for n, tf in zip(self.set_names, row) if tf]
+
+    def set_counts(self, card_ids):
+        """
+        Number of cards in each set for a collection of cards, e.g. a
+        player's collection (duplicates are counted).
+
+        Returns
+        -------
+        counts : dict
+            Dictionary with set names as keys and counts as values.
+        """
+        counts = self.sets_for_cards(card_ids).sum(0)
+        return dict(zip(self.set_names, counts.tolist()))
+
+    def __contains__(self, card_id):
+        return bool(0 <= card_id < len(self._row)
+                    and self._row[card_id] >= 0)
+
+    def __len__(self):
+        return len(self.card_ids)
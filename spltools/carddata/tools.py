@@ -1,6 +1,84 @@
 from spltools.settings import set_str_to_int, edition_to_str, Edition, Tier, \
     HIVE_IMG_URL, ARTWORK_URL
-from spltools.carddata import get_card_data
+from spltools.carddata.cache import get_cached_card_data
+
+
+def _resolve_set(set_):
+    """
+    Validate a set given as a name, an integer or an Edition, and
+    return its integer id.
+    """
+    if isinstance(set_, Edition):
+        set_ = set_.value
+    if (isinstance(set_, str)):
+        if (set_.lower() in set_str_to_int.keys()):
+            return set_str_to_int[set_.lower()]
+        else:
+            valid_set_strings = list(set_str_to_int.keys())
+            raise ValueError(
+                f"Valid set strings are {valid_set_strings}")
+    else:
+        if (set_ not in set_str_to_int.values()):
+            valid_values = list(set_str_to_int.values())
+            raise ValueError(f"Valid set values are {valid_values}")
+    return set_
+
+
+def card_sets(card_id, card_data):
+    """
+    Find the sets a card belongs to, i.e. all sets for which in_set is
+    True, classifying the card only once.
+
+    Parameters
+    ----------
+
+    card_id : int
+        Integer id for the card
+
+    card_data: dict
+        Card data dictionary.
+
+    Returns
+    -------
+
+    sets : set of int
+        Integer ids of the sets (see set_str_to_int).
+
+    """
+    set_values = set(set_str_to_int.values())
+    card_edition_str = card_data[card_id]['editions']
+    if ("," in card_edition_str):  # Alpha/Beta core
+        eds = [int(x) for x in card_edition_str.split(",")]
+        return set_values.intersection(eds)
+
+    card_edition = int(card_edition_str)
+    tier = card_data[card_id]['tier']
+    sets = set_values.intersection([card_edition])
+    if (card_edition == Edition.PROMO.value):
+        if (card_id <= 78):
+            sets.add(Edition.ALPHA.value)
+        elif (tier is None):
+            sets.add(Edition.BETA.value)
+        if (tier in (Tier.UNTAMED.value, Tier.DICE.value)):
+            sets.add(Edition.UNTAMED.value)
+        elif (tier == Tier.CHAOS.value):
+            sets.add(Edition.CHAOS.value)
+        elif (tier == Tier.REBELLION.value):
+            sets.add(Edition.REBELLION.value)
+    elif (card_edition == Edition.REWARDS.value):
+        if (tier is None):
+            sets.add(Edition.BETA.value)
+        elif (tier == Tier.DICE.value):
+            sets.add(Edition.UNTAMED.value)
+        elif (tier == Tier.CHAOS.value):
+            sets.add(Edition.CHAOS.value)
+    elif (card_edition == Edition.DICE.value):
+        sets.add(Edition.UNTAMED.value)
+    elif (card_edition in (Edition.RIFT.value, Edition.SOULBOUND.value)):
+        sets.add(Edition.CHAOS.value)
+    elif (card_edition == Edition.SOULBOUNDRB.value):
+        sets.add(Edition.REBELLION.value)
+    return sets
 
 
 def in_set(card_id, set_, card_data):
@@ -13,10 +91,11 @@ def in_set(card_id, set_, card_data):
     card_id : int
         Integer id for the card
 
-    set_ : str or int
+    set_ : str, int or Edition
         String or integer id for the set (case insensitive). Valid names
         are "alpha", "beta", "untamed", "gladius", "chaos", "rebellion",
-        and valid integers are 0, 1, 4, 6, 7, and 12.
+        and valid integers are 0, 1, 4, 6, 7, and 12. The corresponding
+        Edition members are also accepted.
 
     card_data: dict
         Card data dictionary.
@@ -28,17 +107,7 @@ def in_set(card_id, set_, card_data):
         True if the card is in the set, False otherwise.
 
     """
-    if (isinstance(set_, str)):
-        if (set_.lower() in set_str_to_int.keys()):
-            set_ = set_str_to_int[set_.lower()]
-        else:
-            valid_set_strings = list(set_str_to_int.keys())
-            raise ValueError(
-                f"Valid set strings are {valid_set_strings}")
-    else:
-        if (set_ not in set_str_to_int.values()):
-            valid_values = list(set_str_to_int.values())
-            raise ValueError(f"Valid set values are {valid_values}")
+    set_ = _resolve_set(set_)
 
     card_edition_str = card_data[card_id]['editions']
     if ("," in card_edition_str):  # Alpha/Beta core
@@ -101,7 +170,7 @@ def in_set(card_id, set_, card_data):
 
 def hive_image(card_id, level, width, height, card_data=None):
     if card_data is None:
-        card_data = get_card_data()
+        card_data = get_cached_card_data()
     editions = card_data[card_id]['editions']
     if "," in editions:
         editions = editions.split(",")[-1]
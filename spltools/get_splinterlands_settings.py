@@ -1,4 +1,5 @@
-from spltools.settings import BASE_URL, request_session
+from spltools.settings import BASE_URL
+from spltools.transport import get_transport
 
 
 def get_splinterlands_settings():
@@ -16,7 +17,7 @@ def get_splinterlands_settings():
     settings : dict
         Dictionary with Splinterlands settings
     """
-    response = request_session.get(f"{BASE_URL}/settings")
+    response = get_transport().get(f"{BASE_URL}/settings")
     if response:
         settings = response.json()
         return settings
@@ -1,2 +1,8 @@
-from .guild import Guild, get_guild_list, get_player_guild
-from .brawl import Brawl, BrawlerResults
\ No newline at end of file
+from .guild import Guild, get_guild_list, get_player_guild, \
+    load_guilds
+from .brawl import Brawl, BrawlerResults, PLAYER_FIELDS, GUILD_FIELDS, \
+    brawl_is_finished
+from .resolver import PlayerGuildResolver, player_guild_resolver
+from .warehouse import BrawlWarehouse
+from .history import BrawlHistory, N_FRAYS, DUPLICATE_FRAYS, \
+    unique_frays, fray_names
@@ -1,5 +1,54 @@
+import json
+import zlib
+from functools import cached_property
+from numpy import array
 from spltools.settings import TOURNAMENT_URL, SPS_IMAGE, MERITS_IMAGE, \
-    CROWN_IMAGE, request_session
+    CROWN_IMAGE, BRAWL_FINISHED_STATUS
+from spltools.transport import get_transport
+
+PLAYER_FIELDS = ("player", "wins", "losses", "auto_wins", "total_battles",
+                 "entered_battles", "fray_index")
+GUILD_FIELDS = ("id", "name", "wins", "losses", "draws", "auto_wins",
+                "total_payout", "member_sps_payout", "member_merits_payout")
+
+
+def brawl_is_finished(brawl_data):
+    """
+    Whether find_brawl data is of a finished brawl, whose results can
+    no longer change.
+    """
+    return brawl_data.get('status') == BRAWL_FINISHED_STATUS
+
+
+def _str_dtype(values):
+    return f"U{max([len(v) for v in values] + [1])}"
+
+
+def _player_table(player_data):
+    """
+    Structured array of the player results of a find_brawl response.
+    Missing or null counts are stored as 0.
+    """
+    dtype = [("player", _str_dtype([p['player'] for p in player_data]))]
+    dtype += [(f, "i4") for f in PLAYER_FIELDS[1:]]
+    return array([(p['player'], *[p.get(f) or 0 for f in PLAYER_FIELDS[1:]])
+                  for p in player_data], dtype=dtype)
+
+
+def _guild_table(guilds_data):
+    """
+    Structured array of the guild results of a find_brawl response.
+    Missing or null counts are stored as 0, payouts are kept as the
+    values returned by the API, in object fields.
+    """
+    dtype = [("id", _str_dtype([g['id'] for g in guilds_data])),
+             ("name", _str_dtype([g['name'] for g in guilds_data]))]
+    dtype += [(f, "i4") for f in GUILD_FIELDS[2:6]]
+    dtype += [(f, "O") for f in GUILD_FIELDS[6:]]
+    return array([(g['id'], g['name'],
+                   *[g.get(f) or 0 for f in GUILD_FIELDS[2:6]],
+                   *[g.get(f) for f in GUILD_FIELDS[6:]])
+                  for g in guilds_data], dtype=dtype)
 
 
 class Brawl:
@@ -17,7 +66,8 @@ class Brawl:
     BRAWL_ID : str
         Unique brawl identifier.
     data : dict
-        Dictionary returned by TOURNAMENT_URL/find_brawl.
+        Dictionary returned by TOURNAMENT_URL/find_brawl, None unless
+        the brawl was created with keep_data=True.
     tier : int
         Brawl tier.
     player_data : list
@@ -26,6 +76,13 @@ class Brawl:
         Players in the specified guild that played in this brawl.
     player_results : list
         List of BrawlerResults instances for each player.
+    player_table : numpy.ndarray
+        Structured array with the player results, one row per player
+        and the fields in PLAYER_FIELDS.
+    guild_results : numpy.ndarray
+        Structured array with the guild results, one row per guild
+        and the fields in GUILD_FIELDS. Payouts are object fields with
+        the values returned by the API.
     guilds_data : list
         List of dictionaries containing each guilds results, names, ids
         etc.
@@ -43,51 +100,137 @@ class Brawl:
     guild_crowns, guild_sps, guild_merits : dict
         Dictionaries of crown, sps and merits rewards, with guild
         names as keys.
+
+    Without keep_data, the find_brawl dictionary is released after
+    parsing, and player_data and guilds_data are rebuilt from
+    player_table and guild_results, with the fields in PLAYER_FIELDS and
+    GUILD_FIELDS. With keep_raw, the full player and guild records are
+    kept as compressed JSON instead. The lists and dictionaries are
+    built once, on first access.
     """
-    def __init__(self, GUILD_ID, BRAWL_ID, brawl_data=None):
+    def __init__(self, GUILD_ID, BRAWL_ID, brawl_data=None,
+                 keep_data=False, keep_raw=False):
+        """
+        Parameters
+        ----------
+        GUILD_ID : str
+            Unique string identifier of the guild.
+        BRAWL_ID : str
+            Unique brawl identifier.
+        brawl_data : dict
+            (Optional) Dictionary returned by TOURNAMENT_URL/find_brawl,
+            if already downloaded.
+        keep_data : bool
+            (Optional) If True, keep the find_brawl dictionary as data.
+            By default only the parsed results are kept, which takes a
+            fraction of the memory.
+        keep_raw : bool
+            (Optional) If True, keep the full player and guild records
+            as compressed JSON, so that player_data and guilds_data
+            return every field sent by the API. Not needed with
+            keep_data.
+        """
         self.GUILD_ID = GUILD_ID
         self.BRAWL_ID = BRAWL_ID
         self._get_brawl_data(brawl_data)
         self.tier = self.data['data']['challenge_level'] + 1
-        self.player_data = self.data['players']
-        self.players = [x['player'] for x in self.player_data]
-        self.player_results = [BrawlerResults(x) for x in self.player_data]
-        self.guilds_data = self.data['guilds']
-        self.guild_ids = [x['id'] for x in self.guilds_data]
-        self.guild_names = [x['name'] for x in self.guilds_data]
-        self.guild_wins = {}
-        self.guild_losses = {}
-        self.guild_draws = {}
-        self.guild_auto_wins = {}
-        self.guild_crowns = {}
-        self.guild_sps = {}
-        self.guild_merits = {}
-        for gd in self.guilds_data:
-            gn = gd['name']
-            self.guild_wins[gn] = gd['wins']
-            self.guild_losses[gn] = gd['losses']
-            self.guild_draws[gn] = gd['draws']
-            if ('auto_wins' in gd.keys()):
-                self.guild_auto_wins[gn] = gd['auto_wins']
-            else:
-                self.guild_auto_wins[gn] = 0
-            self.guild_crowns[gn] = gd['total_payout']
-            self.guild_sps[gn] = gd['member_sps_payout']
-            self.guild_merits[gn] = gd['member_merits_payout']
-        self.opponents = []
-        self.opponents_ids = []
-        for gid, gn in zip(self.guild_ids, self.guild_names):
+        self.player_table = _player_table(self.data['players'])
+        self.guild_results = _guild_table(self.data['guilds'])
+        self.GUILD_NAME = None
+        for gid, gn in zip(self.guild_results['id'].tolist(),
+                           self.guild_results['name'].tolist()):
             if (gid == GUILD_ID):
                 self.GUILD_NAME = gn
-            else:
-                self.opponents.append(gn)
-                self.opponents_ids.append(gid)
+        self._records = None
+        if not keep_data:
+            if keep_raw:
+                self._records = zlib.compress(json.dumps(
+                    [self.data['players'], self.data['guilds']]).encode())
+            self.data = None
+
+    @cached_property
+    def _decoded_records(self):
+        if self._records is not None:
+            return json.loads(zlib.decompress(self._records))
+        return ([dict(zip(PLAYER_FIELDS, row))
+                 for row in self.player_table.tolist()],
+                [dict(zip(GUILD_FIELDS, row))
+                 for row in self.guild_results.tolist()])
+
+    @property
+    def player_data(self):
+        if self.data is not None:
+            return self.data['players']
+        return self._decoded_records[0]
+
+    @cached_property
+    def players(self):
+        return self.player_table['player'].tolist()
+
+    @cached_property
+    def player_results(self):
+        return [BrawlerResults(x) for x in self.player_data]
+
+    @property
+    def guilds_data(self):
+        if self.data is not None:
+            return self.data['guilds']
+        return self._decoded_records[1]
+
+    @cached_property
+    def guild_ids(self):
+        return self.guild_results['id'].tolist()
+
+    @cached_property
+    def guild_names(self):
+        return self.guild_results['name'].tolist()
+
+    @cached_property
+    def opponents(self):
+        return [gn for gid, gn in zip(self.guild_ids, self.guild_names)
+                if gid != self.GUILD_ID]
+
+    @cached_property
+    def opponents_ids(self):
+        return [gid for gid in self.guild_ids if gid != self.GUILD_ID]
+
+    def _guild_dict(self, field):
+        return dict(zip(self.guild_names,
+                        self.guild_results[field].tolist()))
+
+    @cached_property
+    def guild_wins(self):
+        return self._guild_dict('wins')
+
+    @cached_property
+    def guild_losses(self):
+        return self._guild_dict('losses')
+
+    @cached_property
+    def guild_draws(self):
+        return self._guild_dict('draws')
+
+    @cached_property
+    def guild_auto_wins(self):
+        return self._guild_dict('auto_wins')
+
+    @cached_property
+    def guild_crowns(self):
+        return self._guild_dict('total_payout')
+
+    @cached_property
+    def guild_sps(self):
+        return self._guild_dict('member_sps_payout')
+
+    @cached_property
+    def guild_merits(self):
+        return self._guild_dict('member_merits_payout')
 
     def _get_brawl_data(self, brawl_data=None):
         if brawl_data is None:
             url = (f'{TOURNAMENT_URL}/find_brawl?id={self.BRAWL_ID}'
                    + f'&guild_id={self.GUILD_ID}')
-            response = request_session.get(url)
+            response = get_transport().get(url)
             if response:
                 self.data = response.json()
         else:
@@ -145,6 +288,8 @@ class BrawlerResults:
     fray_index : int
         The fray the player was in.
     """
+    __slots__ = PLAYER_FIELDS
+
     def __init__(self, data):
         """
         Parameters
@@ -1,8 +1,30 @@
-from spltools.settings import BASE_URL, GUILD_URL, request_session
+from concurrent.futures import ThreadPoolExecutor
+from spltools.settings import BASE_URL, GUILD_URL
+from spltools.transport import get_transport
+
+
+def _detail(name):
+    """Property for a guild detail, downloaded on first access
+    """
+    attr = f"_{name}"
+
+    def getter(self):
+        if not self._load() and getattr(self, attr) is None:
+            raise AttributeError(f"Guild {self.id} has no {name}: details "
+                                 + f"could not be loaded ({self._load_error})")
+        return getattr(self, attr)
+
+    def setter(self, value):
+        setattr(self, attr, value)
+    return property(getter, setter)
 
 
 class Guild:
-    """Class for holding guild data
+    """Class for holding guild data. The guild details and members are
+    loaded from the API on first access, so e.g.
+    Guild(id).get_brawl_records() only sends one request. A failed
+    download is reported once and not retried, except by hydrate, and
+    the attributes it would have set raise AttributeError.
 
     Attributes
     ----------
@@ -23,50 +45,116 @@ class Guild:
 
     """
 
-    def __init__(self, id="d14d94bfab9f2532e26c33732cdba602d316f5bf"):
+    def __init__(self, id="d14d94bfab9f2532e26c33732cdba602d316f5bf",
+                 data=None, members=None):
         """Initialize the class from the unique guild identifier
 
         Parameters
         ----------
         id : str
             The unique string identifier for the guild
+        data : dict
+            (Optional) Guild details from /guilds/find, if already
+            downloaded.
+        members : list
+            (Optional) Member data from /guilds/members, if already
+            downloaded.
         """
-        response = request_session.get(f"{GUILD_URL}/find?id={id}")
-        if response:
-            data = response.json()
-        else:
-            print("Error status code: ", response.status_code)
-            return
+        self.id = id
+        self._loaded = False
+        self._load_error = None
+        self._members_error = None
+        self._name = None
+        self._motto = None
+        self._numMembers = None
+        self._rating = None
+        self._rank = None
+        self._members = None
+        if data is not None:
+            self._setup(id, data)
+        if members is not None:
+            self._set_members(members)
 
-        # Setup guild class:
+    def _setup(self, id, data):
+        """Setup guild class from the /guilds/find data
+        """
         self.id = id
-        self.name = data['name']
-        self.motto = data['motto']
-        self.numMembers = data['num_members']
-        self.members = None
-        self.rating = int(data['rating'])
-        self.rank = int(data['rank'])
+        self._name = data['name']
+        self._motto = data['motto']
+        self._numMembers = data['num_members']
+        self._rating = int(data['rating'])
+        self._rank = int(data['rank'])
+        self._loaded = True
+
+    def _load(self):
+        """Download the guild details if they are not loaded yet
+        """
+        if not self._loaded and self._load_error is None:
+            response = get_transport().get(f"{GUILD_URL}/find?id={self.id}")
+            if response:
+                self._setup(self.id, response.json())
+            else:
+                print("Error status code: ", response.status_code)
+                self._load_error = f"error status code {response.status_code}"
+        return self._loaded
+
+    name = _detail("name")
+    motto = _detail("motto")
+    numMembers = _detail("numMembers")
+    rating = _detail("rating")
+    rank = _detail("rank")
+
+    @property
+    def members(self):
+        self._getMembers()
+        if self._members is None:
+            raise AttributeError(f"Guild {self.id} has no members: members "
+                                 + "could not be loaded "
+                                 + f"({self._members_error})")
+        return self._members
+
+    @members.setter
+    def members(self, members):
+        self._members = members
+
+    def hydrate(self):
+        """Download the guild details and members now, retrying failed
+        downloads
+        """
+        self._load_error = None
+        self._members_error = None
+        self._load()
         self._getMembers()
+        return self
+
+    def _set_members(self, data):
+        """Set the active members from the /guilds/members data
+        """
+        self._members = [p['player'] for p in data
+                         if p['status'] == "active"]
+        return self._members
 
     def _getMembers(self):
         """Get guild member data
         """
-        if self.members is None:
+        if self._members is None:
+            if self._members_error is not None:
+                return []
             url = f"{GUILD_URL}/members?guild_id={self.id}"
-            response = request_session.get(url)
+            response = get_transport().get(url)
             if response:
                 data = response.json()
             else:
                 print("Error status code: ", response.status_code)
+                self._members_error = ("error status code "
+                                       + f"{response.status_code}")
                 return []
-            self.members = [p['player'] for p in data
-                            if p['status'] == "active"]
-            return self.members
-        return self.members
+            return self._set_members(data)
+        return self._members
 
     def get_brawl_records(self):
         url = f"{GUILD_URL}/brawl_records?guild_id={self.id}"
-        response = request_session.get(url)
+        response = get_transport().get(url)
         if response:
             data = response.json()['results']
             return data
@@ -79,9 +167,40 @@ class Guild:
         return strr
 
 
+def load_guilds(ids, max_concurrency=8):
+    """Load the details and members of many guilds concurrently, one
+    task per guild. The API serves details and members from separate
+    endpoints, so a guild takes two requests, and only one if its
+    details cannot be loaded. The requests share the connection pool of
+    the transport.
+
+    Parameters
+    ----------
+    ids : list of str
+        Unique guild identifiers
+    max_concurrency : int
+        (Optional) Maximum number of simultaneous requests
+
+    Returns
+    -------
+    guilds : list
+        Loaded Guild instances, in the order of ids
+    """
+    guilds = [Guild(id) for id in ids]
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for _ in executor.map(_load_guild, guilds):
+            pass
+    return guilds
+
+
+def _load_guild(guild):
+    if guild._load():
+        guild._getMembers()
+
+
 def get_guild_list():
     url = f"{GUILD_URL}/list"
-    response = request_session.get(url)
+    response = get_transport().get(url)
     if response:
         data = response.json()['guilds']
         return data
@@ -92,7 +211,7 @@ def get_guild_list():
 
 def get_player_guild(player):
     url = f"{BASE_URL}/players/details?name={player}"
-    response = request_session.get(url)
+    response = get_transport().get(url)
     if response:
         data = response.json()
         if data['guild'] is None:
@@ -0,0 +1,254 @@
+from numpy import argsort, bincount, empty, lexsort, maximum, ones, \
+    ravel_multi_index, unique, zeros
+
+# Number of frays per brawl tier, and frays that are the same as
+# another one (same restrictions), by tier
+N_FRAYS = {3: 18, 4: 21, 5: 25}
+DUPLICATE_FRAYS = {3: {4: 3, 8: 7},
+                   4: {2: 1, 4: 3, 7: 6, 9: 8, 12: 11, 14: 13},
+                   5: {4: 3, 8: 7, 10: 9, 11: 9, 15: 14, 16: 14}}
+
+HISTORY_DTYPE = [("tier", "i1"), ("fray", "i1"), ("player", "i4"),
+                 ("guild", "i4"), ("wins", "i2"), ("losses", "i2"),
+                 ("auto_wins", "i2")]
+GROUP_KEYS = ("tier", "fray", "player", "guild")
+
+
+def unique_frays(tier):
+    """
+    Frays (numbered from 1) of a tier, without the duplicate ones.
+    """
+    return [f for f in range(1, N_FRAYS[tier] + 1)
+            if f not in DUPLICATE_FRAYS[tier]]
+
+
+def fray_names(tier):
+    """
+    Names of the unique frays of a tier, e.g. "3+4" for fray 3 merged
+    with its duplicate fray 4.
+    """
+    names = {f: f"{f}" for f in unique_frays(tier)}
+    for k, v in DUPLICATE_FRAYS[tier].items():
+        names[v] += f"+{k}"
+    return names
+
+
+def _fray_map():
+    """
+    Lookup table from (tier, fray) to the unique fray.
+    """
+    table = zeros((max(N_FRAYS) + 1, max(N_FRAYS.values()) + 1), dtype=int)
+    for tier, n in N_FRAYS.items():
+        for f in range(1, n + 1):
+            table[tier, f] = DUPLICATE_FRAYS[tier].get(f, f)
+    return table
+
+
+class BrawlHistory:
+    """
+    Columnar history of brawler results, for aggregating many brawls.
+
+    Every player result of every added brawl is one row of a growable
+    structured array (see HISTORY_DTYPE), with players and guilds
+    interned to integer ids and frays merged with their duplicates.
+    Aggregates are computed with vectorized group-by operations.
+
+    Attributes
+    ----------
+    players : list
+        Player names, indexed by player id.
+    guild_ids, guild_names : list
+        Guild ids and names, indexed by guild number.
+    """
+    _fray_table = _fray_map()
+
+    def __init__(self, capacity=1024):
+        """
+        Parameters
+        ----------
+        capacity : int
+            (Optional) Initial number of rows to allocate.
+        """
+        self._rows = empty(capacity, dtype=HISTORY_DTYPE)
+        self._n = 0
+        self.players = []
+        self._player_index = {}
+        self.guild_ids = []
+        self.guild_names = []
+        self._guild_index = {}
+
+    def __len__(self):
+        return self._n
+
+    def _intern_player(self, player):
+        i = self._player_index.get(player)
+        if i is None:
+            i = self._player_index[player] = len(self.players)
+            self.players.append(player)
+        return i
+
+    def _intern_guild(self, guild_id, guild_name):
+        i = self._guild_index.get(guild_id)
+        if i is None:
+            i = self._guild_index[guild_id] = len(self.guild_ids)
+            self.guild_ids.append(guild_id)
+            self.guild_names.append(guild_name)
+        return i
+
+    def _reserve(self, n):
+        if self._n + n > len(self._rows):
+            rows = empty(max(2*len(self._rows), self._n + n),
+                         dtype=HISTORY_DTYPE)
+            rows[:self._n] = self._rows[:self._n]
+            self._rows = rows
+
+    def add_brawl(self, brawl):
+        """
+        Add the player results of a Brawl.
+        """
+        results = brawl.player_table
+        n = len(results)
+        self._reserve(n)
+        guild = self._intern_guild(brawl.GUILD_ID, brawl.GUILD_NAME)
+        rows = self._rows[self._n:self._n + n]
+        rows['tier'] = brawl.tier
+        rows['guild'] = guild
+        rows['player'] = [self._intern_player(p)
+                          for p in results['player'].tolist()]
+        rows['fray'] = self._fray_table[brawl.tier,
+                                        results['fray_index'] + 1]
+        for k in ("wins", "losses", "auto_wins"):
+            rows[k] = results[k]
+        self._n += n
+
+    def add_brawls(self, brawls):
+        for brawl in brawls:
+            self.add_brawl(brawl)
+
+    @property
+    def rows(self):
+        """
+        The rows as a structured array (a view, do not modify).
+        """
+        return self._rows[:self._n]
+
+    def _select(self, tier=None, fray=None, guild_id=None):
+        rows = self.rows
+        mask = ones(len(rows), dtype=bool)
+        if tier is not None:
+            mask &= rows['tier'] == tier
+        if fray is not None:
+            mask &= rows['fray'] == fray
+        if guild_id is not None:
+            mask &= rows['guild'] == self._guild_index.get(guild_id, -1)
+        return rows[mask]
+
+    def aggregate(self, by=("player",), tier=None, fray=None,
+                  guild_id=None):
+        """
+        Sum wins, losses and auto-wins per group.
+
+        Parameters
+        ----------
+        by : tuple of str
+            Columns to group by, from GROUP_KEYS.
+        tier, fray : int
+            (Optional) Only use rows of this tier and/or unique fray.
+        guild_id : str
+            (Optional) Only use rows of players brawling for this
+            guild.
+
+        Returns
+        -------
+        groups : dict
+            Arrays with one entry per group: the group columns (player
+            and guild as integer ids, see players and guild_ids),
+            "wins", "losses", "auto_wins", "count" (number of rows)
+            and "first" (index of the first row of the group).
+        """
+        rows = self._select(tier, fray, guild_id)
+        columns = [rows[k].astype(int) for k in by]
+        if len(rows) == 0:
+            keys = zeros(0, dtype=int)
+        else:
+            keys = ravel_multi_index(columns,
+                                     [c.max() + 1 for c in columns])
+        _, first, inverse = unique(keys, return_index=True,
+                                   return_inverse=True)
+        n_groups = len(first)
+        groups = {k: c[first] for k, c in zip(by, columns)}
+        for k in ("wins", "losses", "auto_wins"):
+            groups[k] = bincount(inverse, weights=rows[k],
+                                 minlength=n_groups).astype(int)
+        groups["count"] = bincount(inverse, minlength=n_groups)
+        groups["first"] = first
+        return groups
+
+    def best_in_fray(self, tier):
+        """
+        The player with the most wins in each unique fray of a tier.
+        Ties go to the player that appears first in that fray.
+
+        Returns
+        -------
+        best : list
+            (fray name, player, wins, losses, winrate) tuples in fray
+            order, skipping frays without data.
+        """
+        groups = self.aggregate(("fray", "player"), tier=tier)
+        # Sort by fray, then most wins, then first appearance
+        order = lexsort((groups["first"], -groups["wins"], groups["fray"]))
+        frays = groups["fray"][order]
+        is_best = zeros(len(order), dtype=bool)
+        is_best[:1] = True
+        is_best[1:] = frays[1:] != frays[:-1]
+        names = fray_names(tier)
+        best = []
+        for j in order[is_best]:
+            w, l = int(groups["wins"][j]), int(groups["losses"][j])
+            best.append((names[groups["fray"][j]],
+                         self.players[groups["player"][j]],
+                         w, l, w/max(1, w + l)))
+        return best
+
+    def best_in_tier(self, tier, n=25, min_battles_fraction=0.5):
+        """
+        The players with the best winrate in a tier, over all frays.
+        Only players with at least min_battles_fraction times the
+        battles of the most active player are ranked.
+
+        Returns
+        -------
+        best : list
+            (player, wins, losses, winrate) tuples, best first.
+        """
+        groups = self.aggregate(("player",), tier=tier)
+        wins, losses = groups["wins"], groups["losses"]
+        if len(wins) == 0:
+            return []
+        battles = wins + losses
+        wrs = wins/maximum(battles, 1)
+        ranked = wrs.copy()
+        ranked[battles < min_battles_fraction*battles.max()] = 0
+        order = argsort(-ranked, kind="stable")[:n]
+        return [(self.players[groups["player"][j]], int(wins[j]),
+                 int(losses[j]), float(wrs[j])) for j in order]
+
+    def player_totals(self, tier=None):
+        """
+        Total wins, losses and number of brawls per player name.
+        """
+        groups = self.aggregate(("player",), tier=tier)
+        return {self.players[p]: (w, l, c) for p, w, l, c in zip(
+            groups["player"].tolist(), groups["wins"].tolist(),
+            groups["losses"].tolist(), groups["count"].tolist())}
+
+    def guild_totals(self, tier=None):
+        """
+        Total wins, losses and number of brawler results per guild
+        name.
+        """
+        groups = self.aggregate(("guild",), tier=tier)
+        return {self.guild_names[g]: (w, l, c) for g, w, l, c in zip(
+            groups["guild"].tolist(), groups["wins"].tolist(),
+            groups["losses"].tolist(), groups["count"].tolist())}
@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from spltools.settings import PLAYER_GUILD_TTL
+from spltools.guild.guild import get_player_guild
+
+
+class PlayerGuildResolver:
+    """
+    Resolves player names to guild names, with concurrent lookups and
+    a time-to-live cache. Players without a guild resolve to "-", like
+    get_player_guild.
+
+    Attributes
+    ----------
+    ttl : float
+        Time-to-live of resolved guilds in seconds.
+    max_concurrency : int
+        Maximum number of simultaneous /players/details requests.
+    """
+    def __init__(self, ttl=PLAYER_GUILD_TTL, max_concurrency=8):
+        self.ttl = ttl
+        self.max_concurrency = max_concurrency
+        self._cache = {}
+        self._lock = Lock()
+
+    def _cached(self, player, now):
+        entry = self._cache.get(player)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        return None
+
+    def seed(self, player, guild):
+        """
+        Store a known guild for a player.
+        """
+        with self._lock:
+            self._cache[player] = (time.time() + self.ttl, guild)
+
+    def seed_from_brawl(self, brawl):
+        """
+        Store the guild of all players of a Brawl, without any request.
+        Note that this is the guild the players were in during the
+        brawl, so only seed from current brawls. Does nothing if the
+        brawl has no guild name.
+
+        Parameters
+        ----------
+        brawl : Brawl
+        """
+        if brawl.GUILD_NAME is None:
+            return
+        expires = time.time() + self.ttl
+        with self._lock:
+            for player in brawl.players:
+                self._cache[player] = (expires, brawl.GUILD_NAME)
+
+    def resolve(self, players):
+        """
+        Resolve many players, requesting the ones not in the cache
+        concurrently.
+
+        Parameters
+        ----------
+        players : iterable of str
+            Player names.
+
+        Returns
+        -------
+        guilds : dict
+            Guild names with player names as keys. None for players
+            that could not be looked up.
+        """
+        players = list(dict.fromkeys(players))
+        now = time.time()
+        guilds = {}
+        with self._lock:
+            for p in players:
+                guilds[p] = self._cached(p, now)
+        missing = [p for p in players if guilds[p] is None]
+        if missing:
+            with ThreadPoolExecutor(
+                    max_workers=self.max_concurrency) as executor:
+                results = list(executor.map(get_player_guild, missing))
+            expires = time.time() + self.ttl
+            with self._lock:
+                for p, g in zip(missing, results):
+                    guilds[p] = g
+                    if g is not None:
+                        self._cache[p] = (expires, g)
+        return guilds
+
+    def __getitem__(self, player):
+        return self.resolve([player])[player]
+
+    def clear(self):
+        with self._lock:
+            self._cache = {}
+
+
+# Resolver shared by the examples and scripts
+player_guild_resolver = PlayerGuildResolver()
@@ -0,0 +1,299 @@
+import json
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from os import makedirs
+from os.path import join
+from threading import Lock
+from spltools.settings import CACHE_DIR, TOURNAMENT_URL
+from spltools.transport import get_transport
+from spltools.guild.guild import Guild
+from spltools.guild.brawl import Brawl, brawl_is_finished
+
+
+def _download_brawl(guild_id, brawl_id):
+    url = (f'{TOURNAMENT_URL}/find_brawl?id={brawl_id}'
+           + f'&guild_id={guild_id}')
+    response = get_transport().get(url)
+    if response:
+        return response.json()
+    print("Error status code: ", response.status_code)
+    return None
+
+
+class BrawlWarehouse:
+    """
+    Local SQLite store of brawl data, refreshed incrementally from the
+    guild brawl records.
+
+    Brawls are stored as zlib-compressed find_brawl JSON, keyed and
+    indexed by guild id and brawl id, with the tier as an indexed
+    column. Only finished brawls are stored. For every guild the
+    warehouse keeps a mark with a high-water brawl id, below which all
+    brawls of the guild are stored, and the time of the last refresh.
+    A refresh walks the brawl records (newest first) down to the mark
+    only, so brawls that were in progress or failed to download are
+    fetched again by the next refresh, and guilds that were refreshed
+    recently can be skipped. A refresh of many guilds keeps a
+    checkpoint of the guilds still to do, so an interrupted run is
+    resumed where it stopped.
+
+    Attributes
+    ----------
+    path : str
+        The SQLite database file.
+    max_concurrency : int
+        Maximum number of simultaneous brawl downloads.
+    level : int
+        zlib compression level.
+    """
+    def __init__(self, path=None, max_concurrency=8, level=6):
+        """
+        Parameters
+        ----------
+        path : str
+            (Optional) The SQLite database file. Defaults to
+            brawls.sqlite in CACHE_DIR.
+        max_concurrency : int
+            (Optional) Maximum number of simultaneous downloads.
+        level : int
+            (Optional) zlib compression level.
+        """
+        if path is None:
+            makedirs(CACHE_DIR, exist_ok=True)
+            path = join(CACHE_DIR, "brawls.sqlite")
+        self.path = path
+        self.max_concurrency = max_concurrency
+        self.level = level
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(
+                "CREATE TABLE IF NOT EXISTS brawls "
+                + "(guild_id TEXT NOT NULL, brawl_id TEXT NOT NULL, "
+                + "tier INTEGER, fetched REAL, data BLOB NOT NULL, "
+                + "PRIMARY KEY (guild_id, brawl_id));"
+                + "CREATE INDEX IF NOT EXISTS brawls_tier ON brawls (tier);"
+                + "CREATE TABLE IF NOT EXISTS marks "
+                + "(guild_id TEXT PRIMARY KEY, newest_brawl_id TEXT, "
+                + "refreshed REAL);"
+                + "CREATE TABLE IF NOT EXISTS checkpoint "
+                + "(position INTEGER PRIMARY KEY, guild_id TEXT NOT NULL);")
+            self._connection.commit()
+
+    def _execute(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def brawl_ids(self, guild_id):
+        """
+        Return the set of stored brawl ids of a guild.
+        """
+        rows = self._execute("SELECT brawl_id FROM brawls WHERE guild_id = ?",
+                             (guild_id,))
+        return {r[0] for r in rows}
+
+    def mark(self, guild_id):
+        """
+        Return the mark of a guild: a dictionary with the high-water
+        brawl id (the newest brawl that is stored along with all older
+        ones, None if there is none) and the unix time of the last
+        refresh, or None if the guild was never refreshed.
+        """
+        rows = self._execute(
+            "SELECT newest_brawl_id, refreshed FROM marks WHERE guild_id = ?",
+            (guild_id,))
+        if not rows:
+            return None
+        return {"newest_brawl_id": rows[0][0], "refreshed": rows[0][1]}
+
+    def checkpoint(self):
+        """
+        Return the guild ids left by an interrupted refresh, or an empty
+        list.
+        """
+        rows = self._execute(
+            "SELECT guild_id FROM checkpoint ORDER BY position")
+        return [r[0] for r in rows]
+
+    def _put(self, guild_id, brawl_id, data):
+        blob = zlib.compress(json.dumps(data).encode(), self.level)
+        tier = data['data']['challenge_level'] + 1
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO brawls "
+                + "(guild_id, brawl_id, tier, fetched, data) "
+                + "VALUES (?, ?, ?, ?, ?)",
+                (guild_id, brawl_id, tier, time.time(), blob))
+            self._connection.commit()
+
+    def refresh_guild(self, guild_id, min_age=0):
+        """
+        Download the finished brawls of a guild that are newer than its
+        mark and not stored yet.
+
+        Parameters
+        ----------
+        guild_id : str
+            Unique guild identifier.
+        min_age : float
+            (Optional) Skip the guild if it was refreshed less than
+            min_age seconds ago.
+
+        Returns
+        -------
+        n : int
+            Number of new brawls, or None if the brawl records or a
+            brawl could not be downloaded.
+        """
+        mark = self.mark(guild_id)
+        if mark is not None and time.time() - mark["refreshed"] < min_age:
+            return 0
+        records = Guild(guild_id).get_brawl_records()
+        if records is None:
+            return None
+        newest = None if mark is None else mark["newest_brawl_id"]
+        # Brawl ids newer than the mark, oldest first
+        candidates = []
+        for r in records:
+            if r['tournament_id'] == newest:
+                break
+            candidates.append(r['tournament_id'])
+        candidates.reverse()
+        new = [b for b in candidates if (guild_id, b) not in self]
+        n, failed = 0, False
+        stored = set(candidates) - set(new)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as ex:
+            for brawl_id, data in zip(new, ex.map(
+                    lambda b: _download_brawl(guild_id, b), new)):
+                if data is None:
+                    failed = True
+                    continue
+                if not brawl_is_finished(data):
+                    continue
+                self._put(guild_id, brawl_id, data)
+                stored.add(brawl_id)
+                n += 1
+        # Move the mark up to the newest brawl below which everything is
+        # stored
+        for brawl_id in candidates:
+            if brawl_id not in stored:
+                break
+            newest = brawl_id
+        # A failed refresh does not count as recent for min_age
+        refreshed = time.time()
+        if failed:
+            refreshed = 0 if mark is None else mark["refreshed"]
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO marks "
+                + "(guild_id, newest_brawl_id, refreshed) VALUES (?, ?, ?)",
+                (guild_id, newest, refreshed))
+            self._connection.commit()
+        if failed:
+            return None
+        return n
+
+    def refresh(self, guild_ids=None, resume=True, min_age=0):
+        """
+        Download the new brawls of many guilds. Progress is
+        checkpointed after every guild; guilds that failed stay in the
+        checkpoint and are retried by the next run.
+
+        Parameters
+        ----------
+        guild_ids : list of str
+            (Optional) Unique guild identifiers, duplicates are
+            refreshed once. Defaults to the guilds left in the
+            checkpoint.
+        resume : bool
+            (Optional) If True and an interrupted refresh left a
+            checkpoint, continue it before the given guilds.
+        min_age : float
+            (Optional) Skip guilds refreshed less than min_age seconds
+            ago.
+
+        Returns
+        -------
+        n : int
+            Number of new brawls.
+        """
+        pending = self.checkpoint() if resume else []
+        pending = list(dict.fromkeys(pending + list(guild_ids or [])))
+        with self._lock:
+            self._connection.execute("DELETE FROM checkpoint")
+            self._connection.executemany(
+                "INSERT INTO checkpoint (position, guild_id) VALUES (?, ?)",
+                enumerate(pending))
+            self._connection.commit()
+        total = 0
+        for guild_id in pending:
+            n = self.refresh_guild(guild_id, min_age)
+            if n is None:
+                print(f"Could not refresh guild {guild_id}")
+                continue
+            total += n
+            with self._lock:
+                self._connection.execute(
+                    "DELETE FROM checkpoint WHERE guild_id = ?", (guild_id,))
+                self._connection.commit()
+        return total
+
+    def get(self, guild_id, brawl_id):
+        """
+        Return the stored find_brawl data, or None.
+        """
+        rows = self._execute(
+            "SELECT data FROM brawls WHERE guild_id = ? AND brawl_id = ?",
+            (guild_id, brawl_id))
+        if not rows:
+            return None
+        return json.loads(zlib.decompress(rows[0][0]))
+
+    def brawl(self, guild_id, brawl_id):
+        """
+        Return a stored brawl as a Brawl, or None.
+        """
+        data = self.get(guild_id, brawl_id)
+        if data is None:
+            return None
+        return Brawl(guild_id, brawl_id, brawl_data=data)
+
+    def keys(self, guild_id=None, tier=None):
+        """
+        Return the (guild id, brawl id) pairs of the stored brawls,
+        optionally only for one guild and/or tier.
+        """
+        sql = "SELECT guild_id, brawl_id FROM brawls"
+        conditions, parameters = [], []
+        if guild_id is not None:
+            conditions.append("guild_id = ?")
+            parameters.append(guild_id)
+        if tier is not None:
+            conditions.append("tier = ?")
+            parameters.append(tier)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return [tuple(r) for r in self._execute(sql, parameters)]
+
+    def brawls(self, guild_id=None, tier=None):
+        """
+        Iterate over the stored brawls as Brawl instances, optionally
+        only for one guild and/or tier.
+        """
+        for key in self.keys(guild_id, tier):
+            yield self.brawl(*key)
+
+    def __contains__(self, key):
+        return bool(self._execute(
+            "SELECT 1 FROM brawls WHERE guild_id = ? AND brawl_id = ?",
+            key))
+
+    def __len__(self):
+        return self._execute("SELECT COUNT(*) FROM brawls")[0][0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
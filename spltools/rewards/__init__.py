@@ -0,0 +1,33 @@
+from importlib import import_module
+from .chests import ITEMS, RARITIES, Chest, MinorChest, MajorChest, \
+    UltimateChest
+
+# The NumPy-backed tools are imported on first access, so that the
+# chest classes can be used without importing numpy
+_lazy_names = {"simulate_chests": "simulate", "summarize": "simulate",
+               "chest_pmf": "exact", "convolve_pmf": "exact",
+               "pmf_power": "exact", "total_pmf": "exact",
+               "prob_at_least": "exact", "pmf_mean": "exact",
+               "CHEST_TYPES": "grid", "CHEST_FIELDS": "grid",
+               "RANGE_FIELDS": "grid", "chest_table": "grid",
+               "evaluate_grid": "grid", "DRAW_BASE_COSTS": "optimize",
+               "DRAW_GOLD_FOIL_CHANCE": "optimize",
+               "batch_costs": "optimize", "completion_factors": "optimize",
+               "purchase_options": "optimize",
+               "optimize_glint": "optimize"}
+
+__all__ = ["ITEMS", "RARITIES", "Chest", "MinorChest", "MajorChest",
+           "UltimateChest"] + list(_lazy_names)
+
+
+def __getattr__(name):
+    if name not in _lazy_names:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = import_module(f"{__name__}.{_lazy_names[name]}")
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_names))
@@ -1,3 +1,10 @@
+# Items of a chest draw, as returned by Chest.average_draw
+ITEMS = ("legendary_potions", "alchemy_potions", "energy", "jackpot",
+         "merits", "common_rf", "rare_rf", "epic_rf", "legendary_rf",
+         "common_gf", "rare_gf", "epic_gf", "legendary_gf")
+RARITIES = ("common", "rare", "epic", "legendary")
+
+
 class Chest:
     """
     Base class for chests.
@@ -124,7 +131,8 @@ class Chest:
 
     def average_draw(self):
         """
-        Returns the average result of a single draw.
+        Returns the average result of a single draw. Every amount is
+        the middle of its (minimum, maximum) range.
 
         Parameters
         ----------
@@ -143,7 +151,7 @@ class Chest:
         out['alchemy_potions'] = out['legendary_potions']
         out['energy'] = self.energy_chance*0.5*sum(self.energy_multiplier)
         out['jackpot'] = self.jackpot_chance
-        out['merits'] = self.merit_chance*sum(self.merits_multiplier)
+        out['merits'] = self.merit_chance*0.5*sum(self.merits_multiplier)
         out['common_rf'] = (self.card_chance*self.common_card_chance
                             * (1 - self.gold_foil_chance)
                             * 0.5*sum(self.common_multiplier_rf))
@@ -170,6 +178,63 @@ class Chest:
                                * 0.5*sum(self.legendary_multiplier_gf))
         return out
 
+    def outcomes(self):
+        """
+        Possible outcomes of opening one chest. A chest holds exactly
+        one kind of reward: a potion, energy, a jackpot, merits or a
+        card of some rarity and foil.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        outcomes : list
+            (item, probability, (minimum, maximum)) tuples, one per
+            item in ITEMS, where the amount of the item is uniformly
+            distributed between minimum and maximum (inclusive).
+        """
+        out = [("legendary_potions", 0.5*self.potion_chance,
+                self.potion_multiplier),
+               ("alchemy_potions", 0.5*self.potion_chance,
+                self.potion_multiplier),
+               ("energy", self.energy_chance, self.energy_multiplier),
+               ("jackpot", self.jackpot_chance, (1, 1)),
+               ("merits", self.merit_chance, self.merits_multiplier)]
+        for foil, foil_chance in (("rf", 1 - self.gold_foil_chance),
+                                  ("gf", self.gold_foil_chance)):
+            for rarity in RARITIES:
+                card_chance = getattr(self, f"{rarity}_card_chance")
+                out.append((f"{rarity}_{foil}",
+                            self.card_chance*card_chance*foil_chance,
+                            getattr(self, f"{rarity}_multiplier_{foil}")))
+        return out
+
+    def simulate(self, n_chests, n_trials=1, seed=None, processes=1):
+        """
+        Simulate opening n_chests chests, n_trials times.
+
+        Parameters
+        ----------
+        n_chests : int
+            Number of chests opened in each trial.
+        n_trials : int
+            (Optional) Number of trials.
+        seed : int
+            (Optional) Seed of the random numbers.
+        processes : int
+            (Optional) Number of processes to simulate with.
+
+        Returns
+        -------
+        totals : dict
+            Arrays of shape (n_trials,) with the total amount of each
+            item, with item names (see ITEMS) as keys.
+        """
+        from spltools.rewards.simulate import simulate_chests
+        return simulate_chests(self, n_chests, n_trials, seed, processes)
+
 
 class MinorChest(Chest):
     """
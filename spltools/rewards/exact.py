@@ -0,0 +1,131 @@
+from numpy import asarray, clip, convolve, zeros
+from numpy.fft import irfft, rfft
+from spltools.rewards.chests import ITEMS, RARITIES
+
+# Above this result length convolutions are done with FFTs
+FFT_THRESHOLD = 2000
+
+
+def _expand_items(items):
+    """
+    Item names for an item, a rarity ("legendary" for both foils),
+    "potions" or a list of those.
+    """
+    if isinstance(items, str):
+        items = [items]
+    out = []
+    for item in items:
+        if item in RARITIES:
+            out += [f"{item}_rf", f"{item}_gf"]
+        elif item == "potions":
+            out += ["legendary_potions", "alchemy_potions"]
+        elif item in ITEMS:
+            out.append(item)
+        else:
+            raise ValueError(f"Unknown item {item!r}")
+    return list(dict.fromkeys(out))
+
+
+def chest_pmf(chest, items):
+    """
+    Probability mass function of the amount of some items in a single
+    chest.
+
+    Parameters
+    ----------
+    chest : Chest
+        The chest type (with batch and potions applied).
+    items : str or list of str
+        Item name (see ITEMS), rarity name (both foils), "potions" or
+        a list of those, whose amounts are added.
+
+    Returns
+    -------
+    pmf : numpy.ndarray
+        pmf[k] is the probability of getting k of the items.
+    """
+    items = _expand_items(items)
+    outcomes = [o for o in chest.outcomes() if o[0] in items]
+    pmf = zeros(max([o[2][1] for o in outcomes] + [0]) + 1)
+    pmf[0] = 1.0
+    # A chest holds only one kind of reward, so the outcomes exclude
+    # each other
+    for _, p, (low, high) in outcomes:
+        pmf[0] -= p
+        pmf[low:high + 1] += p/(high - low + 1)
+    pmf[0] = max(pmf[0], 0.0)
+    return pmf
+
+
+def convolve_pmf(a, b):
+    """
+    Probability mass function of the sum of two independent variables.
+    Uses FFTs for long inputs; the small negative values they may give
+    are clipped to zero.
+    """
+    n = len(a) + len(b) - 1
+    if min(len(a), len(b)) < 64 or n < FFT_THRESHOLD:
+        return convolve(a, b)
+    size = 1 << (n - 1).bit_length()
+    out = irfft(rfft(a, size)*rfft(b, size), size)[:n]
+    return clip(out, 0, None)
+
+
+def pmf_power(pmf, n):
+    """
+    Probability mass function of the sum of n independent draws from
+    a distribution, by exponentiation by squaring.
+
+    Parameters
+    ----------
+    pmf : numpy.ndarray
+        Distribution of a single draw.
+    n : int
+        Number of draws.
+
+    Returns
+    -------
+    pmf : numpy.ndarray
+    """
+    pmf = asarray(pmf, dtype=float)
+    result = zeros(1) + 1.0
+    while n > 0:
+        if n & 1:
+            result = convolve_pmf(result, pmf)
+        n >>= 1
+        if n:
+            pmf = convolve_pmf(pmf, pmf)
+    return result
+
+
+def total_pmf(chest, n_chests, items):
+    """
+    Exact probability mass function of the total amount of some items
+    in n_chests chests.
+
+    Parameters
+    ----------
+    chest : Chest
+        The chest type (with batch and potions applied).
+    n_chests : int
+        Number of chests.
+    items : str or list of str
+        Items, as accepted by chest_pmf.
+
+    Returns
+    -------
+    pmf : numpy.ndarray
+        pmf[k] is the probability of getting k of the items in total.
+    """
+    return pmf_power(chest_pmf(chest, items), n_chests)
+
+
+def prob_at_least(pmf, k):
+    """
+    Probability of a total of at least k.
+    """
+    return float(min(1.0, max(0.0, pmf[k:].sum())))
+
+
+def pmf_mean(pmf):
+    return float((pmf*range(len(pmf))).sum())
@@ -0,0 +1,127 @@
+from numpy import array, asarray, ceil, stack, zeros
+from spltools.rewards.chests import ITEMS, RARITIES, MinorChest, \
+    MajorChest, UltimateChest
+
+CHEST_TYPES = (MinorChest, MajorChest, UltimateChest)
+# Scalar parameters, then (minimum, maximum) amount ranges
+CHEST_FIELDS = ("potion_chance", "merit_chance", "energy_chance",
+                "jackpot_chance", "card_chance", "gold_foil_chance",
+                "base_cost") + tuple(f"{r}_card_chance" for r in RARITIES)
+RANGE_FIELDS = (("potion_multiplier", "energy_multiplier",
+                 "merits_multiplier")
+                + tuple(f"{r}_multiplier_rf" for r in RARITIES)
+                + tuple(f"{r}_multiplier_gf" for r in RARITIES))
+
+
+def chest_table(chest_types=CHEST_TYPES):
+    """
+    Parameters of chest types as a structured array, one row per type,
+    for the first batch and without potions.
+
+    Parameters
+    ----------
+    chest_types : tuple
+        (Optional) Chest subclasses.
+
+    Returns
+    -------
+    table : numpy.ndarray
+        Structured array with the fields in CHEST_FIELDS, and for
+        every field in RANGE_FIELDS a field of shape (2,) with the
+        minimum and maximum.
+    """
+    dtype = [(f, "f8") for f in CHEST_FIELDS]
+    dtype += [(f, "f8", (2,)) for f in RANGE_FIELDS]
+    rows = []
+    for chest_type in chest_types:
+        chest = chest_type(batch=1, legendary_potion=False,
+                           alchemy_potion=False)
+        rows.append(tuple(getattr(chest, f) for f in CHEST_FIELDS)
+                    + tuple(getattr(chest, f) for f in RANGE_FIELDS))
+    return array(rows, dtype=dtype)
+
+
+def _potion_flags(potions):
+    """
+    (legendary_potion, alchemy_potion) arrays from bools or pairs.
+    """
+    flags = [(p, p) if isinstance(p, (bool, int)) else tuple(p)
+             for p in potions]
+    flags = array(flags, dtype=bool).reshape(-1, 2)
+    return flags[:, 0], flags[:, 1]
+
+
+def evaluate_grid(chest_types=CHEST_TYPES, batches=(1,), potions=(True,),
+                  item_values=None):
+    """
+    Evaluate every combination of chest type, batch and potion use in
+    one vectorized pass. The expected amounts are those of
+    Chest.average_draw and the costs those of batch_costs (Chest.cost
+    rounded up to whole glint).
+
+    Parameters
+    ----------
+    chest_types : tuple
+        (Optional) Chest subclasses.
+    batches : list of int
+        (Optional) Batch numbers.
+    potions : list
+        (Optional) Potion settings: a bool (both potions on or off) or
+        a (legendary_potion, alchemy_potion) pair.
+    item_values : dict
+        (Optional) Value of each item in ITEMS. Items not listed are
+        worth nothing. Without values only amounts and costs are
+        computed.
+
+    Returns
+    -------
+    result : dict
+        "expected": array of shape (types, batches, potions,
+        len(ITEMS)) with the average amount of each item per chest,
+        "value": average value per chest, "cost": glint cost per chest
+        and "value_per_glint", each of shape (types, batches,
+        potions).
+    """
+    table = chest_table(chest_types)
+    batches = asarray(batches, dtype=float)
+    legendary, alchemy = _potion_flags(potions)
+    # Axes: chest type, batch, potion setting
+    t = (slice(None), None, None)
+    p = (None, None, slice(None))
+    # Potions as in Chest._apply_potions
+    chance = {r: table[f"{r}_card_chance"][t] for r in RARITIES}
+    doubled = legendary[p]*(chance["epic"] + chance["legendary"])
+    rarity = {"common": chance["common"] - doubled,
+              "rare": chance["rare"],
+              "epic": chance["epic"]*(1 + legendary[p]),
+              "legendary": chance["legendary"]*(1 + legendary[p])}
+    gold = table["gold_foil_chance"][t]*(1 + alchemy[p])
+
+    def mean(field):
+        return 0.5*table[field].sum(axis=1)[t]
+
+    card = table["card_chance"][t]
+    expected = {
+        "legendary_potions": (0.5*table["potion_chance"][t]
+                              * mean("potion_multiplier")),
+        "energy": table["energy_chance"][t]*mean("energy_multiplier"),
+        "jackpot": table["jackpot_chance"][t],
+        "merits": table["merit_chance"][t]*mean("merits_multiplier"),
+    }
+    expected["alchemy_potions"] = expected["legendary_potions"]
+    for r in RARITIES:
+        expected[f"{r}_rf"] = (card*rarity[r]*(1 - gold)
+                               * mean(f"{r}_multiplier_rf"))
+        expected[f"{r}_gf"] = (card*rarity[r]*gold
+                               * mean(f"{r}_multiplier_gf"))
+    shape = (len(table), len(batches), len(legendary))
+    expected = stack([expected[k] + zeros(shape) for k in ITEMS], axis=-1)
+    # Rounded up to whole glint, as batch_costs
+    cost = (ceil(table["base_cost"][t]*1.5**(batches[None, :, None] - 1))
+            + zeros(shape))
+    result = {"expected": expected, "cost": cost}
+    if item_values is not None:
+        values = array([item_values.get(k, 0) for k in ITEMS], dtype=float)
+        result["value"] = expected @ values
+        result["value_per_glint"] = result["value"]/cost
+    return result
@@ -0,0 +1,190 @@
+from math import ceil
+from numpy import array, cumsum, full, inf, zeros
+from spltools.rewards.chests import ITEMS, RARITIES
+from spltools.rewards.grid import CHEST_TYPES
+
+# Glint cost of the first rarity draw of each rarity, 1.5 times the
+# card prices of 150, 750, 7500 and 35000 as in the glint strategy
+# example, and the chance of a drawn card being gold foil
+DRAW_BASE_COSTS = {"common": 225, "rare": 1125, "epic": 11250,
+                   "legendary": 52500}
+DRAW_GOLD_FOIL_CHANCE = 0.04
+
+
+def batch_costs(base_cost, n):
+    """
+    Glint cost of the first n batches of a purchase, where every batch
+    costs 1.5 times the previous one, rounded up to whole glint (as
+    evaluate_grid).
+    """
+    return array([ceil(base_cost*1.5**b) for b in range(n)], dtype=int)
+
+
+def completion_factors(completion):
+    """
+    Relative value of regular foil cards of each rarity given how
+    complete the collection is, as in the glint strategy example: a
+    rarity that is complete for a fraction x is worth (1 - x) divided
+    by the average of (1 - x) over the rarities.
+
+    Parameters
+    ----------
+    completion : dict
+        Completion fraction (0 to 1) with rarities as keys.
+
+    Returns
+    -------
+    factors : dict
+        Value factors with rarities as keys.
+    """
+    norm = sum(1 - completion.get(r, 0) for r in RARITIES)/len(RARITIES)
+    if norm == 0:
+        return {r: 0.0 for r in RARITIES}
+    return {r: (1 - completion.get(r, 0))/norm for r in RARITIES}
+
+
+def _weighted_values(item_values, completion):
+    values = {k: item_values.get(k, 0) for k in ITEMS}
+    if completion is not None:
+        for r, f in completion_factors(completion).items():
+            values[f"{r}_rf"] *= f
+    return values
+
+
+def _chest_moments(chest, values):
+    """
+    Mean and variance of the value of one chest. A chest holds one kind
+    of reward, so the item values exclude each other.
+    """
+    mean, second = 0.0, 0.0
+    for item, p, (low, high) in chest.outcomes():
+        w = values[item]
+        n = high - low + 1
+        amount_mean = 0.5*(low + high)
+        amount_second = (n*n - 1)/12 + amount_mean**2
+        mean += p*w*amount_mean
+        second += p*w*w*amount_second
+    return mean, second - mean*mean
+
+
+def purchase_options(item_values, completion=None, chest_types=CHEST_TYPES,
+                     potions=True):
+    """
+    Glint purchases with the mean and variance of their value. Chest
+    values follow the distribution of Chest.outcomes, whose mean is
+    that of Chest.average_draw and evaluate_grid.
+
+    Parameters
+    ----------
+    item_values : dict
+        Value of each item in ITEMS. Items not listed are worth
+        nothing.
+    completion : dict
+        (Optional) Collection completion by rarity, which scales the
+        values of regular foil cards (see completion_factors).
+    chest_types : tuple
+        (Optional) Chest subclasses to buy from.
+    potions : bool
+        (Optional) Whether chests are opened with legendary and alchemy
+        potions.
+
+    Returns
+    -------
+    options : list
+        One dictionary per purchase with "name", "base_cost", "mean"
+        and "variance".
+    """
+    values = _weighted_values(item_values, completion)
+    options = []
+    for chest_type in chest_types:
+        chest = chest_type(batch=1, legendary_potion=potions,
+                           alchemy_potion=potions)
+        mean, variance = _chest_moments(chest, values)
+        options.append({"name": chest_type.__name__,
+                        "base_cost": chest.base_cost,
+                        "mean": mean, "variance": variance})
+    g = DRAW_GOLD_FOIL_CHANCE
+    for r in RARITIES:
+        rf, gf = values[f"{r}_rf"], values[f"{r}_gf"]
+        options.append({"name": f"{r.capitalize()}Draw",
+                        "base_cost": DRAW_BASE_COSTS[r],
+                        "mean": (1 - g)*rf + g*gf,
+                        "variance": g*(1 - g)*(gf - rf)**2})
+    return options
+
+
+def optimize_glint(budget, item_values, completion=None, risk_aversion=0.0,
+                   chest_types=CHEST_TYPES, potions=True):
+    """
+    Find the purchases with the best total value for a glint budget.
+
+    Every chest type and rarity draw is bought in batches whose cost
+    grows by a factor 1.5 per batch (see batch_costs), so this is a
+    knapsack problem with one group of choices (how many batches) per
+    purchase. It is solved exactly by dynamic programming over the
+    budget in whole glint.
+
+    Parameters
+    ----------
+    budget : int
+        Glint to spend.
+    item_values : dict
+        Value of each item in ITEMS.
+    completion : dict
+        (Optional) Collection completion by rarity, see
+        completion_factors.
+    risk_aversion : float
+        (Optional) With 0 (default) the mean value is maximized,
+        otherwise mean - risk_aversion*variance.
+    chest_types : tuple
+        (Optional) Chest subclasses to buy from.
+    potions : bool
+        (Optional) Whether chests are opened with potions.
+
+    Returns
+    -------
+    plan : dict
+        "purchases": number of batches by purchase name, "cost": glint
+        spent, "mean" and "variance" of the total value, and
+        "objective".
+    """
+    budget = int(budget)
+    options = purchase_options(item_values, completion, chest_types,
+                               potions)
+    best = zeros(budget + 1)
+    choices = []
+    cum_costs = []
+    for option in options:
+        unit = option["mean"] - risk_aversion*option["variance"]
+        # Enough batches to exceed any budget
+        n = 1
+        while option["base_cost"]*(1.5**n - 1)/0.5 <= budget:
+            n += 1
+        costs = cumsum(batch_costs(option["base_cost"], n))
+        costs = costs[costs <= budget]
+        new = best.copy()
+        choice = zeros(budget + 1, dtype="i2")
+        for k, c in enumerate(costs, 1):
+            candidate = full(budget + 1, -inf)
+            candidate[c:] = best[:budget + 1 - c] + k*unit
+            better = candidate > new
+            new[better] = candidate[better]
+            choice[better] = k
+        best = new
+        choices.append(choice)
+        cum_costs.append(costs)
+
+    purchases = {}
+    remaining = budget
+    for option, choice, costs in zip(options[::-1], choices[::-1],
+                                     cum_costs[::-1]):
+        k = int(choice[remaining])
+        purchases[option["name"]] = k
+        if k:
+            remaining -= int(costs[k - 1])
+    purchases = {o["name"]: purchases[o["name"]] for o in options}
+    mean = sum(o["mean"]*purchases[o["name"]] for o in options)
+    variance = sum(o["variance"]*purchases[o["name"]] for o in options)
+    return {"purchases": purchases, "cost": budget - remaining,
+            "mean": mean, "variance": variance,
+            "objective": float(best[budget])}
@@ -0,0 +1,114 @@
+from concurrent.futures import ProcessPoolExecutor
+from numpy import arange, array, bincount, clip, concatenate, \
+    percentile, repeat, zeros
+from numpy.random import SeedSequence, default_rng
+from spltools.rewards.chests import ITEMS
+
+# Number of chests drawn per chunk of trials, to bound the memory use
+CHUNK_CHESTS = 2**22
+
+
+def _outcome_arrays(chest):
+    """
+    Outcome probabilities (with "no reward" last) and amount ranges.
+    """
+    outcomes = chest.outcomes()
+    p = array([o[1] for o in outcomes] + [0.0])
+    p[-1] = max(0.0, 1 - p[:-1].sum())
+    p = clip(p, 0, None)
+    p /= p.sum()
+    lows = array([o[2][0] for o in outcomes], dtype=int)
+    highs = array([o[2][1] for o in outcomes], dtype=int)
+    return p, lows, highs
+
+
+def _simulate_chunk(p, lows, highs, n_chests, n_trials, seed):
+    rng = default_rng(seed)
+    # Number of chests with each outcome, per trial
+    counts = rng.multinomial(n_chests, p, size=n_trials)
+    totals = zeros((len(lows), n_trials), dtype=int)
+    for k in range(len(lows)):
+        totals[k] = counts[:, k]*lows[k]
+        if highs[k] > lows[k]:
+            n = int(counts[:, k].sum())
+            extra = rng.integers(0, highs[k] - lows[k] + 1, size=n)
+            trial = repeat(arange(n_trials), counts[:, k])
+            totals[k] += bincount(trial, weights=extra,
+                                  minlength=n_trials).astype(int)
+    return totals
+
+
+def simulate_chests(chest, n_chests, n_trials=1, seed=None, processes=1):
+    """
+    Monte Carlo simulation of opening chests. Every trial opens
+    n_chests chests; the outcome counts of all trials are drawn at
+    once from a multinomial distribution, and the amounts of all
+    outcomes in one batch of uniform draws.
+
+    Trials are simulated in chunks, each with its own random stream
+    spawned from the seed, so results only depend on the seed and not
+    on the number of processes.
+
+    Parameters
+    ----------
+    chest : Chest
+        The chest type (with batch and potions applied).
+    n_chests : int
+        Number of chests opened in each trial.
+    n_trials : int
+        (Optional) Number of trials.
+    seed : int
+        (Optional) Seed of the random numbers.
+    processes : int
+        (Optional) Number of processes to simulate with.
+
+    Returns
+    -------
+    totals : dict
+        Arrays of shape (n_trials,) with the total amount of each item,
+        with item names (see ITEMS) as keys.
+    """
+    p, lows, highs = _outcome_arrays(chest)
+    chunk = max(1, CHUNK_CHESTS//max(1, n_chests))
+    sizes = [min(chunk, n_trials - i) for i in range(0, n_trials, chunk)]
+    seeds = SeedSequence(seed).spawn(len(sizes))
+    args = ([p]*len(sizes), [lows]*len(sizes), [highs]*len(sizes),
+            [n_chests]*len(sizes), sizes, seeds)
+    if processes == 1 or len(sizes) == 1:
+        parts = list(map(_simulate_chunk, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            parts = list(executor.map(_simulate_chunk, *args))
+    if parts:
+        totals = concatenate(parts, axis=1)
+    else:
+        totals = zeros((len(ITEMS), 0), dtype=int)
+    return dict(zip(ITEMS, totals))
+
+
+def summarize(totals, percentiles=(5, 25, 50, 75, 95)):
+    """
+    Summary statistics of simulated totals.
+
+    Parameters
+    ----------
+    totals : dict
+        Simulated totals, as returned by simulate_chests.
+    percentiles : tuple of float
+        (Optional) Percentiles to compute.
+
+    Returns
+    -------
+    summary : dict
+        For every item a dictionary with the "mean", "std", the
+        percentiles (keyed by percentile) and "p_any", the probability
+        of getting at least one.
+    """
+    out = {}
+    for item, values in totals.items():
+        out[item] = {"mean": float(values.mean()),
+                     "std": float(values.std())}
+        for q, v in zip(percentiles, percentile(values, percentiles)):
+            out[item][q] = float(v)
+        out[item]["p_any"] = float((values > 0).mean())
+    return out
@@ -1,6 +1,6 @@
-import requests
 from enum import Enum
-from requests.adapters import HTTPAdapter, Retry
+from os import environ
+from os.path import expanduser, join
 
 BASE_URL = "https://api2.splinterlands.com"
 GUILD_URL = f"{BASE_URL}/guilds"
@@ -38,6 +38,28 @@ class Tier(Enum):
     REBELLION = 12
 
 
+CACHE_DIR = environ.get("SPLTOOLS_CACHE_DIR",
+                       join(expanduser("~"), ".cache", "spltools"))
+CARD_DATA_TTL = 24*60*60  # seconds
+PLAYER_GUILD_TTL = 60*60  # seconds
+# Time-to-live in seconds of cached API responses, by endpoint. None
+# means forever, 0 or endpoints not listed are not cached.
+RESPONSE_CACHE_TTLS = {"/battle/result": 0,
+                       "/tournaments/find_brawl": 60,
+                       "/guilds/brawl_records": 60*60,
+                       "/guilds/find": 60*60,
+                       "/guilds/members": 10*60,
+                       "/guilds/list": 5*60,
+                       "/players/details": 5*60,
+                       "/settings": 5*60}
+# Time-to-live of responses that can no longer change, i.e. battle
+# results and finished brawls. Used instead of RESPONSE_CACHE_TTLS when
+# the response shows the data is final.
+FINAL_RESPONSE_CACHE_TTLS = {"/battle/result": None,
+                             "/tournaments/find_brawl": 24*60*60}
+# Status of a finished brawl in find_brawl responses
+BRAWL_FINISHED_STATUS = 2
+
 ARTWORK_URL = "https://d36mxiodymuqjm.cloudfront.net"
 HIVE_IMG_URL = "https://images.hive.blog/"
 PREFIX_30X30 = f"{HIVE_IMG_URL}/30x30"
@@ -49,8 +71,27 @@ SPS_IMAGE = (f"{PREFIX_30X30}/{ARTWORK_URL}"
              + "/website/ui_elements/shop/cl/img_sps-shard_128.png")
 
 
-request_session = requests.Session()
-retries = Retry(total=10,
-                backoff_factor=2,
-                status_forcelist=[429, 500, 502, 503, 504])
-request_session.mount('http://', HTTPAdapter(max_retries=retries))
+def get_request_session():
+    """
+    Get the HTTP session shared by all modules, i.e. the session of
+    the shared transport (see spltools.transport). The session (and
+    requests itself) is only created on first use, so that importing
+    spltools stays cheap.
+
+    Returns
+    -------
+    session : requests.Session
+        The shared session.
+    """
+    from spltools.transport import get_transport
+    return get_transport().session
+
+
+def __getattr__(name):
+    # request_session used to be created at import time
+    if name == "request_session":
+        return get_request_session()
+    if name == "retries":
+        from spltools.transport import get_transport
+        return get_transport().retries
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,6 @@
+from .transport import TokenBucket, Transport, get_transport, \
+    configure_transport, set_transport
+from .cache import ResponseCache
+from .metrics import LATENCY_BUCKETS, TransportMetrics
+from .replay import RecordingAdapter, Replayer, ReplayAdapter, \
+    ReplayServer, record, replay
@@ -0,0 +1,187 @@
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from urllib.parse import urlsplit
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from spltools.settings import RESPONSE_CACHE_TTLS, \
+    FINAL_RESPONSE_CACHE_TTLS, BRAWL_FINISHED_STATUS
+
+
+def _build_response(url, status_code, headers, content):
+    response = Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    return response
+
+
+def _battle_is_final(payload):
+    # Unknown or unfinished battles are answered with a JSON string
+    return isinstance(payload, dict)
+
+
+def _brawl_is_final(payload):
+    return (isinstance(payload, dict)
+            and payload.get('status') == BRAWL_FINISHED_STATUS)
+
+
+# Checks of whether a decoded response is final, by endpoint
+FINAL_RESPONSE_CHECKS = {"/battle/result": _battle_is_final,
+                         "/tournaments/find_brawl": _brawl_is_final}
+
+# Default of ResponseCache.put: use the time-to-live of the endpoint
+_ENDPOINT_TTL = object()
+
+
+class ResponseCache:
+    """
+    URL-keyed cache of successful API responses, with LRU eviction in
+    memory and an optional SQLite disk tier. How long a response is
+    kept depends on its endpoint (see RESPONSE_CACHE_TTLS), and for
+    endpoints in FINAL_RESPONSE_CHECKS on whether the response is final
+    (see FINAL_RESPONSE_CACHE_TTLS), so that e.g. a brawl in progress
+    is only kept briefly.
+
+    Attributes
+    ----------
+    maxsize : int
+        Maximum number of responses kept in memory.
+    path : str
+        SQLite file of the disk tier, None for memory only.
+    ttls : dict
+        Time-to-live in seconds by endpoint path. None means the
+        response never expires, 0 and endpoints not listed are not
+        cached.
+    final_ttls : dict
+        Time-to-live in seconds of final responses by endpoint path.
+    """
+    def __init__(self, maxsize=256, path=None, ttls=None, final_ttls=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.ttls = RESPONSE_CACHE_TTLS if ttls is None else ttls
+        self.final_ttls = (FINAL_RESPONSE_CACHE_TTLS if final_ttls is None
+                           else final_ttls)
+        self._memory = OrderedDict()
+        self._lock = Lock()
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            with self._lock:
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS responses "
+                    + "(url TEXT PRIMARY KEY, expires REAL, "
+                    + "status_code INTEGER, headers TEXT, content BLOB)")
+                self._connection.commit()
+
+    def cacheable(self, url):
+        """
+        Whether responses for a URL may be cached.
+        """
+        path = urlsplit(url).path
+        return (self.ttls.get(path, 0) != 0
+                or self.final_ttls.get(path, 0) != 0)
+
+    def ttl(self, url, response=None):
+        """
+        Time-to-live for a URL, or for a response to it. Returns 0 if
+        the response is not to be cached.
+        """
+        path = urlsplit(url).path
+        check = FINAL_RESPONSE_CHECKS.get(path)
+        if (response is not None and check is not None
+                and path in self.final_ttls):
+            try:
+                final = check(response.json())
+            except ValueError:
+                return 0
+            if final:
+                return self.final_ttls[path]
+        return self.ttls.get(path, 0)
+
+    def get(self, url):
+        """
+        Return the cached response for a URL, or None.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None:
+                if entry[0] is None or entry[0] > now:
+                    self._memory.move_to_end(url)
+                    return _build_response(url, *entry[1:])
+                del self._memory[url]
+            if self._connection is None:
+                return None
+            row = self._connection.execute(
+                "SELECT expires, status_code, headers, content "
+                + "FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            if row[0] is not None and row[0] <= now:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE url = ?", (url,))
+                self._connection.commit()
+                return None
+            entry = (row[0], row[1], json.loads(row[2]), row[3])
+            self._remember(url, entry)
+        return _build_response(url, *entry[1:])
+
+    def put(self, url, response, ttl=_ENDPOINT_TTL):
+        """
+        Cache a response.
+
+        Parameters
+        ----------
+        url : str
+            The requested URL.
+        response : requests.Response
+            The response.
+        ttl : float
+            (Optional) Time-to-live in seconds, None to never expire
+            and 0 to not cache the response. Defaults to the
+            time-to-live of the endpoint and response (see ttl).
+        """
+        if ttl is _ENDPOINT_TTL:
+            ttl = self.ttl(url, response)
+        if ttl == 0:
+            return
+        expires = None if ttl is None else time.time() + ttl
+        entry = (expires, response.status_code, dict(response.headers),
+                 response.content)
+        with self._lock:
+            self._remember(url, entry)
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    + "(url, expires, status_code, headers, content) "
+                    + "VALUES (?, ?, ?, ?, ?)",
+                    (url, expires, entry[1], json.dumps(entry[2]),
+                     entry[3]))
+                self._connection.commit()
+
+    def _remember(self, url, entry):
+        self._memory[url] = entry
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all cached responses.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM responses")
+                self._connection.commit()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
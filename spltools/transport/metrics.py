@@ -0,0 +1,223 @@
+import logging
+from bisect import bisect_left
+from threading import Lock
+from urllib.parse import urlsplit
+
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, float("inf"))
+
+logger = logging.getLogger(__name__)
+
+
+def endpoint(url):
+    """
+    Endpoint of a URL, i.e. its path without the query string.
+    """
+    return urlsplit(url).path or "/"
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+        self.latency_sum = 0.0
+        self.latency_counts = [0]*len(LATENCY_BUCKETS)
+        self.status_codes = {}
+
+    def as_dict(self):
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": (self.cache_hits/lookups if lookups
+                               else None),
+            "coalesced": self.coalesced,
+            "latency_sum": self.latency_sum,
+            "latency_mean": (self.latency_sum/self.requests
+                             if self.requests else None),
+            "latency_buckets": dict(zip(LATENCY_BUCKETS,
+                                        self.latency_counts)),
+            "status_codes": dict(self.status_codes),
+        }
+
+
+class TransportMetrics:
+    """
+    Per-endpoint request metrics of a Transport: number of requests,
+    latency histogram, retries, status codes, response bytes and
+    response cache hits and misses. Requests answered from the cache
+    or by a coalesced request are not counted as requests.
+
+    Hooks are called with a dictionary for every event, with the keys
+    "event" ("request", "cache_hit" or "coalesced"), "url" and
+    "endpoint", and for requests also "latency", "status_code" (None
+    if the request raised), "bytes", "retries" and "error".
+    """
+    def __init__(self):
+        self._stats = {}
+        self._lock = Lock()
+        self._hooks = []
+
+    def add_hook(self, hook):
+        """
+        Register a function called with every event, e.g. to export
+        metrics to another system. Exceptions raised by hooks are
+        logged and otherwise ignored.
+        """
+        self._hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def _endpoint_stats(self, name):
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = _EndpointStats()
+        return stats
+
+    def _emit(self, event):
+        for hook in self._hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception("Error in metrics hook %r", hook)
+
+    def record_cache(self, url, hit):
+        """
+        Record a response cache lookup.
+        """
+        name = endpoint(url)
+        with self._lock:
+            stats = self._endpoint_stats(name)
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+        if hit and self._hooks:
+            self._emit({"event": "cache_hit", "url": url, "endpoint": name})
+
+    def record_coalesced(self, url):
+        """
+        Record a request that waited for an identical one in flight.
+        """
+        name = endpoint(url)
+        with self._lock:
+            self._endpoint_stats(name).coalesced += 1
+        if self._hooks:
+            self._emit({"event": "coalesced", "url": url, "endpoint": name})
+
+    def record_request(self, url, latency, response=None, error=None):
+        """
+        Record a request sent to the server.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        latency : float
+            Time in seconds until the response (or error), including
+            retries.
+        response : requests.Response
+            (Optional) The response, None if the request raised.
+        error : Exception
+            (Optional) The exception raised by the request.
+        """
+        name = endpoint(url)
+        status_code, nbytes, retries = None, 0, 0
+        if response is not None:
+            status_code = response.status_code
+            nbytes = len(response.content or b"")
+            retry = getattr(response.raw, "retries", None)
+            if retry is not None:
+                retries = len(retry.history)
+        with self._lock:
+            stats = self._endpoint_stats(name)
+            stats.requests += 1
+            stats.retries += retries
+            stats.bytes += nbytes
+            stats.latency_sum += latency
+            stats.latency_counts[bisect_left(LATENCY_BUCKETS, latency)] += 1
+            if status_code is None:
+                stats.errors += 1
+            else:
+                stats.status_codes[status_code] = \
+                    stats.status_codes.get(status_code, 0) + 1
+        if self._hooks:
+            self._emit({"event": "request", "url": url, "endpoint": name,
+                        "latency": latency, "status_code": status_code,
+                        "bytes": nbytes, "retries": retries,
+                        "error": error})
+
+    def snapshot(self):
+        """
+        Return the metrics as a dictionary with endpoints as keys.
+        """
+        with self._lock:
+            return {name: stats.as_dict()
+                    for name, stats in sorted(self._stats.items())}
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def prometheus(self, prefix="spltools_http"):
+        """
+        Return the metrics in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        prefix : str
+            (Optional) Prefix of the metric names.
+
+        Returns
+        -------
+        text : str
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def counter(name, help, key):
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for ep, s in snapshot.items():
+                lines.append(f'{prefix}_{name}{{endpoint="{ep}"}} {s[key]}')
+
+        counter("requests_total", "Requests sent.", "requests")
+        counter("errors_total", "Requests that raised.", "errors")
+        counter("retries_total", "Retries of requests.", "retries")
+        counter("response_bytes_total", "Response body bytes.", "bytes")
+        counter("cache_hits_total", "Response cache hits.", "cache_hits")
+        counter("cache_misses_total", "Response cache misses.",
+                "cache_misses")
+        counter("coalesced_total", "Requests coalesced with another.",
+                "coalesced")
+        name = f"{prefix}_responses_total"
+        lines.append(f"# HELP {name} Responses by status code.")
+        lines.append(f"# TYPE {name} counter")
+        for ep, s in snapshot.items():
+            for code, n in sorted(s["status_codes"].items()):
+                lines.append(f'{name}{{endpoint="{ep}",code="{code}"}} {n}')
+        name = f"{prefix}_request_duration_seconds"
+        lines.append(f"# HELP {name} Request latency.")
+        lines.append(f"# TYPE {name} histogram")
+        for ep, s in snapshot.items():
+            total = 0
+            for bound, n in s["latency_buckets"].items():
+                total += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{name}_bucket{{endpoint="{ep}",le="{le}"}} '
+                             + f'{total}')
+            lines.append(f'{name}_sum{{endpoint="{ep}"}} '
+                         + f'{s["latency_sum"]:.6f}')
+            lines.append(f'{name}_count{{endpoint="{ep}"}} {s["requests"]}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,356 @@
+import base64
+import gzip
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import urlsplit, urlunsplit
+from requests import ConnectionError
+from requests.adapters import BaseAdapter, HTTPAdapter
+from spltools.transport.cache import _build_response
+from spltools.transport.transport import get_transport
+
+# Headers that no longer apply once the body has been decoded
+_DROPPED_HEADERS = ("content-encoding", "transfer-encoding",
+                    "content-length", "connection")
+
+
+def _replay_key(url):
+    """
+    Archive key of a URL: path and query, so that recordings can be
+    replayed against another host.
+    """
+    parts = urlsplit(url)
+    return parts.path + ("?" + parts.query if parts.query else "")
+
+
+def _encode_body(content):
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(record):
+    if "text" in record:
+        return record["text"].encode("utf-8")
+    return base64.b64decode(record["base64"])
+
+
+class RecordingAdapter(BaseAdapter):
+    """
+    Transport adapter that sends requests with another adapter and
+    appends every response to a fixture archive: a gzip-compressed
+    file with one JSON object per line.
+
+    Attributes
+    ----------
+    path : str
+        The archive file.
+    adapter : requests.adapters.BaseAdapter
+        The adapter that sends the requests.
+    n_recorded : int
+        Number of responses written.
+    """
+    def __init__(self, path, adapter=None, append=False):
+        """
+        Parameters
+        ----------
+        path : str
+            The archive file.
+        adapter : requests.adapters.BaseAdapter
+            (Optional) Adapter that sends the requests. Defaults to a
+            new HTTPAdapter.
+        append : bool
+            (Optional) If True, add to an existing archive.
+        """
+        super().__init__()
+        self.path = path
+        self.adapter = HTTPAdapter() if adapter is None else adapter
+        self.n_recorded = 0
+        self._file = gzip.open(path, "at" if append else "wt",
+                               encoding="utf-8")
+        self._lock = Lock()
+
+    def send(self, request, **kwargs):
+        response = self.adapter.send(request, **kwargs)
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in _DROPPED_HEADERS}
+        record = {"method": request.method, "url": request.url,
+                  "status_code": response.status_code, "headers": headers}
+        record.update(_encode_body(response.content))
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.n_recorded += 1
+        return response
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.adapter.close()
+
+
+class Replayer:
+    """
+    Responses of a fixture archive, served in recorded order per URL
+    with optional latency and error injection. Shared by ReplayAdapter
+    and ReplayServer.
+
+    Attributes
+    ----------
+    latency : float or tuple of float
+        Delay in seconds added to every response, or the bounds of a
+        uniformly distributed delay.
+    error_rate : float
+        Fraction of requests answered with an error instead of the
+        recorded response.
+    error_status : int
+        Status code of injected errors. None to raise a
+        ConnectionError instead (in-process replay only).
+    """
+    def __init__(self, path, latency=0, error_rate=0, error_status=503,
+                 seed=None):
+        """
+        Parameters
+        ----------
+        path : str
+            The archive file, as written by RecordingAdapter.
+        latency : float or tuple of float
+            (Optional) Delay in seconds, or (min, max) for a random
+            delay.
+        error_rate : float
+            (Optional) Probability of answering with an error.
+        error_status : int
+            (Optional) Status code of injected errors.
+        seed : int
+            (Optional) Seed of the random latencies and errors.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._records = {}
+        self._served = {}
+        with gzip.open(path, "rt", encoding="utf-8") as iF:
+            for line in iF:
+                record = json.loads(line)
+                key = (record["method"], _replay_key(record["url"]))
+                self._records.setdefault(key, []).append(record)
+
+    def __len__(self):
+        return sum(len(r) for r in self._records.values())
+
+    def urls(self):
+        """
+        Return the recorded paths (with query), without duplicates.
+        """
+        return [key[1] for key in self._records]
+
+    def next(self, method, url):
+        """
+        Draw the next response for a request. A URL recorded several
+        times gets its responses in order, then the last one again.
+
+        Returns
+        -------
+        status_code : int
+            Status code, 404 if the URL was not recorded.
+        headers : dict
+        content : bytes
+        error : bool
+            True if this is an injected error.
+        """
+        key = (method, _replay_key(url))
+        with self._lock:
+            if isinstance(self.latency, (tuple, list)):
+                delay = self._random.uniform(*self.latency)
+            else:
+                delay = self.latency
+            error = (self.error_rate > 0
+                     and self._random.random() < self.error_rate)
+            records = self._records.get(key)
+            record = None
+            if records is not None:
+                i = self._served.get(key, 0)
+                record = records[min(i, len(records) - 1)]
+                if not error:
+                    self._served[key] = i + 1
+        if delay > 0:
+            time.sleep(delay)
+        if error:
+            return self.error_status, {}, b"", True
+        if record is None:
+            return 404, {}, b"", False
+        return (record["status_code"], record["headers"],
+                _decode_body(record), False)
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter that answers requests from a fixture archive
+    without any network access. Since requests never reach the
+    retrying adapter, injected errors are returned to the caller as is;
+    use ReplayServer to exercise retries as well.
+    """
+    def __init__(self, replayer):
+        """
+        Parameters
+        ----------
+        replayer : Replayer or str
+            The responses, or the archive file.
+        """
+        super().__init__()
+        if not isinstance(replayer, Replayer):
+            replayer = Replayer(replayer)
+        self.replayer = replayer
+
+    def send(self, request, **kwargs):
+        status_code, headers, content, error = self.replayer.next(
+            request.method, request.url)
+        if error and status_code is None:
+            raise ConnectionError("Injected replay error", request=request)
+        response = _build_response(request.url, status_code, headers,
+                                   content)
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+    def close(self):
+        pass
+
+
+class ReplayServer:
+    """
+    Stand-in HTTP server on localhost answering requests from a
+    fixture archive, for benchmarks that include sockets, connection
+    pooling and retries.
+
+    Attributes
+    ----------
+    replayer : Replayer
+        The responses.
+    url : str
+        Base URL of the server, e.g. http://127.0.0.1:8765.
+    """
+    def __init__(self, replayer, port=0):
+        """
+        Parameters
+        ----------
+        replayer : Replayer or str
+            The responses, or the archive file.
+        port : int
+            (Optional) Port to listen on. Defaults to a free port.
+        """
+        if not isinstance(replayer, Replayer):
+            replayer = Replayer(replayer)
+        self.replayer = replayer
+        server_replayer = replayer
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status_code, headers, content, _ = server_replayer.next(
+                    "GET", self.path)
+                self.send_response(status_code or 503)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = Thread(target=self._server.serve_forever,
+                              daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _RedirectAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that sends every request to another host.
+    """
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self._target = urlsplit(base_url)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = urlunsplit((self._target.scheme, self._target.netloc,
+                                  parts.path, parts.query, parts.fragment))
+        return super().send(request, **kwargs)
+
+
+def record(path, transport=None, append=False):
+    """
+    Record all responses of a transport to a fixture archive.
+
+    Parameters
+    ----------
+    path : str
+        The archive file (gzip-compressed JSON lines).
+    transport : Transport
+        (Optional) Defaults to the shared transport.
+    append : bool
+        (Optional) If True, add to an existing archive.
+
+    Returns
+    -------
+    adapter : RecordingAdapter
+        The mounted adapter. Close it to finish the archive.
+    """
+    transport = get_transport() if transport is None else transport
+    adapter = RecordingAdapter(path, transport.adapter, append=append)
+    transport.mount(adapter)
+    return adapter
+
+
+def replay(path, transport=None, latency=0, error_rate=0, error_status=503,
+           seed=None, server=False):
+    """
+    Answer all requests of a transport from a fixture archive.
+
+    Parameters
+    ----------
+    path : str
+        The archive file, as written by record.
+    transport : Transport
+        (Optional) Defaults to the shared transport.
+    latency, error_rate, error_status, seed
+        (Optional) See Replayer.
+    server : bool
+        (Optional) If True, start a ReplayServer and send the requests
+        to it through the transport's pooled, retrying adapter
+        settings, instead of answering them in-process.
+
+    Returns
+    -------
+    replay : ReplayAdapter or ReplayServer
+        Close a ReplayServer when done.
+    """
+    transport = get_transport() if transport is None else transport
+    replayer = Replayer(path, latency, error_rate, error_status, seed)
+    if not server:
+        adapter = ReplayAdapter(replayer)
+        transport.mount(adapter)
+        return adapter
+    replay_server = ReplayServer(replayer)
+    adapter = transport.adapter
+    transport.mount(_RedirectAdapter(
+        replay_server.url,
+        pool_connections=adapter._pool_connections,
+        pool_maxsize=adapter._pool_maxsize,
+        max_retries=adapter.max_retries))
+    return replay_server
@@ -0,0 +1,317 @@
+import time
+from threading import Event, Lock
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter, Retry
+from spltools.transport.cache import ResponseCache
+from spltools.transport.metrics import TransportMetrics
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Attributes
+    ----------
+    rate : float
+        Tokens added per second.
+    capacity : float
+        Maximum number of tokens (the allowed burst).
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = max(1, rate) if capacity is None else capacity
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        """
+        Take a token, sleeping until one is available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._last)*self.rate)
+            self._last = now
+            self._tokens -= 1
+            wait = -self._tokens/self.rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _share_json(response):
+    """
+    Make response.json() decode the body only once, so that everyone
+    sharing the response (coalesced callers and the response cache)
+    gets the same parsed payload. Calls with arguments are not
+    memoized.
+    """
+    decode = response.json
+    lock = Lock()
+    parsed = []
+
+    def json(**kwargs):
+        if kwargs:
+            return decode(**kwargs)
+        with lock:
+            if not parsed:
+                parsed.append(decode())
+        return parsed[0]
+    response.json = json
+    return response
+
+
+class _Flight:
+    """
+    A request in flight, shared by all callers asking for the same URL.
+    """
+    def __init__(self):
+        self._done = Event()
+        self._response = None
+        self._error = None
+
+    def set_result(self, response=None, error=None):
+        self._response = response
+        self._error = error
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._response
+
+
+class Transport:
+    """
+    HTTP transport shared by all spltools modules: a requests session
+    with a retrying, pooled adapter mounted for both http and https,
+    default timeouts and an optional per-host rate limit.
+
+    Attributes
+    ----------
+    session : requests.Session
+        The underlying session.
+    adapter : requests.adapters.HTTPAdapter
+        The pooled, retrying adapter.
+    timeout : tuple of float
+        Connect and read timeouts in seconds.
+    rate_limit : float
+        Maximum number of requests per second to each host, None for
+        no limit.
+    cache : ResponseCache
+        Cache of responses, None if caching is disabled.
+    metrics : TransportMetrics
+        Per-endpoint request metrics, None if disabled.
+    """
+    def __init__(self, pool_connections=10, pool_maxsize=32, retries=10,
+                 backoff_factor=2,
+                 status_forcelist=(429, 500, 502, 503, 504),
+                 connect_timeout=5, read_timeout=30, rate_limit=None,
+                 burst=None, cache=True, metrics=True):
+        """
+        Parameters
+        ----------
+        pool_connections : int
+            (Optional) Number of hosts to keep connection pools for.
+        pool_maxsize : int
+            (Optional) Maximum number of connections kept per host.
+            Should be at least the number of threads making requests.
+        retries : int
+            (Optional) Maximum number of retries of a request.
+        backoff_factor : float
+            (Optional) Backoff factor between retries.
+        status_forcelist : tuple of int
+            (Optional) Status codes that are retried.
+        connect_timeout, read_timeout : float
+            (Optional) Timeouts in seconds.
+        rate_limit : float
+            (Optional) Maximum number of requests per second to each
+            host.
+        burst : int
+            (Optional) Number of requests allowed in a burst when
+            rate_limit is set. Defaults to rate_limit.
+        cache : bool or ResponseCache
+            (Optional) True (default) for an in-memory ResponseCache,
+            False or None to disable response caching, or a
+            ResponseCache, e.g. one with a disk tier.
+        metrics : bool or TransportMetrics
+            (Optional) True (default) to record request metrics,
+            False or None to disable them, or a TransportMetrics,
+            e.g. one shared by several transports.
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        if cache is True:
+            cache = ResponseCache()
+        elif cache is False:
+            cache = None
+        self.cache = cache
+        if metrics is True:
+            metrics = TransportMetrics()
+        elif metrics is False:
+            metrics = None
+        self.metrics = metrics
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self._buckets = {}
+        self._buckets_lock = Lock()
+        self._inflight = {}
+        self._inflight_lock = Lock()
+        self.retries = Retry(total=retries,
+                             backoff_factor=backoff_factor,
+                             status_forcelist=list(status_forcelist),
+                             respect_retry_after_header=True,
+                             raise_on_status=False)
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize,
+                                   max_retries=self.retries)
+        self.mount(self.adapter)
+
+    def mount(self, adapter):
+        """
+        Use a transport adapter for both http and https requests, e.g.
+        a RecordingAdapter or ReplayAdapter.
+        """
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _bucket(self, host):
+        with self._buckets_lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate_limit,
+                                                  self.burst)
+            return self._buckets[host]
+
+    def get(self, url, timeout=None, cache=True, **kwargs):
+        """
+        Send a GET request, or answer it from the response cache.
+        Concurrent requests for the same URL are coalesced: only the
+        first caller sends the request, and the others wait for it and
+        get the same response (or exception). The JSON body of a
+        response is decoded once, and json() returns the same object to
+        every caller, so it should not be modified.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        timeout : float or tuple
+            (Optional) Overrides the default timeouts.
+        cache : bool
+            (Optional) False to bypass the response cache. Requests
+            with extra arguments (e.g. headers) are never cached.
+        **kwargs
+            Passed on to requests.Session.get.
+
+        Returns
+        -------
+        response : requests.Response
+        """
+        if kwargs:
+            return self._get(url, timeout, cache, **kwargs)
+        key = (url, cache)
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            if self.metrics is not None:
+                self.metrics.record_coalesced(url)
+            return flight.wait()
+        try:
+            response = self._get(url, timeout, cache)
+        except BaseException as E:
+            flight.set_result(error=E)
+            raise
+        else:
+            flight.set_result(response)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+        return response
+
+    def _get(self, url, timeout=None, cache=True, **kwargs):
+        cacheable = (cache and self.cache is not None and not kwargs
+                     and self.cache.cacheable(url))
+        if cacheable:
+            response = self.cache.get(url)
+            if self.metrics is not None:
+                self.metrics.record_cache(url, response is not None)
+            if response is not None:
+                return _share_json(response)
+        response = _share_json(self._send(url, timeout, **kwargs))
+        if cacheable and response.status_code == 200:
+            self.cache.put(url, response)
+        return response
+
+    def _send(self, url, timeout=None, **kwargs):
+        if self.rate_limit is not None:
+            self._bucket(urlsplit(url).netloc).acquire()
+        if timeout is None:
+            timeout = self.timeout
+        if self.metrics is None:
+            return self.session.get(url, timeout=timeout, **kwargs)
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=timeout, **kwargs)
+        except Exception as E:
+            self.metrics.record_request(url, time.perf_counter() - start,
+                                        error=E)
+            raise
+        self.metrics.record_request(url, time.perf_counter() - start,
+                                    response)
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+_transport = None
+_transport_lock = Lock()
+
+
+def get_transport():
+    """
+    Get the transport shared by all modules, creating it with default
+    settings on first use.
+
+    Returns
+    -------
+    transport : Transport
+    """
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = Transport()
+    return _transport
+
+
+def configure_transport(**kwargs):
+    """
+    Replace the shared transport with a new one.
+
+    Parameters
+    ----------
+    **kwargs
+        Arguments for Transport, e.g. pool_maxsize=64, rate_limit=5.
+
+    Returns
+    -------
+    transport : Transport
+        The new shared transport.
+    """
+    return set_transport(Transport(**kwargs))
+
+
+def set_transport(transport):
+    """
+    Use the given transport for all requests.
+    """
+    global _transport
+    with _transport_lock:
+        _transport = transport
+    return transport
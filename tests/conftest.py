@@ -0,0 +1,71 @@
+import json
+import time
+from threading import Lock
+import pytest
+from requests.adapters import BaseAdapter
+from spltools.transport import Transport
+from spltools.transport import transport as transport_module
+from spltools.transport.cache import _build_response
+
+
+class FakeAdapter(BaseAdapter):
+    """
+    Transport adapter answering requests from a dictionary of JSON
+    payloads by URL, and counting the requests sent per URL. A value
+    can also be a (status_code, payload) pair, or an exception to
+    raise. Unknown URLs are answered with status 404.
+    """
+    def __init__(self, routes=None, delay=0):
+        super().__init__()
+        self.routes = {} if routes is None else routes
+        self.delay = delay
+        self.sent = []
+        self._lock = Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.sent.append(request.url)
+        if self.delay:
+            time.sleep(self.delay)
+        route = self.routes.get(request.url, (404, None))
+        if isinstance(route, Exception):
+            raise route
+        if isinstance(route, tuple):
+            status_code, payload = route
+        else:
+            status_code, payload = 200, route
+        response = _build_response(request.url, status_code, {},
+                                   json.dumps(payload).encode())
+        response.request = request
+        return response
+
+    def count(self, url):
+        with self._lock:
+            return self.sent.count(url)
+
+    def close(self):
+        pass
+
+
+def fake_transport(routes=None, delay=0, **kwargs):
+    """
+    Transport whose requests are answered by a FakeAdapter, without
+    retries or metrics unless asked for.
+    """
+    kwargs.setdefault("retries", 0)
+    kwargs.setdefault("metrics", False)
+    transport = Transport(**kwargs)
+    transport.mount(FakeAdapter(routes, delay))
+    return transport
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """
+    Make the shared transport answer from a FakeAdapter, which is
+    returned. Its routes can be filled in by the test.
+    """
+    transport = fake_transport(cache=False)
+    monkeypatch.setattr(transport_module, "_transport", transport)
+    yield transport.session.get_adapter("https://")
+    transport.close()
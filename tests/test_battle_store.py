@@ -0,0 +1,134 @@
+import json
+from os import listdir
+import pytest
+from spltools.settings import BATTLE_URL
+from spltools.battle import get_battle_data, get_battles, \
+    DirectoryBattleStore, SQLiteBattleStore, open_battle_store, \
+    close_battle_stores, migrate_save_dir
+
+BATTLE = {"battle_queue_id_1": "sl_abc", "winner": "alice",
+          "details": {"rounds": []}}
+PAYLOADS = [BATTLE, "Battle not found", [1, 2], 3, None]
+
+
+def _url(bqid):
+    return f"{BATTLE_URL}/result?id={bqid}"
+
+
+@pytest.fixture(params=["battles", "battles.sqlite"])
+def location(request, tmp_path):
+    yield str(tmp_path/request.param)
+    close_battle_stores()
+
+
+def test_open_battle_store(location):
+    store = open_battle_store(location)
+    expected = (SQLiteBattleStore if location.endswith(".sqlite")
+                else DirectoryBattleStore)
+    assert isinstance(store, expected)
+    assert open_battle_store(location) is store
+    assert open_battle_store(store) is store
+    close_battle_stores()
+    assert open_battle_store(location) is not store
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_round_trip(location, payload):
+    store = open_battle_store(location)
+    assert store.get("sl_abc") is None
+    store.put("sl_abc", payload)
+    assert store.get("sl_abc") == payload
+    assert store.keys() == ["sl_abc"]
+    assert len(store) == 1
+    assert "sl_abc" in store
+    assert "sl_def" not in store
+
+
+def test_overwrite(location):
+    store = open_battle_store(location)
+    store.put("sl_abc", "Battle not found")
+    store.put("sl_abc", BATTLE)
+    assert store.get("sl_abc") == BATTLE
+    assert len(store) == 1
+
+
+def test_directory_put_is_atomic(tmp_path):
+    store = DirectoryBattleStore(str(tmp_path))
+    store.put("sl_abc", BATTLE)
+    assert listdir(tmp_path) == ["sl_abc"]
+    # Leftovers of an interrupted write are not battles
+    (tmp_path/".tmpxyz.tmp").write_text('{"winner"')
+    (tmp_path/"sl_def").write_text('{"winner"')
+    assert sorted(store.keys()) == ["sl_abc", "sl_def"]
+    assert store.get("sl_def") is None
+
+
+def test_sqlite_close_forgets_store(tmp_path):
+    location = str(tmp_path/"battles.db")
+    store = open_battle_store(location)
+    store.close()
+    assert open_battle_store(location) is not store
+    close_battle_stores()
+
+
+def test_get_battle_data_stores_finished_battles(location, fake_api):
+    fake_api.routes[_url("sl_abc")] = BATTLE
+    assert get_battle_data("sl_abc", save_dir=location) == BATTLE
+    assert get_battle_data("sl_abc", save_dir=location) == BATTLE
+    assert fake_api.count(_url("sl_abc")) == 1
+    assert open_battle_store(location).get("sl_abc") == BATTLE
+
+
+def test_get_battle_data_does_not_store_messages(location, fake_api):
+    fake_api.routes[_url("sl_abc")] = "Battle not found"
+    assert get_battle_data("sl_abc", save_dir=location) is None
+    assert "sl_abc" not in open_battle_store(location)
+    fake_api.routes[_url("sl_def")] = (500, "error")
+    assert get_battle_data("sl_def", save_dir=location) is None
+    assert "sl_def" not in open_battle_store(location)
+
+
+def test_stored_messages_are_downloaded_again(location, fake_api):
+    # Older versions stored the message of unfinished battles
+    open_battle_store(location).put("sl_abc", "Battle not found")
+    fake_api.routes[_url("sl_abc")] = BATTLE
+    assert get_battle_data("sl_abc", save_dir=location) == BATTLE
+    assert open_battle_store(location).get("sl_abc") == BATTLE
+
+
+def test_get_battles(location, fake_api):
+    store = open_battle_store(location)
+    store.put("sl_1", BATTLE)
+    store.put("sl_2", "Battle not found")
+    fake_api.routes[_url("sl_2")] = BATTLE
+    fake_api.routes[_url("sl_3")] = "Battle not found"
+    results = {bqid: (data, error) for bqid, data, error
+               in get_battles(["sl_1", "sl_2", "sl_3", "sl_2"],
+                              save_dir=location)}
+    assert results["sl_1"] == (BATTLE, None)
+    assert results["sl_2"] == (BATTLE, None)
+    assert results["sl_3"][0] is None
+    assert "sl_3" in results["sl_3"][1]
+    assert fake_api.count(_url("sl_1")) == 0
+    assert fake_api.count(_url("sl_2")) == 1
+    assert store.get("sl_2") == BATTLE
+    assert "sl_3" not in store
+
+
+def test_migrate_save_dir(tmp_path, location):
+    save_dir = tmp_path/"save_dir"
+    save_dir.mkdir()
+    (save_dir/"sl_1").write_text(json.dumps(BATTLE))
+    (save_dir/"sl_2.json").write_text(json.dumps(BATTLE))
+    (save_dir/"sl_3").write_text(json.dumps("Battle not found"))
+    (save_dir/"notes.txt").write_text("not a battle")
+    n = migrate_save_dir(str(save_dir), location, remove_files=True)
+    assert n == 2
+    store = open_battle_store(location)
+    assert sorted(store.keys()) == ["sl_1", "sl_2"]
+    assert sorted(listdir(save_dir)) == ["notes.txt", "sl_3"]
+
+
+def test_migrate_missing_save_dir(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        migrate_save_dir(str(tmp_path/"missing"), str(tmp_path/"b.db"))
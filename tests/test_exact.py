@@ -0,0 +1,64 @@
+from numpy import allclose, arange, convolve, ones
+import pytest
+from spltools.rewards import ITEMS, MinorChest, MajorChest, UltimateChest, \
+    chest_pmf, convolve_pmf, pmf_power, total_pmf, prob_at_least, pmf_mean
+from spltools.rewards import exact
+
+CHESTS = [MinorChest(), MajorChest(), UltimateChest(),
+          MajorChest(legendary_potion=False, alchemy_potion=False)]
+
+
+@pytest.mark.parametrize("chest", CHESTS)
+def test_single_chest_means_match_average_draw(chest):
+    average = chest.average_draw()
+    for item in ITEMS:
+        pmf = chest_pmf(chest, item)
+        assert pmf.sum() == pytest.approx(1)
+        assert pmf_mean(pmf) == pytest.approx(average[item]), item
+
+
+def test_rarity_adds_both_foils():
+    chest = UltimateChest()
+    average = chest.average_draw()
+    pmf = chest_pmf(chest, "legendary")
+    assert pmf_mean(pmf) == pytest.approx(average["legendary_rf"]
+                                          + average["legendary_gf"])
+
+
+def test_unknown_item():
+    with pytest.raises(ValueError):
+        chest_pmf(MinorChest(), "gold")
+
+
+def test_total_mean_scales_with_chests():
+    chest = MajorChest()
+    single = pmf_mean(chest_pmf(chest, "rare"))
+    for n in (1, 7, 100):
+        pmf = total_pmf(chest, n, "rare")
+        assert pmf.sum() == pytest.approx(1)
+        assert pmf_mean(pmf) == pytest.approx(n*single)
+
+
+def test_pmf_power_matches_repeated_convolution():
+    pmf = chest_pmf(MajorChest(), "common")
+    expected = ones(1)
+    for n in range(1, 7):
+        expected = convolve(expected, pmf)
+        assert allclose(pmf_power(pmf, n), expected)
+
+
+def test_fft_convolution_matches_direct(monkeypatch):
+    a = arange(300, dtype=float)
+    a /= a.sum()
+    b = a[::-1].copy()
+    monkeypatch.setattr(exact, "FFT_THRESHOLD", 10)
+    out = convolve_pmf(a, b)
+    assert (out >= 0).all()
+    assert allclose(out, convolve(a, b), atol=1e-12)
+
+
+def test_prob_at_least():
+    pmf = total_pmf(UltimateChest(), 10, "legendary")
+    assert prob_at_least(pmf, 0) == pytest.approx(1)
+    assert prob_at_least(pmf, 1) == pytest.approx(1 - pmf[0])
+    assert prob_at_least(pmf, len(pmf)) == 0
@@ -0,0 +1,51 @@
+from math import ceil
+from numpy import allclose
+from spltools.rewards import ITEMS, CHEST_TYPES, evaluate_grid, batch_costs
+
+BATCHES = (1, 2, 3, 4)
+POTIONS = (True, False, (True, False))
+VALUES = {item: i + 1 for i, item in enumerate(ITEMS)}
+
+
+def _flags(potion):
+    return (potion, potion) if isinstance(potion, bool) else potion
+
+
+def test_expected_matches_average_draw():
+    result = evaluate_grid(batches=BATCHES, potions=POTIONS)
+    assert result["expected"].shape == (len(CHEST_TYPES), len(BATCHES),
+                                        len(POTIONS), len(ITEMS))
+    for i, chest_type in enumerate(CHEST_TYPES):
+        for j, batch in enumerate(BATCHES):
+            for k, potion in enumerate(POTIONS):
+                legendary, alchemy = _flags(potion)
+                chest = chest_type(batch=batch, legendary_potion=legendary,
+                                   alchemy_potion=alchemy)
+                average = chest.average_draw()
+                assert allclose(result["expected"][i, j, k],
+                                [average[item] for item in ITEMS])
+
+
+def test_cost_is_rounded_chest_cost():
+    result = evaluate_grid(batches=BATCHES, potions=POTIONS)
+    for i, chest_type in enumerate(CHEST_TYPES):
+        for j, batch in enumerate(BATCHES):
+            chest = chest_type(batch=batch)
+            cost = batch_costs(chest_type().base_cost, batch)[-1]
+            assert cost == ceil(chest.cost)
+            assert (result["cost"][i, j] == cost).all()
+
+
+def test_values():
+    result = evaluate_grid(batches=BATCHES, potions=POTIONS,
+                           item_values=VALUES)
+    values = [VALUES[item] for item in ITEMS]
+    assert allclose(result["value"], result["expected"] @ values)
+    assert allclose(result["value_per_glint"],
+                    result["value"]/result["cost"])
+
+
+def test_without_values():
+    result = evaluate_grid()
+    assert set(result) == {"expected", "cost"}
+    assert result["expected"].shape == (len(CHEST_TYPES), 1, 1, len(ITEMS))
@@ -0,0 +1,78 @@
+from itertools import product
+from numpy import cumsum
+import pytest
+from spltools.rewards import RARITIES, CHEST_TYPES, DRAW_GOLD_FOIL_CHANCE, \
+    evaluate_grid, batch_costs, completion_factors, purchase_options, \
+    optimize_glint
+
+VALUES = {"legendary_potions": 20, "alchemy_potions": 20, "energy": 1,
+          "jackpot": 0, "merits": 0.1, "common_rf": 4, "common_gf": 100,
+          "rare_rf": 20, "rare_gf": 500, "epic_rf": 150, "epic_gf": 3000,
+          "legendary_rf": 800, "legendary_gf": 15000}
+COMPLETION = {"common": 0.9, "rare": 0.5, "epic": 0.2, "legendary": 0}
+
+
+def test_batch_costs():
+    assert list(batch_costs(225, 3)) == [225, 338, 507]
+    assert list(batch_costs(200, 1)) == [200]
+
+
+def test_completion_factors():
+    assert completion_factors({}) == {r: 1 for r in RARITIES}
+    assert completion_factors({r: 1 for r in RARITIES}) \
+        == {r: 0 for r in RARITIES}
+    factors = completion_factors(COMPLETION)
+    assert sum(factors.values()) == pytest.approx(len(RARITIES))
+    assert factors["legendary"] > factors["epic"] > factors["common"]
+
+
+def test_purchase_options():
+    options = {o["name"]: o for o in purchase_options(VALUES, COMPLETION)}
+    grid = evaluate_grid(item_values={
+        k: v*completion_factors(COMPLETION).get(k[:-3], 1)
+        if k.endswith("_rf") else v for k, v in VALUES.items()})
+    for i, chest_type in enumerate(CHEST_TYPES):
+        assert options[chest_type.__name__]["mean"] \
+            == pytest.approx(grid["value"][i, 0, 0])
+    g = DRAW_GOLD_FOIL_CHANCE
+    factors = completion_factors(COMPLETION)
+    for r in RARITIES:
+        # Completion scales the regular foil value once
+        mean = ((1 - g)*VALUES[f"{r}_rf"]*factors[r]
+                + g*VALUES[f"{r}_gf"])
+        assert options[f"{r.capitalize()}Draw"]["mean"] \
+            == pytest.approx(mean)
+        assert options[f"{r.capitalize()}Draw"]["variance"] >= 0
+
+
+def _brute_force(budget, risk_aversion):
+    options = purchase_options(VALUES, COMPLETION)
+    cum_costs = []
+    for option in options:
+        costs = cumsum(batch_costs(option["base_cost"], 20))
+        cum_costs.append([0] + [int(c) for c in costs if c <= budget])
+    best = None
+    for counts in product(*(range(len(c)) for c in cum_costs)):
+        cost = sum(c[k] for c, k in zip(cum_costs, counts))
+        if cost > budget:
+            continue
+        objective = sum(k*(o["mean"] - risk_aversion*o["variance"])
+                        for o, k in zip(options, counts))
+        if best is None or objective > best:
+            best = objective
+    return best
+
+
+@pytest.mark.parametrize("risk_aversion", [0.0, 1e-3, 1e-2])
+def test_optimize_glint_matches_brute_force(risk_aversion):
+    budget = 3000
+    plan = optimize_glint(budget, VALUES, COMPLETION, risk_aversion)
+    assert plan["cost"] <= budget
+    assert plan["objective"] == pytest.approx(
+        _brute_force(budget, risk_aversion))
+    assert plan["objective"] == pytest.approx(
+        plan["mean"] - risk_aversion*plan["variance"])
+    options = {o["name"]: o for o in purchase_options(VALUES, COMPLETION)}
+    cost = sum(int(batch_costs(options[name]["base_cost"], k).sum())
+               for name, k in plan["purchases"].items())
+    assert cost == plan["cost"]
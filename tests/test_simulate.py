@@ -0,0 +1,56 @@
+from numpy import array_equal, sqrt
+import pytest
+from spltools.rewards import ITEMS, MinorChest, MajorChest, UltimateChest, \
+    simulate_chests, summarize
+from spltools.rewards import simulate
+
+
+@pytest.mark.parametrize("chest_type", [MinorChest, MajorChest,
+                                        UltimateChest])
+def test_mean_matches_average_draw(chest_type):
+    chest = chest_type()
+    n_chests, n_trials = 50, 20000
+    totals = simulate_chests(chest, n_chests, n_trials, seed=1)
+    for item, expected in chest.average_draw().items():
+        values = totals[item]
+        # Five standard errors, plus a little for items that never occur
+        tolerance = 5*values.std()/sqrt(n_trials) + 1e-9
+        assert abs(values.mean() - n_chests*expected) <= tolerance, item
+
+
+def test_totals_have_one_value_per_trial():
+    totals = simulate_chests(MinorChest(), 10, 7, seed=0)
+    assert set(totals) == set(ITEMS)
+    assert all(len(v) == 7 for v in totals.values())
+
+
+def test_same_seed_gives_same_totals():
+    a = simulate_chests(MajorChest(), 20, 100, seed=5)
+    b = simulate_chests(MajorChest(), 20, 100, seed=5)
+    assert all(array_equal(a[k], b[k]) for k in ITEMS)
+
+
+def test_totals_do_not_depend_on_processes(monkeypatch):
+    # Small chunks, so that the trials are split over several chunks
+    monkeypatch.setattr(simulate, "CHUNK_CHESTS", 200)
+    a = simulate_chests(UltimateChest(), 20, 50, seed=3, processes=1)
+    b = simulate_chests(UltimateChest(), 20, 50, seed=3, processes=2)
+    assert all(array_equal(a[k], b[k]) for k in ITEMS)
+
+
+def test_amounts_stay_in_range():
+    chest = MajorChest()
+    totals = simulate_chests(chest, 1, 5000, seed=2)
+    for item, _, (low, high) in chest.outcomes():
+        values = totals[item]
+        assert ((values == 0) | ((values >= low) & (values <= high))).all()
+
+
+def test_summarize():
+    totals = simulate_chests(MinorChest(), 10, 1000, seed=4)
+    summary = summarize(totals, percentiles=(50,))
+    merits = summary["merits"]
+    assert merits["mean"] == pytest.approx(totals["merits"].mean())
+    assert merits["std"] == pytest.approx(totals["merits"].std())
+    assert 0 <= merits["p_any"] <= 1
+    assert 50 in merits
@@ -0,0 +1,128 @@
+import json
+import time
+import pytest
+from spltools.settings import BASE_URL, BATTLE_URL, TOURNAMENT_URL
+from spltools.transport import ResponseCache
+from spltools.transport.cache import _build_response
+from conftest import fake_transport
+
+BATTLE_RESULT = f"{BATTLE_URL}/result?id=sl_abc"
+FIND_BRAWL = f"{TOURNAMENT_URL}/find_brawl?id=brawl&guild_id=guild"
+SETTINGS = f"{BASE_URL}/settings"
+UNCACHED = f"{BASE_URL}/market/for_sale"
+
+
+def _response(url, payload, status_code=200):
+    return _build_response(url, status_code, {"Content-Type": "json"},
+                           json.dumps(payload).encode())
+
+
+def test_cacheable():
+    cache = ResponseCache()
+    assert cache.cacheable(BATTLE_RESULT)
+    assert cache.cacheable(FIND_BRAWL)
+    assert cache.cacheable(SETTINGS)
+    assert not cache.cacheable(UNCACHED)
+
+
+def test_ttl():
+    cache = ResponseCache()
+    # Only finished battles and brawls are kept for long
+    assert cache.ttl(BATTLE_RESULT,
+                     _response(BATTLE_RESULT, "Battle not found")) == 0
+    assert cache.ttl(BATTLE_RESULT,
+                     _response(BATTLE_RESULT, {"winner": "a"})) is None
+    assert cache.ttl(FIND_BRAWL, _response(FIND_BRAWL, {"status": 2})) \
+        == 24*60*60
+    assert cache.ttl(FIND_BRAWL, _response(FIND_BRAWL, {"status": 1})) == 60
+    assert cache.ttl(FIND_BRAWL, _response(FIND_BRAWL, "error")) == 60
+    invalid = _build_response(FIND_BRAWL, 200, {}, b"<html>")
+    assert cache.ttl(FIND_BRAWL, invalid) == 0
+    assert cache.ttl(SETTINGS) == 5*60
+    assert cache.ttl(UNCACHED) == 0
+
+
+def test_put_and_get():
+    cache = ResponseCache()
+    cache.put(SETTINGS, _response(SETTINGS, {"a": 1}))
+    response = cache.get(SETTINGS)
+    assert response.status_code == 200
+    assert response.json() == {"a": 1}
+    assert response.headers["content-type"] == "json"
+    cache.put(BATTLE_RESULT, _response(BATTLE_RESULT, "Battle not found"))
+    assert cache.get(BATTLE_RESULT) is None
+    cache.put(UNCACHED, _response(UNCACHED, {"a": 1}))
+    assert cache.get(UNCACHED) is None
+
+
+def test_expiry(monkeypatch):
+    cache = ResponseCache()
+    cache.put(SETTINGS, _response(SETTINGS, {"a": 1}))
+    cache.put(BATTLE_RESULT, _response(BATTLE_RESULT, {"winner": "a"}))
+    now = time.time()
+    monkeypatch.setattr("spltools.transport.cache.time.time",
+                        lambda: now + 5*60 + 1)
+    assert cache.get(SETTINGS) is None
+    assert cache.get(BATTLE_RESULT) is not None
+
+
+def test_maxsize():
+    cache = ResponseCache(maxsize=2)
+    urls = [f"{SETTINGS}?n={i}" for i in range(3)]
+    cache.put(urls[0], _response(urls[0], 0))
+    cache.put(urls[1], _response(urls[1], 1))
+    cache.get(urls[0])
+    cache.put(urls[2], _response(urls[2], 2))
+    assert len(cache) == 2
+    assert cache.get(urls[1]) is None
+    assert cache.get(urls[0]).json() == 0
+
+
+def test_disk_tier(tmp_path):
+    path = str(tmp_path/"responses.sqlite")
+    cache = ResponseCache(path=path)
+    cache.put(BATTLE_RESULT, _response(BATTLE_RESULT, {"winner": "a"}))
+    cache.close()
+    cache = ResponseCache(maxsize=1, path=path)
+    assert len(cache) == 0
+    assert cache.get(BATTLE_RESULT).json() == {"winner": "a"}
+    cache.clear()
+    assert cache.get(BATTLE_RESULT) is None
+    cache.close()
+
+
+def test_transport_caches_responses():
+    transport = fake_transport({SETTINGS: {"a": 1}, UNCACHED: {"b": 2},
+                                BATTLE_RESULT: "Battle not found"})
+    adapter = transport.session.get_adapter(SETTINGS)
+    for url in (SETTINGS, UNCACHED, BATTLE_RESULT):
+        assert transport.get(url).json() == adapter.routes[url]
+        assert transport.get(url).json() == adapter.routes[url]
+    assert adapter.count(SETTINGS) == 1
+    assert adapter.count(UNCACHED) == 2
+    assert adapter.count(BATTLE_RESULT) == 2
+    transport.get(SETTINGS, cache=False)
+    assert adapter.count(SETTINGS) == 2
+
+
+def test_transport_does_not_cache_errors_or_extra_arguments():
+    transport = fake_transport({SETTINGS: (500, "error")})
+    adapter = transport.session.get_adapter(SETTINGS)
+    assert transport.get(SETTINGS).status_code == 500
+    assert transport.get(SETTINGS).status_code == 500
+    assert adapter.count(SETTINGS) == 2
+    adapter.routes[SETTINGS] = {"a": 1}
+    transport.get(SETTINGS, headers={"X-Test": "1"})
+    assert len(transport.cache) == 0
+    transport.get(SETTINGS)
+    transport.get(SETTINGS, headers={"X-Test": "1"})
+    assert adapter.count(SETTINGS) == 5
+
+
+@pytest.mark.parametrize("cache", [False, None])
+def test_transport_without_cache(cache):
+    transport = fake_transport({SETTINGS: {"a": 1}}, cache=cache)
+    assert transport.cache is None
+    transport.get(SETTINGS)
+    transport.get(SETTINGS)
+    assert transport.session.get_adapter(SETTINGS).count(SETTINGS) == 2
@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+import pytest
+from requests.exceptions import ConnectionError
+from spltools.settings import BASE_URL
+from conftest import fake_transport
+
+URL = f"{BASE_URL}/market/for_sale"
+CALLERS = 4
+
+
+def _get_together(transport, url, **kwargs):
+    """
+    Send the same request from several threads at once. Returns the
+    futures of the calls.
+    """
+    barrier = Barrier(CALLERS)
+
+    def get():
+        barrier.wait()
+        return transport.get(url, **kwargs)
+    with ThreadPoolExecutor(CALLERS) as executor:
+        futures = [executor.submit(get) for _ in range(CALLERS)]
+    return futures
+
+
+def test_concurrent_requests_are_coalesced():
+    transport = fake_transport({URL: {"a": [1, 2]}}, delay=0.2,
+                               metrics=True)
+    adapter = transport.session.get_adapter(URL)
+    responses = [f.result() for f in _get_together(transport, URL)]
+    assert adapter.count(URL) == 1
+    assert all(r is responses[0] for r in responses)
+    # The payload is decoded once and shared
+    payloads = [r.json() for r in responses]
+    assert payloads[0] == {"a": [1, 2]}
+    assert all(p is payloads[0] for p in payloads)
+    stats = transport.metrics.snapshot()
+    assert sum(s["coalesced"] for s in stats.values()) == CALLERS - 1
+
+
+def test_errors_reach_every_caller():
+    transport = fake_transport({URL: ConnectionError("refused")},
+                               delay=0.2)
+    adapter = transport.session.get_adapter(URL)
+    for future in _get_together(transport, URL):
+        with pytest.raises(ConnectionError):
+            future.result()
+    assert adapter.count(URL) == 1
+
+
+def test_later_requests_are_sent_again():
+    transport = fake_transport({URL: {"a": 1}})
+    adapter = transport.session.get_adapter(URL)
+    first = transport.get(URL)
+    second = transport.get(URL)
+    assert first is not second
+    assert adapter.count(URL) == 2
+
+
+def test_requests_with_arguments_are_not_coalesced():
+    transport = fake_transport({URL: {"a": 1}}, delay=0.2)
+    adapter = transport.session.get_adapter(URL)
+    responses = [f.result() for f in
+                 _get_together(transport, URL, headers={"X-Test": "1"})]
+    assert adapter.count(URL) == CALLERS
+    assert len({id(r) for r in responses}) == CALLERS
@@ -0,0 +1,101 @@
+import pytest
+from spltools.settings import GUILD_URL, TOURNAMENT_URL
+from spltools.guild import BrawlWarehouse
+
+GUILD = "guild"
+
+
+def _records_url(guild_id=GUILD):
+    return f"{GUILD_URL}/brawl_records?guild_id={guild_id}"
+
+
+def _brawl_url(brawl_id, guild_id=GUILD):
+    return f"{TOURNAMENT_URL}/find_brawl?id={brawl_id}&guild_id={guild_id}"
+
+
+def _brawl(status=2, challenge_level=1):
+    return {"status": status, "data": {"challenge_level": challenge_level}}
+
+
+def _set_records(fake_api, brawl_ids, guild_id=GUILD):
+    # Brawl records are listed newest first
+    fake_api.routes[_records_url(guild_id)] = {
+        "results": [{"tournament_id": b} for b in reversed(brawl_ids)]}
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    warehouse = BrawlWarehouse(str(tmp_path/"brawls.sqlite"),
+                               max_concurrency=2)
+    yield warehouse
+    warehouse.close()
+
+
+def test_refresh_guild(warehouse, fake_api):
+    _set_records(fake_api, ["b1", "b2"])
+    fake_api.routes[_brawl_url("b1")] = _brawl(challenge_level=0)
+    fake_api.routes[_brawl_url("b2")] = _brawl(challenge_level=2)
+    assert warehouse.refresh_guild(GUILD) == 2
+    assert warehouse.mark(GUILD)["newest_brawl_id"] == "b2"
+    assert warehouse.brawl_ids(GUILD) == {"b1", "b2"}
+    assert warehouse.get(GUILD, "b2") == _brawl(challenge_level=2)
+    assert warehouse.keys(tier=1) == [(GUILD, "b1")]
+    # Nothing newer than the mark: only the records are downloaded
+    assert warehouse.refresh_guild(GUILD) == 0
+    assert fake_api.count(_brawl_url("b1")) == 1
+    assert fake_api.count(_records_url()) == 2
+
+
+def test_unfinished_brawls_are_fetched_again(warehouse, fake_api):
+    _set_records(fake_api, ["b1", "b2", "b3"])
+    fake_api.routes[_brawl_url("b1")] = _brawl()
+    fake_api.routes[_brawl_url("b2")] = _brawl(status=1)
+    fake_api.routes[_brawl_url("b3")] = _brawl()
+    assert warehouse.refresh_guild(GUILD) == 2
+    # The mark stays below the unfinished brawl
+    assert warehouse.mark(GUILD)["newest_brawl_id"] == "b1"
+    assert (GUILD, "b2") not in warehouse
+    fake_api.routes[_brawl_url("b2")] = _brawl()
+    assert warehouse.refresh_guild(GUILD) == 1
+    assert warehouse.mark(GUILD)["newest_brawl_id"] == "b3"
+    assert fake_api.count(_brawl_url("b2")) == 2
+    assert fake_api.count(_brawl_url("b3")) == 1
+
+
+def test_failed_download_keeps_the_mark(warehouse, fake_api):
+    _set_records(fake_api, ["b1"])
+    fake_api.routes[_brawl_url("b1")] = _brawl()
+    assert warehouse.refresh_guild(GUILD) == 1
+    refreshed = warehouse.mark(GUILD)["refreshed"]
+    _set_records(fake_api, ["b1", "b2", "b3"])
+    fake_api.routes[_brawl_url("b2")] = (500, "error")
+    fake_api.routes[_brawl_url("b3")] = _brawl()
+    assert warehouse.refresh_guild(GUILD) is None
+    mark = warehouse.mark(GUILD)
+    assert mark == {"newest_brawl_id": "b1", "refreshed": refreshed}
+    assert (GUILD, "b3") in warehouse
+    fake_api.routes[_brawl_url("b2")] = _brawl()
+    assert warehouse.refresh_guild(GUILD) == 1
+    assert warehouse.mark(GUILD)["newest_brawl_id"] == "b3"
+
+
+def test_min_age(warehouse, fake_api):
+    _set_records(fake_api, ["b1"])
+    fake_api.routes[_brawl_url("b1")] = (500, "error")
+    assert warehouse.refresh_guild(GUILD) is None
+    # A failed refresh does not count as recent
+    fake_api.routes[_brawl_url("b1")] = _brawl()
+    assert warehouse.refresh_guild(GUILD, min_age=3600) == 1
+    assert warehouse.refresh_guild(GUILD, min_age=3600) == 0
+    assert fake_api.count(_records_url()) == 2
+
+
+def test_refresh_checkpoint(warehouse, fake_api):
+    _set_records(fake_api, ["b1"])
+    fake_api.routes[_brawl_url("b1")] = _brawl()
+    # The records of the other guild cannot be downloaded
+    assert warehouse.refresh([GUILD, "other"]) == 1
+    assert warehouse.checkpoint() == ["other"]
+    _set_records(fake_api, [], guild_id="other")
+    assert warehouse.refresh() == 0
+    assert warehouse.checkpoint() == []